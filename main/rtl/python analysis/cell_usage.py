@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Cell-usage analytics for the ChaCha20 ASIC
+Parses the cellfrequencytables reports into per-run tables and measures how much of the design is ARX datapath versus buffers
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from run_database import DEFAULT_DATABASE, REPO_ROOT, RUN_ROOTS, RunDatabase, find_runs, print_rows, run_key
+from sta_paths import RUNS_DIR, latest_run
+
+FREQUENCY_GLOB = '*-odb-cellfrequencytables'
+SYNTHESIS_STAT_GLOB = '*-yosys-synthesis/reports/stat.json'
+# cell_function.rpt, by_scl.rpt and buffers.rpt are regroupings of this one
+CELL_REPORT = 'cell.rpt'
+
+# Rows of the box-drawn tables the step prints: '│ sky130_fd_sc_hd__xor2_4   │ 596   │'
+TABLE_ROW = re.compile(r'^│\s*(\S+)\s*│\s*(\d+)\s*│')
+LIBERTY_CELL = re.compile(r'^\s*cell\s*\(\s*"?([^")\s]+)"?\s*\)')
+LIBERTY_AREA = re.compile(r'^\s*area\s*:\s*([\d.]+)')
+
+# First match wins: delay cells are buffers too, and 'dl' also starts the latches
+CATEGORIES = (
+    ('physical', re.compile(r'^(decap|fill|tapvpwrvgnd|diode)')),
+    ('delay', re.compile(r'^(dlygate|dlymetal|clkdlybuf)')),
+    ('buffer', re.compile(r'^(clk)?(buf|bufbuf)$')),
+    ('inverter', re.compile(r'^(clk)?inv')),
+    ('xor', re.compile(r'^xn?or[23]$')),
+    ('adder', re.compile(r'^(fa|fah|fahcin|fahcon|ha|maj3)$')),
+    ('sequential', re.compile(r'^(e?s?df|s?dl|sedf)')),
+    ('mux', re.compile(r'^mux')),
+)
+LOGIC = 'logic'
+CATEGORY_ORDER = [name for name, _ in CATEGORIES] + [LOGIC]
+
+# ARX bit operations in the RTL: 8 QR instances with 4 adds and 4 XORs each (qr.v),
+# plus the 16 final state additions and keystream XORs (chacha20_core.v), all 32-bit
+WORD_BITS = 32
+ARX_ADD_BITS = (8 * 4 + 16) * WORD_BITS
+ARX_XOR_BITS = (8 * 4 + 16) * WORD_BITS
+
+# Per-run cache in the run database; bump to rebuild just this table
+CELLS_VERSION = 1
+CELLS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cells (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    cell TEXT NOT NULL,
+    category TEXT,
+    count INTEGER,
+    PRIMARY KEY (run_id, stage, cell)
+);
+"""
+
+
+def cell_function(cell):
+    """'sky130_fd_sc_hd__xor2_4' -> 'xor2'"""
+    function = cell.rpartition('__')[2]
+    return re.sub(r'_\d+$', '', function)
+
+
+def cell_category(cell, buffers=()):
+    function = cell_function(cell)
+    for name, pattern in CATEGORIES:
+        if pattern.match(function):
+            return name
+    # Anything else the flow lists as a buffer master
+    return 'buffer' if cell in buffers else LOGIC
+
+
+def read_table(path):
+    """[(name, count)] rows of one cellfrequencytables report"""
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = TABLE_ROW.match(line)
+            if match:
+                rows.append((match.group(1), int(match.group(2))))
+    return rows
+
+
+def frequency_report(run):
+    """(step directory, [(cell, count)], buffer masters) of the last cellfrequencytables step"""
+    steps = sorted(Path(run).glob(FREQUENCY_GLOB), key=lambda p: int(p.name.split('-')[0]))
+    if not steps or not (steps[-1] / CELL_REPORT).exists():
+        return None, [], set()
+    step = steps[-1]
+    buffers = set()
+    if (step / 'buffer_list.txt').exists():
+        with open(step / 'buffer_list.txt', 'r') as f:
+            buffers = {line.strip() for line in f if line.strip()}
+    return step, read_table(step / CELL_REPORT), buffers
+
+
+def synthesis_cells(run):
+    """{cell: count} of the synthesized netlist, from Yosys' stat.json"""
+    stats = sorted(Path(run).glob(SYNTHESIS_STAT_GLOB))
+    if not stats:
+        return {}
+    with open(stats[-1], 'r') as f:
+        modules = json.load(f).get('modules', {})
+    counts = {}
+    for module in modules.values():
+        for cell, count in module.get('num_cells_by_type', {}).items():
+            counts[cell] = counts.get(cell, 0) + count
+    return counts
+
+
+def read_liberty_areas(path):
+    """{cell: area in µm²} from a Liberty file"""
+    areas, cell = {}, None
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            match = LIBERTY_CELL.match(line)
+            if match:
+                cell = match.group(1)
+                continue
+            match = LIBERTY_AREA.match(line)
+            if match and cell and cell not in areas:
+                areas[cell] = float(match.group(1))
+    return areas
+
+
+def run_liberties(run):
+    """Standard-cell Liberty files a run was characterised with, where they exist on this machine"""
+    resolved = Path(run) / 'resolved.json'
+    if not resolved.exists():
+        return []
+    with open(resolved, 'r') as f:
+        libs = json.load(f).get('LIB') or {}
+    paths = [p for corner in libs.values() for p in corner]
+    return sorted({p for p in paths if Path(p).exists()})
+
+
+class CellUsage:
+    """Cell masters of one run at synthesis and at signoff, with their category"""
+
+    def __init__(self, rows):
+        self.rows = rows        # [(stage, cell, category, count)]
+
+    @classmethod
+    def for_run(cls, database, run):
+        """Cell counts of an ingested run, parsed once and then read back from the run database"""
+        # Re-ingesting a changed run drops its stored cells with it
+        database.cache_table('cells', CELLS_VERSION, CELLS_SCHEMA)
+        run_id = database.db.execute('SELECT run_id FROM runs WHERE path = ?', (run_key(run),)).fetchone()[0]
+        stored = database.db.execute('SELECT stage, cell, category, count FROM cells WHERE run_id = ?',
+                                     (run_id,)).fetchall()
+        if stored:
+            return cls(stored)
+
+        step, cells, buffers = frequency_report(run)
+        if step is None:
+            raise FileNotFoundError(f"No cell frequency tables ({FREQUENCY_GLOB}) in {run}")
+        rows = [('signoff', cell, cell_category(cell, buffers), count) for cell, count in cells]
+        rows += [('synthesis', cell, cell_category(cell, buffers), count)
+                 for cell, count in synthesis_cells(run).items()]
+        with database.db:
+            database.db.executemany('INSERT INTO cells VALUES (?, ?, ?, ?, ?)',
+                                    [(run_id, *row) for row in rows])
+        print(f"  🧮 Read {len(rows)} cell counts from {step.name}")
+        return cls(rows)
+
+    def counts(self, stage='signoff'):
+        return {cell: count for s, cell, _, count in self.rows if s == stage}
+
+    def by_category(self, stage='signoff', areas=None):
+        """{category: (instances, area or None)}"""
+        totals = {}
+        for s, cell, category, count in self.rows:
+            if s != stage:
+                continue
+            instances, area = totals.get(category, (0, 0.0))
+            cell_area = areas.get(cell) if areas else None
+            totals[category] = (instances + count,
+                                None if area is None or cell_area is None else area + cell_area * count)
+        return totals
+
+
+def area_by_step(database, run):
+    """[(step, cell area µm², growth over the previous step)] for the steps that changed the area"""
+    rows = database.db.execute(
+        "SELECT m.step, m.value FROM metrics m JOIN steps s ON s.run_id = m.run_id AND s.step = m.step "
+        "JOIN runs r ON r.run_id = m.run_id WHERE r.path = ? AND m.name = 'design__instance__area' "
+        "AND s.ordinal IS NOT NULL ORDER BY s.ordinal", (run_key(run),)).fetchall()
+    growth, previous = [], None
+    for step, area in rows:
+        if previous is None or area != previous:
+            growth.append((step, area, None if previous is None else area - previous))
+        previous = area
+    return growth
+
+
+def print_categories(usage, areas):
+    synthesis = usage.by_category('synthesis', areas)
+    signoff = usage.by_category('signoff', areas)
+    # Physical cells (taps, decaps, fill, antenna diodes) hold no logic
+    logic_total = sum(n for c, (n, _) in signoff.items() if c != 'physical') or 1
+    area_total = sum(a for c, (_, a) in signoff.items() if c != 'physical' and a is not None) or None
+    rows = []
+    for category in CATEGORY_ORDER:
+        before = synthesis.get(category, (0, None))[0]
+        after, area = signoff.get(category, (0, None))
+        if not before and not after:
+            continue
+        share = 100 * after / logic_total if category != 'physical' else None
+        area_share = 100 * area / area_total if area_total and area is not None and category != 'physical' else None
+        rows.append((category, before, after, after - before, share) + ((area, area_share) if areas else ()))
+    print_rows(['category', 'synthesis', 'signoff', 'added_by_pnr', 'cells_%'] + (['area_um2', 'area_%'] if areas else []),
+               rows)
+    return synthesis, signoff, logic_total
+
+
+def print_arx(synthesis, signoff):
+    xors = synthesis.get('xor', (0, None))[0]
+    adders = synthesis.get('adder', (0, None))[0]
+    print(f"  RTL ARX work: {ARX_ADD_BITS} adder bits + {ARX_XOR_BITS} XOR bits (48 32-bit adds and XORs)")
+    print(f"  XOR/XNOR cells after synthesis: {xors} ({xors / (ARX_ADD_BITS + ARX_XOR_BITS):.2f} per ARX bit)")
+    if not adders:
+        print("  No full/half-adder cells: the adders were mapped to generic AND-OR/XOR logic")
+    else:
+        print(f"  Adder cells: {adders} ({adders / ARX_ADD_BITS:.2f} per adder bit)")
+    buffered = sum(signoff.get(c, (0, None))[0] - synthesis.get(c, (0, None))[0] for c in ('buffer', 'delay'))
+    print(f"  Buffers and delay cells added after synthesis: {buffered} "
+          f"({buffered / max(1, sum(n for c, (n, _) in synthesis.items() if c != 'physical')):.2f} per synthesized cell)")
+
+
+def compare_runs(database):
+    """One row per ingested run: logic instances and the buffer, delay, inverter, XOR and adder counts"""
+    rows = []
+    for (key,) in database.db.execute('SELECT path FROM runs ORDER BY name, path').fetchall():
+        run = Path(key) if Path(key).is_absolute() else REPO_ROOT / key
+        try:
+            usage = CellUsage.for_run(database, run)
+        except FileNotFoundError:
+            rows.append((key,) + (None,) * 8)
+            continue
+        signoff = {c: n for c, (n, _) in usage.by_category('signoff').items()}
+        logic = sum(n for c, n in signoff.items() if c != 'physical')
+        instances = database.db.execute(
+            "SELECT m.value FROM metrics m JOIN runs r ON r.run_id = m.run_id "
+            "WHERE r.path = ? AND m.step = 'final' AND m.name = 'design__instance__count'", (key,)).fetchone()
+        buffered = signoff.get('buffer', 0) + signoff.get('delay', 0)
+        rows.append((key, int(instances[0]) if instances and instances[0] is not None else None, logic, signoff.get('buffer', 0),
+                     signoff.get('delay', 0), signoff.get('inverter', 0), signoff.get('xor', 0),
+                     signoff.get('adder', 0), 100 * buffered / logic if logic else None))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cell usage by category from the cellfrequencytables reports")
+    parser.add_argument('run', nargs='?', help="run directory (default: latest in main/rtl/runs)")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database caching the cell tables")
+    parser.add_argument('--lib', action='append', default=[],
+                        help="standard-cell Liberty file for cell areas (default: the run's, if present)")
+    parser.add_argument('--top', type=int, default=10, help="cell functions to list")
+    args = parser.parse_args()
+
+    run = Path(args.run) if args.run else latest_run()
+    if run is None:
+        print(f"❌ No runs in {RUNS_DIR}")
+        return 1
+
+    print("🧮 ChaCha20 Cell Usage")
+    print("=" * 40)
+    database = RunDatabase(args.db)
+    try:
+        runs = find_runs(RUN_ROOTS)
+        if run.resolve() not in {Path(r).resolve() for r in runs}:
+            runs.append(run)
+        database.ingest(runs)
+        try:
+            usage = CellUsage.for_run(database, run)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return 1
+
+        areas = {}
+        for lib in args.lib or run_liberties(run):
+            areas.update(read_liberty_areas(lib))
+        if not areas:
+            print("  ⚠️  No standard-cell Liberty found (pass --lib): areas come from the flow's per-step metrics")
+
+        print(f"\n🏷️  Cells by category (synthesis -> signoff)")
+        synthesis, signoff, logic_total = print_categories(usage, areas)
+
+        print(f"\n⚙️  ARX datapath mapping")
+        print_arx(synthesis, signoff)
+
+        print(f"\n🔝 Most used cell functions at signoff")
+        functions = {}
+        for cell, count in usage.counts('signoff').items():
+            if cell_category(cell) != 'physical':
+                functions[cell_function(cell)] = functions.get(cell_function(cell), 0) + count
+        print_rows(['function', 'cells', 'cells_%', 'category'],
+                   [(f, n, 100 * n / logic_total, cell_category(f))
+                    for f, n in sorted(functions.items(), key=lambda kv: -kv[1])[:args.top]])
+
+        print(f"\n📐 Cell area by flow step")
+        print_rows(['step', 'area_um2', 'added_um2'], area_by_step(database, run))
+
+        rows = compare_runs(database)
+        print(f"\n📈 Runs compared (instances also count tap cells and antenna diodes)")
+        print_rows(['run', 'instances', 'logic_cells', 'buffers', 'delays', 'inverters', 'xor', 'adders',
+                    'buffered_%'], rows)
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Streaming DEF reader for the ChaCha20 ASIC layout snapshots
+Reads COMPONENTS, PINS and NETS into NumPy arrays with a grid spatial index for density, bounding-box and wirelength queries
+"""
+
+import argparse
+import fnmatch
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from run_database import DEFAULT_DATABASE, RunDatabase, print_rows
+from rtl_attribution import NETLIST_GLOB, HierarchyIndex
+
+DEF_UNITS = re.compile(r'^UNITS DISTANCE MICRONS (\d+)')
+DEF_DIEAREA = re.compile(r'^DIEAREA \( (-?\d+) (-?\d+) \) \( (-?\d+) (-?\d+) \)')
+DEF_ROW = re.compile(r'^ROW \S+ \S+ (-?\d+) (-?\d+) \S+ DO (\d+) BY (\d+) STEP (\d+) (\d+)')
+ROW_HEIGHT = 2.72       # sky130_fd_sc_hd site height in microns
+
+SECTIONS = ('COMPONENTS', 'PINS', 'NETS')
+STATUSES = ('UNPLACED', 'PLACED', 'FIXED', 'COVER')
+ORIENTATIONS = ('N', 'S', 'E', 'W', 'FN', 'FS', 'FE', 'FW')
+# Physical-only cells OpenROAD inserts (taps, decaps, fill, edge caps)
+PHYSICAL_CELLS = re.compile(r'__(tapvpwrvgnd|decap|fill|diode)')
+GRID_BINS = 16
+
+# The name field is sized to the longest instance name when a file is loaded
+COMPONENT_FIELDS = [('cell', 'i4'), ('status', 'u1'), ('orient', 'u1'), ('x', 'i8'), ('y', 'i8')]
+
+
+def read_floorplan(def_path):
+    """Die box and standard-cell row boxes (microns) from a DEF header; stops before COMPONENTS"""
+    units, die, rows = 1000.0, None, []
+    with open(def_path, 'r') as f:
+        for line in f:
+            if line.startswith('COMPONENTS'):
+                break
+            match = DEF_UNITS.match(line)
+            if match:
+                units = float(match.group(1))
+                continue
+            match = DEF_DIEAREA.match(line)
+            if match:
+                die = tuple(int(v) / units for v in match.groups())
+                continue
+            match = DEF_ROW.match(line)
+            if match:
+                x, y, count, _, step, _ = (int(v) for v in match.groups())
+                rows.append((x / units, y / units, (x + count * step) / units, y / units + ROW_HEIGHT))
+    return {'units': units, 'die': die, 'rows': rows}
+
+
+def step_ordinal(path):
+    prefix = Path(path).parent.name.split('-')[0]
+    return int(prefix) if prefix.isdigit() else -1
+
+
+def floorplan_def(run):
+    """The last DEF written in a run (the PDN stage for these pre-placement runs), or None"""
+    defs = sorted(Path(run).glob('*/*.def'), key=step_ordinal)
+    return defs[-1] if defs else None
+
+
+def def_statements(path, sections=SECTIONS):
+    """Yield (section, tokens) for every ';'-terminated statement inside the requested sections
+
+    Only one statement is held at a time; everything outside the requested
+    sections (VIAS, SPECIALNETS, ...) is skipped line by line.
+    """
+    section = None
+    tokens = []
+    with open(path, 'r') as f:
+        for line in f:
+            if section is None:
+                head = line.split(None, 1)
+                if head and head[0] in sections:
+                    section = head[0]
+                    tokens = []
+                continue
+            if line.startswith('END ' + section):
+                section = None
+                continue
+            tokens.extend(line.split())
+            if tokens and tokens[-1] == ';':
+                yield section, tokens
+                tokens = []
+
+
+def _placement(tokens):
+    """(status, x, y, orientation) from '+ PLACED ( x y ) N' style tokens, unplaced when absent"""
+    for i, token in enumerate(tokens):
+        if token in ('PLACED', 'FIXED', 'COVER') and i + 5 < len(tokens) and tokens[i + 1] == '(':
+            return (STATUSES.index(token), int(tokens[i + 2]), int(tokens[i + 3]),
+                    ORIENTATIONS.index(tokens[i + 5]) if tokens[i + 5] in ORIENTATIONS else 0)
+    return 0, 0, 0, 0
+
+
+class GridIndex:
+    """Uniform-grid spatial index: points bucketed by bin, stored sorted with per-bin offsets"""
+
+    def __init__(self, x, y, extent, bins=GRID_BINS):
+        self.extent = extent
+        self.bins = bins
+        self.x_edges = np.linspace(extent[0], extent[2], bins + 1)
+        self.y_edges = np.linspace(extent[1], extent[3], bins + 1)
+        self.ids = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        col = np.clip(np.searchsorted(self.x_edges, x[self.ids], side='right') - 1, 0, bins - 1)
+        row = np.clip(np.searchsorted(self.y_edges, y[self.ids], side='right') - 1, 0, bins - 1)
+        self.bin = row * bins + col
+        order = np.argsort(self.bin, kind='stable')
+        self.ids, self.bin = self.ids[order], self.bin[order]
+        self.offsets = np.searchsorted(self.bin, np.arange(bins * bins + 1))
+        self.x, self.y = x, y
+
+    def counts(self):
+        """Points per bin as a (row, col) grid"""
+        return np.diff(self.offsets).reshape(self.bins, self.bins)
+
+    def query(self, x0, y0, x1, y1):
+        """Indices of the points inside a rectangle, touching only the bins it overlaps"""
+        c0, c1 = (np.clip(np.searchsorted(self.x_edges, v, side='right') - 1, 0, self.bins - 1) for v in (x0, x1))
+        r0, r1 = (np.clip(np.searchsorted(self.y_edges, v, side='right') - 1, 0, self.bins - 1) for v in (y0, y1))
+        chunks = [self.ids[self.offsets[r * self.bins + c0]:self.offsets[r * self.bins + c1 + 1]]
+                  for r in range(r0, r1 + 1)]
+        found = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+        inside = (self.x[found] >= x0) & (self.x[found] <= x1) & (self.y[found] >= y0) & (self.y[found] <= y1)
+        return found[inside]
+
+
+class DEFLayout:
+    """Components, I/O pins and net connectivity of one DEF file as arrays
+
+    Components are a structured array (locations in DEF units); nets are in
+    CSR form: the pins of net i are pin_component/pin_io[net_offsets[i]:
+    net_offsets[i + 1]], with -1 where a pin is on the other kind of object.
+    """
+
+    def __init__(self, path, floorplan, components, cells, io_names, io_xy, net_names, net_offsets,
+                 pin_component, pin_io):
+        self.path = str(path)
+        self.units = floorplan['units']
+        self.die = floorplan['die']
+        self.rows = floorplan['rows']
+        self.components = components
+        self.cells = cells                  # cell type table; components['cell'] indexes it
+        self.io_names = io_names
+        self.io_xy = io_xy                  # (n, 2) microns, NaN when unplaced
+        self.net_names = net_names
+        self.net_offsets = net_offsets
+        self.pin_component = pin_component
+        self.pin_io = pin_io
+        self._by_name = None
+
+    @classmethod
+    def load(cls, path, sections=SECTIONS):
+        floorplan = read_floorplan(path)
+        names, cell_codes, statuses, orients, xs, ys = [], [], [], [], [], []
+        cells = {}
+        io_index, io_xy = {}, []
+        net_names, net_offsets, pin_component, pin_io = [], [0], [], []
+        component_index = None
+
+        for section, tokens in def_statements(path, sections):
+            if tokens[0] != '-':
+                continue
+            if section == 'COMPONENTS':
+                status, x, y, orient = _placement(tokens)
+                names.append(tokens[1])
+                cell_codes.append(cells.setdefault(tokens[2], len(cells)))
+                statuses.append(status)
+                orients.append(orient)
+                xs.append(x)
+                ys.append(y)
+            elif section == 'PINS':
+                status, x, y, _ = _placement(tokens)
+                io_index[tokens[1]] = len(io_xy)
+                io_xy.append((x / floorplan['units'], y / floorplan['units']) if status else (np.nan, np.nan))
+            elif section == 'NETS':
+                if component_index is None:
+                    component_index = {name: i for i, name in enumerate(names)}
+                net_names.append(tokens[1])
+                # Connections are '( <component or PIN> <pin> )' groups up to the first '+' option
+                i = 2
+                while i + 3 < len(tokens) and tokens[i] == '(':
+                    owner, pin = tokens[i + 1], tokens[i + 2]
+                    if owner == 'PIN':
+                        pin_component.append(-1)
+                        pin_io.append(io_index.get(pin, -1))
+                    else:
+                        pin_component.append(component_index.get(owner, -1))
+                        pin_io.append(-1)
+                    i += 4
+                net_offsets.append(len(pin_component))
+
+        width = max((len(name) for name in names), default=1)
+        components = np.zeros(len(names), dtype=[('name', f'U{width}')] + COMPONENT_FIELDS)
+        components['name'] = names
+        components['cell'] = cell_codes
+        components['status'] = statuses
+        components['orient'] = orients
+        components['x'] = xs
+        components['y'] = ys
+        return cls(path, floorplan, components, list(cells), list(io_index),
+                   np.array(io_xy, dtype=np.float64).reshape(-1, 2), np.array(net_names),
+                   np.array(net_offsets, dtype=np.int64), np.array(pin_component, dtype=np.int32),
+                   np.array(pin_io, dtype=np.int32))
+
+    @property
+    def placed(self):
+        return self.components['status'] != 0
+
+    @property
+    def physical(self):
+        """Mask of physical-only cells (taps, decaps, fill)"""
+        kinds = np.array([bool(PHYSICAL_CELLS.search(cell)) for cell in self.cells], dtype=bool)
+        return kinds[self.components['cell']] if len(kinds) else np.zeros(len(self.components), dtype=bool)
+
+    def xy(self):
+        """(x, y) in microns of every component origin, NaN when unplaced"""
+        x = self.components['x'] / self.units
+        y = self.components['y'] / self.units
+        unplaced = ~self.placed
+        x[unplaced] = np.nan
+        y[unplaced] = np.nan
+        return x, y
+
+    def spatial_index(self, bins=GRID_BINS, mask=None):
+        x, y = self.xy()
+        if mask is not None:
+            x, y = np.where(mask, x, np.nan), np.where(mask, y, np.nan)
+        extent = self.die if self.die else (np.nanmin(x), np.nanmin(y), np.nanmax(x), np.nanmax(y))
+        return GridIndex(x, y, extent, bins)
+
+    def indices_of(self, names):
+        """Component indices of the given instance names (unknown names are skipped)"""
+        if self._by_name is None:
+            self._by_name = {name: i for i, name in enumerate(self.components['name'])}
+        return np.array([self._by_name[n] for n in names if n in self._by_name], dtype=np.int64)
+
+    def bbox(self, indices):
+        """(x0, y0, x1, y1) microns around the placed components among `indices`, or None"""
+        x, y = self.xy()
+        x, y = x[indices], y[indices]
+        keep = np.isfinite(x)
+        if not keep.any():
+            return None
+        return float(x[keep].min()), float(y[keep].min()), float(x[keep].max()), float(y[keep].max())
+
+    def hpwl(self):
+        """Half-perimeter wirelength (microns) per net from component origins and I/O pins
+
+        NaN for nets with an unplaced pin or fewer than two pins.
+        """
+        x, y = self.xy()
+        on_component = self.pin_component >= 0
+        px = np.full(len(self.pin_component), np.nan)
+        py = np.full(len(self.pin_component), np.nan)
+        px[on_component] = x[self.pin_component[on_component]]
+        py[on_component] = y[self.pin_component[on_component]]
+        on_io = self.pin_io >= 0
+        px[on_io] = self.io_xy[self.pin_io[on_io], 0]
+        py[on_io] = self.io_xy[self.pin_io[on_io], 1]
+
+        sizes = np.diff(self.net_offsets)
+        result = np.full(len(sizes), np.nan)
+        filled = sizes > 0
+        if not filled.any():
+            return result
+        # reduceat runs from each start to the next one, so every non-empty net needs its
+        # own start; NaN (unplaced) propagates through max/min
+        starts = self.net_offsets[:-1][filled]
+        width = np.maximum.reduceat(px, starts) - np.minimum.reduceat(px, starts)
+        height = np.maximum.reduceat(py, starts) - np.minimum.reduceat(py, starts)
+        result[filled] = width + height
+        result[sizes < 2] = np.nan
+        return result
+
+
+def module_instances(database, run, pattern):
+    """{module: [instance, ...]} for RTL instances matching a glob, from the run's hierarchy index"""
+    index = HierarchyIndex.for_run(database, run)
+    groups = {}
+    for instance, module in index.modules.items():
+        if fnmatch.fnmatch(module, pattern) or fnmatch.fnmatch(module.rpartition('.')[2], pattern):
+            groups.setdefault(module, []).append(instance)
+    return groups
+
+
+def print_density(layout, index):
+    counts = index.counts()
+    bin_area = np.diff(index.x_edges)[0] * np.diff(index.y_edges)[0]
+    print(f"  {index.bins}x{index.bins} bins of {np.diff(index.x_edges)[0]:.0f} x {np.diff(index.y_edges)[0]:.0f} µm, "
+          f"peak {counts.max()} cells ({counts.max() / bin_area * 1e4:.1f} / 100x100 µm), "
+          f"mean {counts.mean():.1f}")
+    # Top row of the die printed first
+    scale = max(counts.max(), 1)
+    shades = ' .:-=+*#%@'
+    for row in counts[::-1]:
+        print('  |' + ''.join(shades[min(int(len(shades) * c / (scale + 1)), len(shades) - 1)] * 2 for c in row) + '|')
+
+
+# Three nets with a single-pin net between two real ones: reduceat must not let n1 run into n2
+SELF_CHECK_DEF = """UNITS DISTANCE MICRONS 1000 ;
+DIEAREA ( 0 0 ) ( 100000 100000 ) ;
+COMPONENTS 4 ;
+    - a sky130_fd_sc_hd__inv_2 + PLACED ( 0 0 ) N ;
+    - b sky130_fd_sc_hd__inv_2 + PLACED ( 10000 0 ) N ;
+    - c sky130_fd_sc_hd__inv_2 + PLACED ( 90000 90000 ) N ;
+    - a_component_name_well_past_forty_eight_characters_long sky130_fd_sc_hd__inv_2 + PLACED ( 30000 20000 ) N ;
+END COMPONENTS
+NETS 3 ;
+    - n1 ( a Y ) ( b A ) + USE SIGNAL ;
+    - n2 ( c Y ) + USE SIGNAL ;
+    - n3 ( a_component_name_well_past_forty_eight_characters_long Y ) ( b A ) + USE SIGNAL ;
+END NETS
+END DESIGN
+"""
+
+
+def self_check():
+    """Load SELF_CHECK_DEF and compare its HPWL and name lookups with hand-computed values"""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'self_check.def'
+        path.write_text(SELF_CHECK_DEF)
+        layout = DEFLayout.load(path)
+    wirelength = layout.hpwl()
+    long_name = 'a_component_name_well_past_forty_eight_characters_long'
+    failures = []
+    if not (np.isclose(wirelength[0], 10.0) and np.isnan(wirelength[1]) and np.isclose(wirelength[2], 40.0)):
+        failures.append(f"hpwl {wirelength.tolist()}, expected [10.0, nan, 40.0]")
+    if layout.indices_of([long_name]).tolist() != [3]:
+        failures.append(f"instance name {long_name!r} not found")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ DEF reader self-check passed")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a DEF snapshot into arrays and query its placement")
+    parser.add_argument('def_file', nargs='?', help="DEF file (default: last DEF of the latest run in main/rtl/runs)")
+    parser.add_argument('--bins', type=int, default=GRID_BINS, help="density grid bins per axis")
+    parser.add_argument('--module', default='U_QR_COL_*', help="RTL instance glob for bounding boxes")
+    parser.add_argument('--top', type=int, default=10, help="longest nets to list")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database holding the instance index")
+    parser.add_argument('--self-check', action='store_true', help="verify HPWL on a small built-in DEF and exit")
+    args = parser.parse_args()
+
+    if args.self_check:
+        return self_check()
+
+    if args.def_file:
+        path = Path(args.def_file)
+    else:
+        from sta_paths import RUNS_DIR, latest_run
+        run = latest_run()
+        path = floorplan_def(run) if run else None
+        if path is None:
+            print(f"❌ No DEF snapshots in {RUNS_DIR}")
+            return 1
+
+    print("🗺️  ChaCha20 DEF Layout Reader")
+    print("=" * 40)
+    started = time.perf_counter()
+    layout = DEFLayout.load(path)
+    placed, physical = layout.placed, layout.physical
+    print(f"  {path} ({path.stat().st_size / 1e6:.1f} MB) read in {time.perf_counter() - started:.2f}s")
+    print(f"  {len(layout.components)} components ({int(placed.sum())} placed, "
+          f"{int(physical.sum())} physical-only), {len(layout.io_names)} I/O pins, "
+          f"{len(layout.net_names)} nets, {len(layout.pin_component)} connections")
+
+    logic = placed & ~physical
+    print(f"\n🧱 Placed logic-cell density")
+    if logic.any():
+        print_density(layout, layout.spatial_index(args.bins, logic))
+    else:
+        print("  No logic cells are placed in this snapshot (floorplan/PDN stage); only physical cells:")
+        print_density(layout, layout.spatial_index(args.bins, placed))
+
+    print(f"\n📦 Bounding boxes of {args.module}")
+    run = path.parent.parent
+    groups = {}
+    if any(run.glob(NETLIST_GLOB)):
+        database = RunDatabase(args.db)
+        try:
+            database.ingest([run])
+            groups = module_instances(database, run, args.module)
+        finally:
+            database.close()
+    else:
+        print(f"  No synthesis netlist next to this DEF ({NETLIST_GLOB}), so RTL instances are unknown")
+    rows = []
+    for module, instances in sorted(groups.items()):
+        indices = layout.indices_of(instances)
+        box = layout.bbox(indices)
+        corners = [f"{v:.1f}" for v in box] if box else ['-'] * 4
+        rows.append((module, len(indices), int(placed[indices].sum()), *corners))
+    print_rows(['module', 'cells', 'placed', 'x0_um', 'y0_um', 'x1_um', 'y1_um'], rows)
+
+    wirelength = layout.hpwl()
+    known = np.isfinite(wirelength)
+    print(f"\n📏 Half-perimeter wirelength ({int(known.sum())} of {len(wirelength)} nets fully placed)")
+    if known.any():
+        print(f"  total {wirelength[known].sum() / 1e3:.2f} mm, mean {wirelength[known].mean():.1f} µm")
+        longest = np.flatnonzero(known)[np.argsort(wirelength[known])[::-1][:args.top]]
+        print_rows(['net', 'pins', 'hpwl_um'],
+                   [(layout.net_names[i], int(np.diff(layout.net_offsets)[i]), float(wirelength[i])) for i in longest])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
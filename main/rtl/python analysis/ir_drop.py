@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+IR-drop map analytics for the ChaCha20 ASIC
+Loads the OpenROAD per-instance supply voltages into cached columnar arrays, grids them and renders a floorplan heatmap
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from def_reader import floorplan_def, read_floorplan
+from run_database import print_rows
+from sta_paths import RUNS_DIR, latest_run
+
+CACHE_DIR = Path(__file__).resolve().parent / '.irdrop_cache'
+# Bump when the cached columns change
+CACHE_VERSION = 1
+COLUMNS = ('x', 'y', 'voltage', 'layer', 'instance')
+
+NETS = ('VPWR', 'VGND')
+REPORT_LINE = re.compile(r'^(Net|Corner|Supply voltage|Worstcase voltage|Average IR drop|Worstcase IR drop)\s*:\s*(\S+)')
+
+GRID_BINS = 64
+# Grid bins within this fraction of the worst drop form the hot regions
+REGION_FRACTION = 0.8
+
+
+class IRDropMap:
+    """Columnar view of one net-<NET>.csv: location, voltage, layer code and instance of every tap"""
+
+    def __init__(self, net, columns, layers, supply):
+        self.net = net
+        self.x = columns['x']
+        self.y = columns['y']
+        self.voltage = columns['voltage']
+        self.layer = columns['layer']
+        self.instance = columns['instance']
+        self.layers = layers
+        self.supply = supply
+        # Power rails sag below the supply, ground rails bounce above 0 V
+        self.drop = supply - self.voltage if net != 'VGND' else self.voltage - supply
+
+    def __len__(self):
+        return len(self.x)
+
+    def grid(self, bins=GRID_BINS, extent=None):
+        """(worst drop, mean drop, worst tap index, x edges, y edges) per grid bin; empty bins are NaN / -1"""
+        if extent is None:
+            extent = (self.x.min(), self.x.max(), self.y.min(), self.y.max())
+        x_edges = np.linspace(extent[0], extent[1], bins + 1)
+        y_edges = np.linspace(extent[2], extent[3], bins + 1)
+        col = np.clip(np.searchsorted(x_edges, self.x, side='right') - 1, 0, bins - 1)
+        row = np.clip(np.searchsorted(y_edges, self.y, side='right') - 1, 0, bins - 1)
+        flat = row * bins + col
+
+        count = np.bincount(flat, minlength=bins * bins)
+        total = np.bincount(flat, weights=self.drop, minlength=bins * bins)
+        # Sort by bin then drop: the last tap of every bin is its worst
+        order = np.lexsort((self.drop, flat))
+        last = np.flatnonzero(np.r_[flat[order][1:] != flat[order][:-1], True])
+        worst_tap = np.full(bins * bins, -1, dtype=np.int64)
+        worst_tap[flat[order][last]] = order[last]
+
+        worst = np.full(bins * bins, np.nan)
+        filled = worst_tap >= 0
+        worst[filled] = self.drop[worst_tap[filled]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, total / count, np.nan)
+        shape = (bins, bins)
+        return worst.reshape(shape), mean.reshape(shape), worst_tap.reshape(shape), x_edges, y_edges
+
+    def layer_stats(self):
+        """[(layer, taps, mean drop, p99 drop, worst drop, worst instance)]"""
+        rows = []
+        for code, name in enumerate(self.layers):
+            mask = self.layer == code
+            if not mask.any():
+                continue
+            drop = self.drop[mask]
+            worst = np.flatnonzero(mask)[np.argmax(drop)]
+            rows.append((name, int(mask.sum()), float(drop.mean()), float(np.percentile(drop, 99)),
+                         float(drop.max()), self.instance[worst].decode()))
+        return rows
+
+
+def hot_regions(worst, tap, x_edges, y_edges, fraction=REGION_FRACTION):
+    """Connected groups of grid bins whose worst drop is within `fraction` of the map's worst
+
+    Returns [{'bins', 'x', 'y', 'worst', 'tap'}], worst region first.
+    """
+    peak = np.nanmax(worst)
+    hot = np.nan_to_num(worst, nan=-np.inf) >= fraction * peak
+    seen = np.zeros_like(hot)
+    regions = []
+    for start in zip(*np.nonzero(hot)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        stack, cells = [start], []
+        while stack:
+            r, c = stack.pop()
+            cells.append((r, c))
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    n = (r + dr, c + dc)
+                    if 0 <= n[0] < hot.shape[0] and 0 <= n[1] < hot.shape[1] and hot[n] and not seen[n]:
+                        seen[n] = True
+                        stack.append(n)
+        rows, cols = zip(*cells)
+        best = max(cells, key=lambda rc: worst[rc])
+        regions.append({'bins': len(cells),
+                        'x': (x_edges[min(cols)], x_edges[max(cols) + 1]),
+                        'y': (y_edges[min(rows)], y_edges[max(rows) + 1]),
+                        'worst': float(worst[best]), 'tap': int(tap[best])})
+    return sorted(regions, key=lambda r: -r['worst'])
+
+
+def read_ir_report(path):
+    """{net: {'corner', 'supply', 'worst_voltage', 'average_drop', 'worst_drop'}} from irdrop.rpt"""
+    keys = {'Corner': 'corner', 'Supply voltage': 'supply', 'Worstcase voltage': 'worst_voltage',
+            'Average IR drop': 'average_drop', 'Worstcase IR drop': 'worst_drop'}
+    nets, net = {}, None
+    with open(path, 'r') as f:
+        for line in f:
+            match = REPORT_LINE.match(line.strip())
+            if not match:
+                continue
+            field, value = match.groups()
+            if field == 'Net':
+                net = value
+                nets[net] = {}
+            elif net is not None:
+                nets[net][keys[field]] = value if field == 'Corner' else float(value)
+    return nets
+
+
+def _cache_dir(csv_path):
+    st = Path(csv_path).stat()
+    key = f"{Path(csv_path).resolve()}:{st.st_size}:{st.st_mtime_ns}:{CACHE_VERSION}"
+    return CACHE_DIR / hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def parse_csv(csv_path):
+    """Columns of an OpenROAD IR-drop CSV (Instance,Terminal,Layer,X,Y,Voltage) in one vectorized pass"""
+    with open(csv_path, 'rb') as f:
+        data = f.read()
+    body = data[data.index(b'\n') + 1:].strip().replace(b'\r', b'')
+    if not body:
+        empty = np.zeros(0)
+        return {'x': empty, 'y': empty, 'voltage': empty, 'layer': np.zeros(0, dtype=np.uint8),
+                'instance': np.zeros(0, dtype='S1')}, []
+    fields = np.array(body.replace(b'\n', b',').split(b',')).reshape(-1, 6)
+    layers, layer = np.unique(fields[:, 2], return_inverse=True)
+    columns = {
+        'x': fields[:, 3].astype(np.float64),
+        'y': fields[:, 4].astype(np.float64),
+        'voltage': fields[:, 5].astype(np.float64),
+        'layer': layer.astype(np.uint8),
+        'instance': fields[:, 0].copy()
+    }
+    return columns, [name.decode() for name in layers]
+
+
+def load_csv(csv_path, use_cache=True):
+    """(columns, layer names) of a CSV, memory-mapped from the .npy cache once it has been parsed"""
+    cache = _cache_dir(csv_path)
+    meta_path = cache / 'meta.json'
+    if use_cache and meta_path.exists():
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        return {c: np.load(cache / f'{c}.npy', mmap_mode='r') for c in COLUMNS}, meta['layers']
+
+    columns, layers = parse_csv(csv_path)
+    if use_cache:
+        cache.mkdir(parents=True, exist_ok=True)
+        for c in COLUMNS:
+            np.save(cache / f'{c}.npy', columns[c])
+        # Written last: a cache without meta.json is incomplete and gets rebuilt
+        with open(meta_path, 'w') as f:
+            json.dump({'source': str(csv_path), 'rows': len(columns['x']), 'layers': layers}, f)
+    return columns, layers
+
+
+def load_maps(step_dir, nets=NETS, use_cache=True):
+    """{net: IRDropMap} for the net CSVs of an irdropreport step"""
+    step_dir = Path(step_dir)
+    report = read_ir_report(step_dir / 'irdrop.rpt') if (step_dir / 'irdrop.rpt').exists() else {}
+    maps = {}
+    for net in nets:
+        csv_path = step_dir / f'net-{net}.csv'
+        if not csv_path.exists():
+            continue
+        columns, layers = load_csv(csv_path, use_cache)
+        supply = report.get(net, {}).get('supply')
+        if supply is None:
+            supply = float(np.max(columns['voltage'])) if net != 'VGND' else 0.0
+        maps[net] = IRDropMap(net, columns, layers, supply)
+    return maps
+
+
+def render_heatmap(maps, floorplan, filename, bins=GRID_BINS, regions=3):
+    """One panel per net: worst drop per bin over the die outline, core rows and hot regions
+
+    Draws on a bare Figure (Agg canvas, no pyplot), so no GUI backend is
+    imported and nothing needs closing.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Rectangle
+
+    die = floorplan['die'] if floorplan and floorplan['die'] else None
+    fig = Figure(figsize=(7 * len(maps), 6.5))
+    fig.patch.set_facecolor('black')
+    axes = fig.subplots(1, len(maps), squeeze=False)
+    fig.subplots_adjust(left=0.07, right=0.95, bottom=0.09, top=0.87, wspace=0.3)
+    for ax, (net, ir) in zip(axes[0], maps.items()):
+        extent = (die[0], die[2], die[1], die[3]) if die else None
+        worst, _, tap, x_edges, y_edges = ir.grid(bins, extent)
+        ax.set_facecolor('black')
+        image = ax.imshow(worst * 1e3, origin='lower', cmap='inferno', interpolation='nearest',
+                          extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]))
+        colorbar = fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+        colorbar.set_label('Worst IR drop (mV)', color='white')
+        colorbar.ax.tick_params(colors='white')
+
+        if floorplan:
+            if floorplan['rows']:
+                rows = np.array(floorplan['rows'])
+                core = (rows[:, 0].min(), rows[:, 1].min(), rows[:, 2].max(), rows[:, 3].max())
+                ax.add_patch(Rectangle(core[:2], core[2] - core[0], core[3] - core[1], fill=False,
+                                       edgecolor='cyan', linestyle='--', linewidth=1, label='Core rows'))
+            if die:
+                ax.add_patch(Rectangle(die[:2], die[2] - die[0], die[3] - die[1], fill=False,
+                                       edgecolor='white', linewidth=1.5, label='Die'))
+        for rank, region in enumerate(hot_regions(worst, tap, x_edges, y_edges)[:regions], 1):
+            (x0, x1), (y0, y1) = region['x'], region['y']
+            ax.add_patch(Rectangle((x0, y0), x1 - x0, y1 - y0, fill=False, edgecolor='lime', linewidth=1.5))
+            ax.text(x1, y1, f" #{rank} {region['worst'] * 1e3:.0f} mV", color='lime', fontsize=8, va='bottom')
+
+        ax.set_title(f'{net}: worst {np.nanmax(worst) * 1e3:.0f} mV, supply {ir.supply:g} V',
+                     color='white', fontsize=12, weight='bold')
+        ax.set_xlabel('X (µm)', color='white')
+        ax.set_ylabel('Y (µm)', color='white')
+        ax.tick_params(colors='white')
+        ax.legend(loc='upper right', fontsize=8, facecolor='black', labelcolor='white')
+    fig.suptitle('ChaCha20 ASIC IR-drop map', color='white', fontsize=14, weight='bold')
+    fig.savefig(filename, dpi=100, facecolor=fig.get_facecolor())
+
+
+def latest_irdrop_step(run):
+    steps = sorted(Path(run).glob('*-openroad-irdropreport'), key=lambda p: int(p.name.split('-')[0]))
+    return steps[-1] if steps else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IR-drop analytics and heatmap from OpenROAD net CSVs")
+    parser.add_argument('step', nargs='?', help="irdropreport step directory (default: latest run in main/rtl/runs)")
+    parser.add_argument('--net', choices=NETS, action='append', help="net to analyse (default: both)")
+    parser.add_argument('--bins', type=int, default=GRID_BINS, help="grid bins per axis")
+    parser.add_argument('--regions', type=int, default=5, help="hot regions to list")
+    parser.add_argument('--output', default='chacha20_ir_drop.png', help="heatmap PNG")
+    parser.add_argument('--no-render', action='store_true', help="skip the heatmap")
+    parser.add_argument('--no-cache', action='store_true', help="parse the CSVs without the .npy cache")
+    args = parser.parse_args()
+
+    if args.step:
+        step = Path(args.step)
+    else:
+        run = latest_run()
+        step = latest_irdrop_step(run) if run else None
+        if step is None:
+            print(f"❌ No irdropreport step in {RUNS_DIR}")
+            return 1
+
+    print("⚡ ChaCha20 IR-Drop Analytics")
+    print("=" * 40)
+    started = time.perf_counter()
+    maps = load_maps(step, args.net or NETS, not args.no_cache)
+    if not maps:
+        print(f"❌ No net-*.csv in {step}")
+        return 1
+    print(f"  {step}: {sum(len(m) for m in maps.values())} taps loaded in {time.perf_counter() - started:.3f}s")
+
+    floorplan_path = floorplan_def(step.parent)
+    floorplan = read_floorplan(floorplan_path) if floorplan_path else None
+    die = floorplan['die'] if floorplan else None
+    extent = (die[0], die[2], die[1], die[3]) if die else None
+
+    for net, ir in maps.items():
+        print(f"\n📋 {net} (supply {ir.supply:g} V) by layer")
+        print_rows(['layer', 'taps', 'mean_drop_v', 'p99_drop_v', 'worst_drop_v', 'worst_instance'], ir.layer_stats())
+        worst, mean, tap, x_edges, y_edges = ir.grid(args.bins, extent)
+        print(f"\n🔥 {net} hot regions (bins within {REGION_FRACTION:.0%} of the worst, {args.bins}x{args.bins} grid)")
+        print_rows(['x_um', 'y_um', 'bins', 'worst_drop_v', 'worst_instance'],
+                   [(f"{r['x'][0]:.0f}-{r['x'][1]:.0f}", f"{r['y'][0]:.0f}-{r['y'][1]:.0f}", r['bins'],
+                     r['worst'], ir.instance[r['tap']].decode())
+                    for r in hot_regions(worst, tap, x_edges, y_edges)[:args.regions]])
+
+    if not args.no_render:
+        started = time.perf_counter()
+        render_heatmap(maps, floorplan, args.output, args.bins)
+        print(f"\n✅ Heatmap saved to {args.output} ({time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
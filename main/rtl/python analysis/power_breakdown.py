@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Power report aggregation for the ChaCha20 ASIC
+Parses OpenSTA power.rpt across corners and splits each group over the QR rounds, state registers and TRNG
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from run_database import DEFAULT_DATABASE, REPO_ROOT, RUN_ROOTS, RunDatabase, find_runs, print_rows
+from rtl_attribution import QR_PORT, HierarchyIndex
+from sta_paths import RUNS_DIR, corner_of, latest_run
+
+sys.path.insert(0, str(REPO_ROOT / 'main' / 'tb' / 'python checking'))
+
+from toggle_profiler import profile_activity
+
+DEFAULT_WAVEFORM = REPO_ROOT / 'presentation' / 'verification' / 'simulation_results' / 'integration' / 'tb_asic_top_full_cycle.vcd'
+DEFAULT_CORNER = 'nom_tt_025C_1v80'
+
+POWER_ROW = re.compile(r'^(Sequential|Combinational|Clock|Macro|Pad|Total)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)')
+CORNER_HEADING = re.compile(r'^=+ (\S+) Corner =+$')
+ACTIVITY_COMMANDS = ('read_vcd', 'read_saif', 'set_power_activity')
+
+STATE_REGISTERS = 'chacha_unit.state'
+TRNG = 'trng_inst'
+CLOCK_NETWORK = '(clock network)'
+# Cells outside these groups (macros, pads) are not in the synthesis netlist
+CELL_GROUPS = ('Sequential', 'Combinational')
+
+
+def read_power_report(path, corner=None):
+    """{corner: {group: {'internal', 'switching', 'leakage', 'total'}}} from a report_power file (Watts)"""
+    reports = {}
+    with open(path, 'r') as f:
+        for line in f:
+            stripped = line.strip()
+            heading = CORNER_HEADING.match(stripped)
+            if heading:
+                corner = heading.group(1)
+                continue
+            match = POWER_ROW.match(stripped)
+            if match:
+                internal, switching, leakage, total = (float(v) for v in match.groups()[1:])
+                reports.setdefault(corner or '', {})[match.group(1)] = {
+                    'internal': internal, 'switching': switching, 'leakage': leakage, 'total': total}
+    return reports
+
+
+def power_reports(run):
+    """Per-corner power of a run from its signoff STA, falling back to the last STA step with a report"""
+    for pattern in ('*-openroad-stapostpnr', '*-openroad-stamidpnr*', '*-openroad-staprepnr'):
+        steps = sorted(Path(run).glob(pattern), key=lambda p: int(p.name.split('-')[0]))
+        for step in reversed(steps):
+            reports = {}
+            for report in sorted(step.rglob('power.rpt')):
+                reports.update(read_power_report(report, corner_of(report)))
+            if reports:
+                return step, reports
+    return None, {}
+
+
+def activity_annotated(step):
+    """True if the STA step read switching activity; otherwise OpenSTA used its default input activity"""
+    for log in Path(step).rglob('*.log'):
+        text = log.read_text(errors='replace')
+        if any(command in text for command in ACTIVITY_COMMANDS):
+            return True
+    return False
+
+
+def power_block(module, register):
+    """Block a cell's power is reported under: a QR round, the state registers, the TRNG or its instance"""
+    if register and QR_PORT.match(register):
+        return STATE_REGISTERS
+    if module == TRNG or module.startswith(TRNG + '.'):
+        return TRNG
+    return module
+
+
+def drive_strength(cell):
+    """sky130 drive suffix ('sky130_fd_sc_hd__nand2_4' -> 4); bigger cells switch more capacitance"""
+    suffix = cell.rpartition('_')[2]
+    return int(suffix) if suffix.isdigit() else 1
+
+
+class BlockActivity:
+    """Simulated toggle activity of each power block, read from an RTL waveform
+
+    The testbench wraps asic_top, so block paths are matched by suffix and
+    the wrapper prefix is taken from the scopes that match.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.prefix = None
+
+    def _find_prefix(self, blocks):
+        counts = {}
+        for scope in self.profile.modules:
+            for block in blocks:
+                if '.' in block and scope.endswith('.' + block):
+                    prefix = scope[:-len(block) - 1]
+                    counts[prefix] = counts.get(prefix, 0) + 1
+        self.prefix = max(counts, key=counts.get) if counts else ''
+
+    def of(self, block, blocks):
+        if self.prefix is None:
+            self._find_prefix(blocks)
+        if block == STATE_REGISTERS:
+            # The state words are the column QRs' in_a..in_d ports
+            ports = [s for path, s in self.profile.signals.items()
+                     if re.search(r'\.U_QR_COL_\d\.in_[abcd]$', path)]
+            bits = sum(s['width'] for s in ports)
+            return sum(s['activity'] * s['width'] for s in ports) / bits if bits else None
+        scope = self.prefix if block == 'asic_top' else f"{self.prefix}.{block}" if self.prefix else block
+        stats = self.profile.modules.get(scope)
+        return stats['activity'] if stats else None
+
+
+def block_power(index, groups, activity=None):
+    """{block: {'cells', 'flops', 'activity', group: watts}} splitting each power group over its cells
+
+    Within a group a cell's share is its drive strength, scaled by the
+    simulated activity of its block when a waveform is given.
+    """
+    flops = set(index.registers)
+    blocks = {}
+    for instance, module in index.modules.items():
+        block = power_block(module, index.registers.get(instance))
+        entry = blocks.setdefault(block, {'cells': 0, 'flops': 0, 'weights': {g: 0.0 for g in CELL_GROUPS}})
+        entry['cells'] += 1
+        group = 'Sequential' if instance in flops else 'Combinational'
+        entry['flops'] += group == 'Sequential'
+        entry['weights'][group] += drive_strength(index.cells[instance])
+
+    known = {}
+    if activity is not None:
+        for block in blocks:
+            value = activity.of(block, list(blocks))
+            if value is not None:
+                known[block] = value
+    mean = sum(known.values()) / len(known) if known else None
+    for block, entry in blocks.items():
+        entry['activity'] = known.get(block)
+        factor = known.get(block, mean) if mean else 1.0
+        for group in CELL_GROUPS:
+            entry['weights'][group] *= factor
+
+    for group in CELL_GROUPS:
+        total_weight = sum(e['weights'][group] for e in blocks.values()) or 1.0
+        watts = groups.get(group, {}).get('total', 0.0)
+        for entry in blocks.values():
+            entry[group] = watts * entry['weights'][group] / total_weight
+    for entry in blocks.values():
+        del entry['weights']
+    clock = groups.get('Clock', {}).get('total', 0.0)
+    blocks[CLOCK_NETWORK] = {'cells': 0, 'flops': 0, 'activity': None, 'Sequential': 0.0,
+                             'Combinational': 0.0, 'Clock': clock}
+    for entry in blocks.values():
+        entry['total'] = entry['Sequential'] + entry['Combinational'] + entry.get('Clock', 0.0)
+    return blocks
+
+
+def print_corners(reports):
+    rows = []
+    for corner, groups in sorted(reports.items()):
+        total = groups.get('Total', {})
+        whole = total.get('total') or 1.0
+        rows.append((corner, total.get('internal'), total.get('switching'), total.get('leakage'), total.get('total'),
+                     *(100 * groups.get(g, {}).get('total', 0.0) / whole for g in ('Sequential', 'Combinational', 'Clock'))))
+    print_rows(['corner', 'internal_w', 'switching_w', 'leakage_w', 'total_w', 'seq_%', 'comb_%', 'clock_%'], rows)
+
+
+def print_blocks(blocks):
+    total = sum(e['total'] for e in blocks.values()) or 1.0
+    print_rows(['block', 'cells', 'flops', 'activity', 'seq_w', 'comb_w', 'total_w', 'share_%'],
+               [(block, e['cells'], e['flops'], e['activity'], e['Sequential'], e['Combinational'],
+                 e['total'], 100 * e['total'] / total)
+                for block, e in sorted(blocks.items(), key=lambda kv: -kv[1]['total'])])
+    qr = [e['total'] for b, e in blocks.items() if '.U_QR_' in b]
+    if qr:
+        print(f"  {len(qr)} QR instances: {sum(qr):.4g} W ({100 * sum(qr) / total:.1f}%), "
+              f"{sum(qr) / len(qr):.4g} W each on average")
+
+
+def compare_runs(database, corner, activity):
+    """One row per ingested run: total power at `corner` and the big blocks' share of it"""
+    rows = []
+    for (key,) in database.db.execute('SELECT path FROM runs ORDER BY name, path').fetchall():
+        run = Path(key) if Path(key).is_absolute() else REPO_ROOT / key
+        step, reports = power_reports(run)
+        groups = reports.get(corner)
+        if groups is None:
+            rows.append((key, None, None, None, None, None, None))
+            continue
+        try:
+            index = HierarchyIndex.for_run(database, run)
+        except FileNotFoundError:
+            rows.append((key, groups['Total']['total'], None, None, None, None, step.name))
+            continue
+        blocks = block_power(index, groups, activity)
+        column = sum(e['total'] for b, e in blocks.items() if '.U_QR_COL_' in b)
+        diagonal = sum(e['total'] for b, e in blocks.items() if '.U_QR_DIAG_' in b)
+        rows.append((key, groups['Total']['total'], column, diagonal,
+                     blocks.get(STATE_REGISTERS, {}).get('total'), blocks.get(TRNG, {}).get('total'), step.name))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate OpenSTA power reports and break them down by RTL block")
+    parser.add_argument('run', nargs='?', help="run directory (default: latest in main/rtl/runs)")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database holding the instance index")
+    parser.add_argument('--corner', default=DEFAULT_CORNER, help="corner for the block breakdown")
+    parser.add_argument('--waveform', default=str(DEFAULT_WAVEFORM),
+                        help="RTL simulation dump weighting blocks by toggle activity")
+    parser.add_argument('--no-activity', action='store_true', help="split power by cell drive strength only")
+    args = parser.parse_args()
+
+    run = Path(args.run) if args.run else latest_run()
+    if run is None:
+        print(f"❌ No runs in {RUNS_DIR}")
+        return 1
+
+    print("🔋 ChaCha20 Power Breakdown")
+    print("=" * 40)
+    step, reports = power_reports(run)
+    if not reports:
+        print(f"❌ No power.rpt in {run}")
+        return 1
+    print(f"  {step}")
+    print_corners(reports)
+    if not activity_annotated(step):
+        print("  ⚠️  No VCD/SAIF was read for this report: OpenSTA propagated its default input activity,\n"
+              "     so absolute switching power (and the combinational share) is an upper-bound guess")
+
+    activity = None
+    if not args.no_activity and Path(args.waveform).exists():
+        profile = profile_activity(args.waveform)
+        activity = BlockActivity(profile)
+        print(f"\n  Block activity from {Path(args.waveform).name} ({profile.cycles} cycles)")
+
+    groups = reports.get(args.corner)
+    if groups is None:
+        print(f"❌ No {args.corner} corner in the power reports")
+        return 1
+    database = RunDatabase(args.db)
+    try:
+        runs = find_runs(RUN_ROOTS)
+        if run.resolve() not in {Path(r).resolve() for r in runs}:
+            runs.append(run)
+        database.ingest(runs)
+        index = HierarchyIndex.for_run(database, run)
+        print(f"\n🧩 Power by block ({args.corner}, {groups['Total']['total']:.4g} W)")
+        print_blocks(block_power(index, groups, activity))
+
+        print(f"\n📈 Runs compared ({args.corner})")
+        print_rows(['run', 'total_w', 'qr_column_w', 'qr_diagonal_w', 'state_regs_w', 'trng_w', 'sta_step'],
+                   compare_runs(database, args.corner, activity))
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
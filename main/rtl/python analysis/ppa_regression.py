@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Cross-run PPA regression check for the ChaCha20 ASIC
+Compares the signoff area, timing, power and violation metrics of ingested runs against a baseline and fails on regressions
+"""
+
+import argparse
+import sys
+import time
+
+from run_database import DEFAULT_DATABASE, RUN_ROOTS, RunDatabase, find_runs, print_rows
+from step_profiler import resolve_run
+
+FINAL_STEP = 'final'
+
+# metric: (label, higher is worse, tolerance, tolerance is a fraction of the baseline)
+PPA_METRICS = {
+    'design__instance__count': ('instances', True, 0.02, True),
+    'design__instance__area': ('cell area (µm²)', True, 0.02, True),
+    'design__instance__utilization': ('utilization', True, 0.02, True),
+    'route__wirelength': ('wirelength (µm)', True, 0.05, True),
+    'timing__setup__ws': ('setup WS (ns)', False, 0.1, False),
+    'timing__setup__tns': ('setup TNS (ns)', False, 1.0, False),
+    'timing__setup_vio__count': ('setup violations', True, 0, False),
+    'timing__hold__ws': ('hold WS (ns)', False, 0.05, False),
+    'timing__hold_vio__count': ('hold violations', True, 0, False),
+    'clock__skew__worst_setup': ('setup skew (ns)', True, 0.05, False),
+    'power__total': ('power (W)', True, 0.05, True),
+    'power__leakage__total': ('leakage (W)', True, 0.05, True),
+    'ir__drop__worst': ('worst IR drop (V)', True, 0.05, True),
+    'design__max_slew_violation__count': ('max slew violations', True, 0, False),
+    'design__max_fanout_violation__count': ('max fanout violations', True, 0, False),
+    'design__max_cap_violation__count': ('max cap violations', True, 0, False),
+    'route__drc_errors': ('routing DRC errors', True, 0, False),
+    'antenna__violating__nets': ('antenna nets', True, 0, False),
+    'magic__drc_error__count': ('Magic DRC errors', True, 0, False),
+    'design__lvs_error__count': ('LVS errors', True, 0, False),
+}
+# Metrics OpenLane also reports per corner; --corners lists each one
+CORNER_METRICS = ('timing__setup__ws', 'timing__hold__ws', 'design__max_slew_violation__count',
+                  'design__max_fanout_violation__count', 'design__max_cap_violation__count', 'power__total')
+
+METRICS_QUERY = """
+SELECT metric, corner, value FROM metrics
+WHERE run_id = ? AND step = ? AND value IS NOT NULL
+"""
+
+
+def find_run(database, key):
+    """(run_id, path) by path, name or path prefix (e.g. 'basys-3'; the latest run below it)"""
+    try:
+        return resolve_run(database, key)
+    except KeyError:
+        row = database.db.execute('SELECT run_id, path FROM runs WHERE path LIKE ? ORDER BY name DESC LIMIT 1',
+                                  (key.rstrip('/') + '/%',)).fetchone()
+        if row is None:
+            raise
+        return row
+
+
+def run_metrics(database, run_id, step=FINAL_STEP):
+    """{(metric, corner): value} of one run's numeric metrics at a step"""
+    return {(metric, corner): value for metric, corner, value in database.db.execute(METRICS_QUERY, (run_id, step))}
+
+
+def parse_threshold(text):
+    """'power__total=10%' -> ('power__total', 0.1, True); 'timing__setup__ws=0.2' -> (..., 0.2, False)"""
+    metric, _, value = text.partition('=')
+    if metric not in PPA_METRICS or not value:
+        raise argparse.ArgumentTypeError(f"expected <metric>=<tolerance>[%] with a metric of: {', '.join(PPA_METRICS)}")
+    relative = value.endswith('%')
+    tolerance = float(value[:-1]) / 100 if relative else float(value)
+    if tolerance < 0:
+        raise argparse.ArgumentTypeError(f"tolerance for {metric} must not be negative: {value}")
+    return metric, tolerance, relative
+
+
+def verdict(metric, baseline, value, thresholds=PPA_METRICS):
+    """('regressed' | 'improved' | 'ok' | 'missing' | 'new', signed change where positive is worse)
+
+    'missing' (the baseline has the metric, the run does not) fails the check
+    like a regression; 'new' (only the run has it) is informational.
+    """
+    if baseline is None:
+        return 'new', None
+    if value is None:
+        return 'missing', None
+    _, higher_is_worse, tolerance, relative = thresholds[metric]
+    worse = (value - baseline) if higher_is_worse else (baseline - value)
+    allowed = tolerance * abs(baseline) if relative else tolerance
+    if worse > allowed:
+        return 'regressed', worse
+    if worse < -allowed:
+        return 'improved', worse
+    return 'ok', worse
+
+
+def compare(baseline, runs, thresholds, corners=False):
+    """[(metric, corner, baseline value, [(value, status)] per run)] over the PPA metrics"""
+    keys = [(metric, None) for metric in thresholds]
+    if corners:
+        found = sorted({c for m in (baseline, *runs) for (metric, c) in m if c and metric in CORNER_METRICS})
+        keys += [(metric, c) for metric in CORNER_METRICS if metric in thresholds for c in found]
+    rows = []
+    for metric, corner in keys:
+        base = baseline.get((metric, corner))
+        results = [(m.get((metric, corner)), verdict(metric, base, m.get((metric, corner)), thresholds)[0])
+                   for m in runs]
+        if base is None and all(value is None for value, _ in results):
+            continue
+        rows.append((metric, corner, base, results))
+    return rows
+
+
+def _number(value):
+    """Counts come back from SQLite as floats; print them as integers"""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def print_comparison(rows, thresholds, count):
+    marks = {'regressed': '❌', 'improved': '⬆️', 'ok': '✅', 'missing': '❓', 'new': '-'}
+    table = []
+    for metric, corner, base, results in rows:
+        label, higher_is_worse, tolerance, relative = thresholds[metric]
+        limit = f"{'+' if higher_is_worse else '-'}{tolerance * 100:g}%" if relative else \
+            f"{'+' if higher_is_worse else '-'}{tolerance:g}"
+        line = [label + (f" @ {corner}" if corner else ''), _number(base)]
+        for value, status in results:
+            delta = value - base if value is not None and base is not None else None
+            line += [_number(value), _number(delta), marks[status]]
+        table.append(line + [limit])
+    columns = ['metric', '[0]']
+    for i in range(1, count):
+        columns += [f'[{i}]', f'Δ[{i}]', 'status']
+    print_rows(columns + ['limit'], table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the signoff PPA of OpenLane runs and fail on regressions")
+    parser.add_argument('runs', nargs='*', help="runs by path, name or path prefix; the first is the baseline "
+                                                "(default: every ingested run, oldest first)")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database file")
+    parser.add_argument('--threshold', type=parse_threshold, action='append', default=[], metavar='METRIC=TOL',
+                        help="override a tolerance, absolute or with '%%' relative to the baseline")
+    parser.add_argument('--corners', action='store_true', help="also compare per-corner timing, DRV and power")
+    parser.add_argument('--step', default=FINAL_STEP, help="step whose metrics are compared")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="do not fail on runs or metrics missing at the step")
+    args = parser.parse_args()
+
+    thresholds = dict(PPA_METRICS)
+    for metric, tolerance, relative in args.threshold:
+        label, higher_is_worse, _, _ = thresholds[metric]
+        thresholds[metric] = (label, higher_is_worse, tolerance, relative)
+
+    print("⚖️  ChaCha20 PPA Regression Check")
+    print("=" * 40)
+    database = RunDatabase(args.db)
+    try:
+        database.ingest(find_runs(RUN_ROOTS))
+        started = time.perf_counter()
+        try:
+            if args.runs:
+                selected = [find_run(database, key) for key in args.runs]
+            else:
+                selected = database.db.execute('SELECT run_id, path FROM runs ORDER BY name, path').fetchall()
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            return 1
+        if len(selected) < 2:
+            print(f"❌ Need at least two runs to compare, found {len(selected)}")
+            return 1
+        metrics = [run_metrics(database, run_id, args.step) for run_id, _ in selected]
+    finally:
+        database.close()
+
+    for i, (_, path) in enumerate(selected):
+        print(f"  [{i}] {path}" + (" (baseline)" if i == 0 else '') + ('' if metrics[i] else f"  ⚠️  no {args.step} metrics"))
+    rows = compare(metrics[0], metrics[1:], thresholds, args.corners)
+    print(f"  {len(rows)} metrics loaded in {1e3 * (time.perf_counter() - started):.1f} ms\n")
+    print_comparison(rows, thresholds, len(selected))
+
+    empty = [f"[{i}]" for i, m in enumerate(metrics) if not m]
+    if empty and not args.allow_missing:
+        print(f"\n❌ No {args.step} metrics for {', '.join(empty)}: the run did not finish or --step is wrong")
+        return 1
+    failed = False
+    for kind, title in (('regressed', 'regressions beyond tolerance'), ('missing', 'baseline metrics missing')):
+        found = [(metric, corner, i + 1) for metric, corner, _, results in rows
+                 for i, (_, status) in enumerate(results) if status == kind]
+        if not found or (kind == 'missing' and args.allow_missing):
+            continue
+        failed = True
+        print(f"\n❌ {len(found)} {title}:")
+        for metric, corner, i in found:
+            print(f"  [{i}] {thresholds[metric][0]}" + (f" @ {corner}" if corner else ''))
+    if failed:
+        return 1
+    print(f"\n✅ No regressions against {selected[0][1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Critical-path attribution for the ChaCha20 ASIC
+Maps the cells on the worst STA paths back to RTL instances (QR column/diagonal rounds, ChaCha20, asic_top) and totals their delay
+"""
+
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+
+from run_database import DEFAULT_DATABASE, RunDatabase, run_key, print_rows
+from sta_paths import RUNS_DIR, TimingPaths, default_sta_steps, latest_run
+
+NETLIST_GLOB = '*-yosys-synthesis/*.nl.v'
+
+# Yosys netlist lines: '  sky130_fd_sc_hd__dfrtp_2 _31735_ (' then '    .Q(\chacha_unit.U_QR_COL_3.in_b[5] ),'
+# Yosys opens an instance on its own line; OpenROAD writes the first pin (or '();') after it
+CELL_LINE = re.compile(r'^\s*(\w+)\s+(\S+)\s*\((.*)$')
+PIN_LINE = re.compile(r'^\s*\.(\w+)\((.*?)\)(?:,|\);)?\s*$')
+PORT_LINE = re.compile(r'^\s*(input|output)\s+(?:\[(\d+):(\d+)\]\s+)?(\S+);$')
+OUTPUT_PINS = ('X', 'Y', 'Q', 'Q_N')
+
+TOP = 'asic_top'
+CLOCK_NETWORK = '(clock network)'
+INSERTED = '(inserted by PnR)'
+
+# Per-run cache in the run database; bump to rebuild just this table
+INSTANCES_VERSION = 1
+INSTANCES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    instance TEXT NOT NULL,
+    cell TEXT,
+    module TEXT,
+    register TEXT,
+    PRIMARY KEY (run_id, instance)
+);
+"""
+
+# QR (qr.v) has no registers: flops named after a column QR's inputs are ChaCha20's state words.
+# state[w] drives U_QR_COL_<w % 4>.in_<'abcd'[w // 4]>
+QR_PORT = re.compile(r'^(chacha_unit)\.U_QR_COL_(\d)\.in_([abcd])\[\d+\]$')
+WORDS = (1 << 16) - 1
+COLUMN_WORDS = [sum(1 << (4 * i + k) for i in range(4)) for k in range(4)]
+# U_QR_DIAG_j writes state[j], state[4 + (j+1)%4], state[8 + (j+2)%4], state[12 + (j+3)%4]
+DIAGONAL_WORDS = [sum(1 << (4 * i + (j + i) % 4) for i in range(4)) for j in range(4)]
+OTHER = 1 << 16         # any source or sink that is not a state word
+SCOPE_SHIFT = 17
+
+# Column/diagonal delay shares within this of 50% count as balanced
+ROUND_BALANCE = 0.1
+
+
+def net_name(text):
+    """Netlist identifier without Verilog escaping ('\\a.b[3] ' -> 'a.b[3]')"""
+    text = text.strip()
+    return text[1:] if text.startswith('\\') else text
+
+
+def net_scope(name):
+    """RTL instance path owning a named net ('' for the top level), or None for synthesized nets"""
+    if name.startswith('_') or "'" in name:
+        return None
+    match = QR_PORT.match(name)
+    if match:
+        return match.group(1)
+    return name.rpartition('.')[0]
+
+
+def state_word(name):
+    match = QR_PORT.match(name)
+    return 4 * 'abcd'.index(match.group(3)) + int(match.group(2)) if match else None
+
+
+def common_scope(scopes):
+    """Deepest instance path shared by every scope"""
+    scopes = [s.split('.') if s else [] for s in scopes]
+    if not scopes:
+        return ''
+    common = os.path.commonprefix(scopes)
+    return '.'.join(common)
+
+
+def module_label(scope):
+    return TOP if not scope else scope
+
+
+def read_netlist(path):
+    """({instance: (cell, {pin: net})}, input ports, output ports) of a flat Yosys or OpenROAD netlist"""
+    cells, inputs, outputs = {}, set(), set()
+    current = None
+    with open(path, 'r') as f:
+        for line in f:
+            if current is None:
+                match = CELL_LINE.match(line)
+                if match and match.group(1) != 'module':
+                    current = {}
+                    cells[net_name(match.group(2))] = (match.group(1), current)
+                    line = match.group(3)
+            if current is not None:
+                match = PIN_LINE.match(line)
+                if match:
+                    current[match.group(1)] = net_name(match.group(2))
+                if line.rstrip().endswith(');'):
+                    current = None
+                continue
+            match = PORT_LINE.match(line)
+            if match:
+                direction, msb, lsb, name = match.groups()
+                bits = [name] if msb is None else [f"{name}[{i}]" for i in range(min(int(msb), int(lsb)),
+                                                                                 max(int(msb), int(lsb)) + 1)]
+                (inputs if direction == 'input' else outputs).update(bits)
+    return cells, inputs, outputs
+
+
+def _closure(nodes, step):
+    """OR of the leaf bits reachable from every node
+
+    `step(node)` returns (leaf bits, neighbouring nodes). Iterative DFS, so
+    deep adder chains do not hit the recursion limit; a combinational loop
+    (the TRNG ring oscillators) is cut where it closes.
+    """
+    masks = {}
+    for root in nodes:
+        if root in masks:
+            continue
+        bits, neighbours = step(root)
+        masks[root] = bits
+        stack = [(root, iter(neighbours))]
+        while stack:
+            node, pending = stack[-1]
+            for other in pending:
+                if other not in masks:
+                    bits, neighbours = step(other)
+                    masks[other] = bits
+                    stack.append((other, iter(neighbours)))
+                    break
+                masks[node] |= masks[other]
+            else:
+                stack.pop()
+                if stack:
+                    masks[stack[-1][0]] |= masks[node]
+    return masks
+
+
+class HierarchyIndex:
+    """RTL instance of every cell in a flattened synthesis netlist
+
+    Only register outputs keep their RTL names after flattening, so the
+    combinational cells are placed structurally: a cell fed by the state
+    words of one column only belongs to that U_QR_COL_k, a cell fed only by
+    state words that ends up in the four words one diagonal round writes
+    belongs to that U_QR_DIAG_j, and anything else goes to the deepest
+    instance shared by the registers it reads and writes.
+    """
+
+    def __init__(self, modules, cells, registers):
+        self.modules = modules      # instance -> RTL instance path label
+        self.cells = cells          # instance -> library cell
+        self.registers = registers  # flop instance -> RTL register bit it implements ('' when unnamed)
+
+    @classmethod
+    def from_netlist(cls, path):
+        cells, inputs, outputs = read_netlist(path)
+        driver, loads = {}, {}
+        for instance, (_, pins) in cells.items():
+            for pin, net in pins.items():
+                if pin in OUTPUT_PINS:
+                    driver[net] = instance
+                else:
+                    loads.setdefault(net, []).append((instance, pin))
+        flops = {i for i, (_, pins) in cells.items() if 'CLK' in pins}
+
+        scopes = {}
+
+        def scope_bit(scope):
+            return 1 << (SCOPE_SHIFT + scopes.setdefault(scope, len(scopes)))
+
+        def register_bits(net):
+            word = state_word(net)
+            scope = net_scope(net)
+            bits = scope_bit(scope) if scope is not None else 0
+            return bits | (1 << word if word is not None else OTHER)
+
+        def fanin_step(instance):
+            bits, neighbours = 0, []
+            for pin, net in cells[instance][1].items():
+                if pin in OUTPUT_PINS:
+                    continue
+                source = driver.get(net)
+                if source is None:
+                    bits |= OTHER | scope_bit('') if net in inputs else 0
+                elif source in flops:
+                    bits |= register_bits(cells[source][1].get('Q', ''))
+                else:
+                    neighbours.append(source)
+            return bits, neighbours
+
+        def fanout_step(instance):
+            bits, neighbours = 0, []
+            for pin, net in cells[instance][1].items():
+                if pin not in OUTPUT_PINS:
+                    continue
+                if net in outputs:
+                    bits |= OTHER | scope_bit('')
+                for sink, sink_pin in loads.get(net, []):
+                    if sink in flops:
+                        if sink_pin == 'D':
+                            bits |= register_bits(cells[sink][1].get('Q', ''))
+                    else:
+                        neighbours.append(sink)
+            return bits, neighbours
+
+        logic = [i for i in cells if i not in flops]
+        fanin = _closure(logic, fanin_step)
+        fanout = _closure(logic, fanout_step)
+        names = {index: scope for scope, index in scopes.items()}
+
+        def scope_of(bits):
+            found = [names[i] for i in range(len(names)) if bits >> (SCOPE_SHIFT + i) & 1]
+            return common_scope(found)
+
+        modules = {}
+        for instance, (_, pins) in cells.items():
+            output = next((net for pin, net in pins.items() if pin in OUTPUT_PINS), '')
+            named = net_scope(output)
+            if instance in flops or named is not None:
+                if named is not None:
+                    modules[instance] = module_label(named)
+                else:
+                    source = driver.get(pins.get('D'))
+                    modules[instance] = module_label(scope_of(fanin.get(source, 0) | fanout_step(instance)[0]))
+                continue
+            into, out_of = fanin[instance], fanout[instance]
+            words = into & WORDS
+            if words and not into & OTHER:
+                columns = [k for k in range(4) if words & COLUMN_WORDS[k]]
+                diagonals = [j for j in range(4) if out_of & WORDS and not out_of & WORDS & ~DIAGONAL_WORDS[j]]
+                if len(columns) == 1:
+                    modules[instance] = f"chacha_unit.U_QR_COL_{columns[0]}"
+                    continue
+                if len(diagonals) == 1 and not out_of & OTHER:
+                    modules[instance] = f"chacha_unit.U_QR_DIAG_{diagonals[0]}"
+                    continue
+            modules[instance] = module_label(scope_of(into | out_of))
+        registers = {i: pins.get('Q', '') if net_scope(pins.get('Q', '')) is not None else ''
+                     for i, (_, pins) in cells.items() if i in flops}
+        return cls(modules, {i: cell for i, (cell, _) in cells.items()}, registers)
+
+    @classmethod
+    def for_run(cls, database, run):
+        """Index of an ingested run's synthesis netlist, parsed once and then read back from the run database"""
+        # Re-ingesting a changed run drops its stored instances with it
+        database.cache_table('instances', INSTANCES_VERSION, INSTANCES_SCHEMA)
+        run_id = database.db.execute('SELECT run_id FROM runs WHERE path = ?', (run_key(run),)).fetchone()[0]
+        stored = database.db.execute('SELECT instance, cell, module, register FROM instances WHERE run_id = ?',
+                                     (run_id,)).fetchall()
+        if stored:
+            return cls({i: m for i, _, m, _ in stored}, {i: c for i, c, _, _ in stored},
+                       {i: reg for i, _, _, reg in stored if reg is not None})
+
+        netlists = sorted(Path(run).glob(NETLIST_GLOB))
+        if not netlists:
+            raise FileNotFoundError(f"No synthesis netlist ({NETLIST_GLOB}) in {run}")
+        index = cls.from_netlist(netlists[-1])
+        with database.db:
+            database.db.executemany('INSERT INTO instances VALUES (?, ?, ?, ?, ?)',
+                                    [(run_id, i, index.cells[i], m, index.registers.get(i))
+                                     for i, m in index.modules.items()])
+        print(f"  🧬 Indexed {len(index.modules)} instances from {netlists[-1].name}")
+        return index
+
+    def module_counts(self):
+        counts = {}
+        for module in self.modules.values():
+            counts[module] = counts.get(module, 0) + 1
+        return counts
+
+
+def attribute_stages(index, path, stages):
+    """[(module, stage)] along one path; clock tree rows and PnR-inserted buffers are labelled separately"""
+    startpoint = path['startpoint']
+    launched = False
+    module = INSERTED
+    attributed = []
+    for stage in stages:
+        instance, _, pin = stage['pin'].rpartition('/')
+        if not launched:
+            # Data starts at the launching flop's output, or at the input port itself
+            if stage['pin'] == startpoint or (instance == startpoint and pin != 'CLK'):
+                launched = True
+            else:
+                attributed.append((CLOCK_NETWORK, stage))
+                continue
+        # Buffers added after synthesis extend the net of the cell before them
+        module = index.modules.get(instance, module if instance else TOP)
+        attributed.append((module, stage))
+    return attributed
+
+
+def round_of(module):
+    if '.U_QR_COL_' in module:
+        return 'column'
+    if '.U_QR_DIAG_' in module:
+        return 'diagonal'
+    return 'other'
+
+
+def attribute_paths(index, timing, selected):
+    """Per-module delay totals and per-path round split over the selected paths
+
+    The split of a path is its data delay up to the first diagonal-round
+    stage: what a register between the column and diagonal rounds would
+    leave in front of it.
+    """
+    totals = {}
+    splits = []
+    for i in selected:
+        path = timing.paths[i]
+        rounds = {'clock': 0.0, 'column': 0.0, 'diagonal': 0.0, 'other': 0.0, 'before_diagonal': None}
+        data = 0.0
+        for module, stage in attribute_stages(index, path, timing.stages_of(i)):
+            entry = totals.setdefault(module, {'delay': 0.0, 'stages': 0, 'paths': set()})
+            entry['delay'] += stage['delay']
+            entry['stages'] += 1
+            entry['paths'].add(i)
+            kind = 'clock' if module == CLOCK_NETWORK else round_of(module)
+            if kind == 'diagonal' and rounds['before_diagonal'] is None:
+                rounds['before_diagonal'] = data
+            if kind != 'clock':
+                data += stage['delay']
+            rounds[kind] += stage['delay']
+        rounds['data'] = data
+        splits.append((i, rounds))
+    return totals, splits
+
+
+def print_attribution(index, timing, selected, clock_period):
+    totals, splits = attribute_paths(index, timing, selected)
+    data = sum(t['delay'] for m, t in totals.items() if m != CLOCK_NETWORK) or 1.0
+    print(f"\n🧩 Delay by RTL instance over {len(selected)} worst setup paths")
+    print_rows(['module', 'delay_ns', 'data_%', 'per_path_ns', 'stages', 'paths'],
+               [(m, t['delay'], None if m == CLOCK_NETWORK else 100 * t['delay'] / data,
+                 t['delay'] / len(t['paths']), t['stages'], len(t['paths']))
+                for m, t in sorted(totals.items(), key=lambda kv: -kv[1]['delay'])])
+
+    worst = selected[0]
+    path = timing.paths[worst]
+    print(f"\n🛤️  Worst path {path['startpoint']} -> {path['endpoint']} ({path['step']}, {path['corner']}, "
+          f"slack {path['slack']:.3f})")
+    segments = []
+    for module, stage in attribute_stages(index, path, timing.stages_of(worst)):
+        if segments and segments[-1][0] == module:
+            segments[-1][1] += 1
+            segments[-1][2] += stage['delay']
+            segments[-1][3] = stage['time']
+        else:
+            segments.append([module, 1, stage['delay'], stage['time']])
+    print_rows(['module', 'stages', 'delay_ns', 'arrival_ns'], segments)
+
+    print(f"\n✂️  Column vs diagonal rounds (clock period {clock_period or '?'} ns)")
+    rows = []
+    for i, rounds in splits:
+        p = timing.paths[i]
+        before = rounds['before_diagonal'] if rounds['column'] else None
+        split = max(before, rounds['data'] - before) if before is not None else None
+        rows.append((p['startpoint'], p['endpoint'], p['slack'], rounds['clock'], rounds['column'],
+                     rounds['diagonal'], rounds['other'], split))
+    print_rows(['startpoint', 'endpoint', 'slack', 'clock_ns', 'column_ns', 'diagonal_ns', 'other_ns',
+                'split_stage_ns'], rows)
+    column = sum(r['column'] for _, r in splits)
+    diagonal = sum(r['diagonal'] for _, r in splits)
+    if not column and not diagonal:
+        print("  None of these paths run through the QR rounds")
+        return
+    share = column / (column + diagonal)
+    print(f"  Column rounds carry {100 * share:.0f}% of the QR delay, diagonal rounds {100 * (1 - share):.0f}%")
+    if abs(share - 0.5) <= ROUND_BALANCE:
+        print("  Balanced: one register between the column and diagonal rounds splits these paths evenly")
+    else:
+        print(f"  Pipeline inside the {'column' if share > 0.5 else 'diagonal'} rounds first")
+    split = [r[-1] for r in rows if r[-1] is not None]
+    if split:
+        print(f"  With that register the longest half is {max(split):.2f} ns of data delay "
+              f"against the {clock_period or '?'} ns period")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attribute the worst STA paths of an OpenLane run to RTL instances")
+    parser.add_argument('run', nargs='?', help="run directory (default: latest in main/rtl/runs)")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database holding the instance index")
+    parser.add_argument('--step', help="STA step to read paths from (default: post-PnR signoff STA)")
+    parser.add_argument('--corner', help="corner to read paths from (default: the one with the worst path)")
+    parser.add_argument('--top', type=int, default=20, help="worst endpoints to attribute")
+    args = parser.parse_args()
+
+    run = Path(args.run) if args.run else latest_run()
+    if run is None:
+        print(f"❌ No runs in {RUNS_DIR}")
+        return 1
+
+    print("🧭 ChaCha20 Critical-Path RTL Attribution")
+    print("=" * 40)
+    database = RunDatabase(args.db)
+    try:
+        database.ingest([run])
+        try:
+            index = HierarchyIndex.for_run(database, run)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return 1
+        clock_period = database.db.execute('SELECT clock_period FROM runs WHERE path = ?',
+                                           (run_key(run),)).fetchone()[0]
+    finally:
+        database.close()
+
+    print(f"\n🏗️  Cells per RTL instance ({len(index.modules)} total)")
+    print_rows(['module', 'cells'], sorted(index.module_counts().items(), key=lambda kv: -kv[1]))
+
+    steps = default_sta_steps(run)
+    timing = TimingPaths.load(steps)
+    step = args.step or (steps[0].name if steps else None)
+    setup = timing.select(args.corner, 'max', step)
+    if not setup.any():
+        print("❌ No setup paths in the STA reports")
+        return 1
+    corner = args.corner or timing.paths[setup][timing.paths['slack'][setup].argmin()]['corner']
+    selected = timing.worst_per_endpoint(1, corner, 'max', step)[:args.top]
+    print(f"\n  Paths from {step} ({corner})")
+    print_attribution(index, timing, selected, clock_period)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+OpenLane run-directory ingester for the ChaCha20 ASIC
+Loads every flow metric, step runtime and peak-RSS figure into a SQLite database keyed by run and step
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+RUN_ROOTS = [REPO_ROOT / 'main' / 'rtl' / 'runs', REPO_ROOT / 'basys-3' / 'rtl' / 'runs']
+DEFAULT_DATABASE = Path(__file__).resolve().parent / 'openlane_runs.sqlite'
+
+# Step directories are '<ordinal>-<tool>-<step>', e.g. 35-openroad-stamidpnr-1
+STEP_DIR = re.compile(r'^(\d+)-([a-z0-9]+)-(.+)$')
+STATS_SUFFIX = '.process_stats.json'
+FINAL_STEP = 'final'
+
+# Bump when the tables change; older databases are rebuilt from the run directories
+SCHEMA_VERSION = 7
+TABLES = ('metrics', 'processes', 'steps', 'runs')
+
+MEMORY_UNITS = {'B': 1 / 1024 ** 2, 'KiB': 1 / 1024, 'MiB': 1.0, 'GiB': 1024.0, 'TiB': 1024.0 ** 2}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    design TEXT,
+    name TEXT,
+    pdk TEXT,
+    std_cell_library TEXT,
+    clock_period REAL,
+    fingerprint TEXT,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    ordinal INTEGER,
+    tool TEXT,
+    name TEXT,
+    runtime_s REAL,
+    PRIMARY KEY (run_id, step)
+);
+CREATE TABLE IF NOT EXISTS processes (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    process TEXT NOT NULL,
+    runtime_s REAL,
+    cpu_user_s REAL,
+    cpu_system_s REAL,
+    peak_cpu_percent REAL,
+    avg_cpu_percent REAL,
+    peak_threads INTEGER,
+    avg_threads REAL,
+    peak_rss_mib REAL,
+    peak_vms_mib REAL,
+    avg_rss_mib REAL,
+    PRIMARY KEY (run_id, step, process)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    corner TEXT,
+    value REAL,
+    text TEXT,
+    PRIMARY KEY (run_id, step, name)
+);
+CREATE INDEX IF NOT EXISTS metrics_by_metric ON metrics (metric, corner);
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER
+);
+"""
+
+
+def parse_duration(text):
+    """'00:01:02.345' (OpenLane runtime format) -> seconds"""
+    seconds = 0.0
+    for part in text.strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_memory(text):
+    """'470MiB' -> 470.0 (MiB)"""
+    match = re.match(r'^\s*([\d.]+)\s*([KMGT]?i?B)\s*$', str(text))
+    if not match:
+        return None
+    return float(match.group(1)) * MEMORY_UNITS.get(match.group(2), 1.0)
+
+
+def split_metric(name):
+    """OpenLane metric name -> (metric without its corner modifier, corner or None)
+
+    'timing__setup__ws__corner:nom_tt_025C_1v80' -> ('timing__setup__ws', 'nom_tt_025C_1v80')
+    """
+    parts = name.split('__')
+    corner = None
+    kept = []
+    for part in parts:
+        if part.startswith('corner:'):
+            corner = part[len('corner:'):]
+        else:
+            kept.append(part)
+    return '__'.join(kept), corner
+
+
+def metric_value(value):
+    """(numeric value, text) columns for one metric value"""
+    if value is None:
+        return None, None
+    if isinstance(value, bool):
+        return float(value), None
+    if isinstance(value, (int, float)):
+        return float(value), None
+    if isinstance(value, str):
+        try:
+            return float(value), None
+        except ValueError:
+            return None, value
+    return None, json.dumps(value)
+
+
+def read_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def find_runs(roots):
+    """Run directories (those holding numbered step directories) below or at each root"""
+    runs = []
+    for root in roots:
+        root = Path(root)
+        if not root.is_dir():
+            continue
+        candidates = [root] + sorted(p for p in root.iterdir() if p.is_dir())
+        for path in candidates:
+            if any(STEP_DIR.match(entry.name) and entry.is_dir() for entry in os.scandir(path)):
+                runs.append(path)
+    return runs
+
+
+def run_key(path):
+    """Database key for a run: its path relative to the repo root when inside it"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def run_fingerprint(path):
+    """Changes whenever a step directory or the final metrics are added or rewritten"""
+    sha = hashlib.sha1()
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        sha.update(f"{entry.name}:{entry.stat().st_mtime_ns}\n".encode())
+    final = Path(path) / FINAL_STEP / 'metrics.json'
+    if final.exists():
+        st = final.stat()
+        sha.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    return sha.hexdigest()
+
+
+def read_step(step_dir):
+    """Runtime, per-process statistics and OpenROAD metrics of one step directory"""
+    step_dir = Path(step_dir)
+    result = {'step': step_dir.name, 'runtime_s': None, 'processes': [], 'metrics': {}}
+    match = STEP_DIR.match(step_dir.name)
+    result['ordinal'], result['tool'], result['name'] = \
+        (int(match.group(1)), match.group(2), match.group(3)) if match else (None, None, step_dir.name)
+
+    runtime = step_dir / 'runtime.txt'
+    if runtime.exists():
+        result['runtime_s'] = parse_duration(runtime.read_text())
+    metrics = step_dir / 'or_metrics_out.json'
+    if metrics.exists():
+        result['metrics'] = read_json(metrics)
+    if step_dir.name == FINAL_STEP and (step_dir / 'metrics.json').exists():
+        result['metrics'] = read_json(step_dir / 'metrics.json')
+
+    for dirpath, _, files in os.walk(step_dir):
+        for filename in files:
+            if not filename.endswith(STATS_SUFFIX):
+                continue
+            path = Path(dirpath) / filename
+            stats = read_json(path)
+            times = stats.get('time', {})
+            peak = stats.get('peak_resources', {})
+            average = stats.get('avg_resources', {})
+            process = path.relative_to(step_dir).as_posix()[:-len(STATS_SUFFIX)]
+            result['processes'].append({
+                'process': process,
+                'runtime_s': parse_duration(times['runtime']) if 'runtime' in times else None,
+                'cpu_user_s': parse_duration(times['cpu_time_user']) if 'cpu_time_user' in times else None,
+                'cpu_system_s': parse_duration(times['cpu_time_system']) if 'cpu_time_system' in times else None,
+                'peak_cpu_percent': peak.get('cpu_percent'),
+                'avg_cpu_percent': average.get('cpu_percent'),
+                'peak_threads': peak.get('threads'),
+                'avg_threads': average.get('threads'),
+                'peak_rss_mib': parse_memory(peak.get('memory_rss')),
+                'peak_vms_mib': parse_memory(peak.get('memory_vms')),
+                'avg_rss_mib': parse_memory(average.get('memory_rss'))
+            })
+    return result
+
+
+class RunDatabase:
+    """SQLite store of OpenLane runs; ingest() only reads runs that are new or changed"""
+
+    def __init__(self, path=DEFAULT_DATABASE):
+        self.path = str(path)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA foreign_keys = ON')
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            # Derived caches hang off run_id, so they go with the runs
+            existing = [name for (name,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            with self.db:
+                for table in [t for t in existing if t not in TABLES] + list(TABLES):
+                    self.db.execute(f'DROP TABLE IF EXISTS {table}')
+            self.db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def cache_table(self, name, version, schema):
+        """Create an analysis tool's derived per-run table; a version change rebuilds only that table"""
+        stored = self.db.execute('SELECT version FROM cache_versions WHERE name = ?', (name,)).fetchone()
+        if stored is None or stored[0] != version:
+            with self.db:
+                self.db.execute(f'DROP TABLE IF EXISTS {name}')
+                self.db.execute('INSERT OR REPLACE INTO cache_versions VALUES (?, ?)', (name, version))
+        self.db.executescript(schema)
+
+    def known_fingerprints(self):
+        return dict(self.db.execute('SELECT path, fingerprint FROM runs'))
+
+    def stale_runs(self, runs, force=False):
+        """[(run path, key, fingerprint)] for runs missing from or outdated in the database"""
+        known = self.known_fingerprints()
+        stale = []
+        for path in runs:
+            key = run_key(path)
+            fingerprint = run_fingerprint(path)
+            if force or known.get(key) != fingerprint:
+                stale.append((path, key, fingerprint))
+        return stale
+
+    def ingest(self, runs, force=False, workers=None):
+        """Read stale runs (all their steps in parallel) and store them; returns {key: step count}"""
+        stale = self.stale_runs(runs, force)
+        print(f"🗄️  {len(runs)} runs: {len(runs) - len(stale)} up to date, {len(stale)} to ingest")
+        ingested = {}
+        if not stale:
+            return ingested
+
+        # Small JSON and text files: reads overlap fine in threads
+        step_dirs = {key: [p for p in sorted(Path(path).iterdir())
+                           if p.is_dir() and (STEP_DIR.match(p.name) or p.name == FINAL_STEP)]
+                     for path, key, _ in stale}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {key: [pool.submit(read_step, d) for d in dirs] for key, dirs in step_dirs.items()}
+            for path, key, fingerprint in stale:
+                steps = [future.result() for future in futures[key]]
+                self.store_run(path, key, fingerprint, steps)
+                ingested[key] = len(steps)
+                print(f"  ✅ {key}: {len(steps)} steps")
+        return ingested
+
+    def store_run(self, path, key, fingerprint, steps):
+        """Replace everything stored for one run in a single transaction"""
+        resolved = {}
+        if (Path(path) / 'resolved.json').exists():
+            resolved = read_json(Path(path) / 'resolved.json')
+        with self.db:
+            self.db.execute('DELETE FROM runs WHERE path = ?', (key,))
+            cursor = self.db.execute(
+                'INSERT INTO runs (path, design, name, pdk, std_cell_library, clock_period, fingerprint, ingested_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, resolved.get('DESIGN_NAME'), Path(path).name, resolved.get('PDK'),
+                 resolved.get('STD_CELL_LIBRARY'), resolved.get('CLOCK_PERIOD'), fingerprint,
+                 time.strftime('%Y-%m-%d %H:%M:%S')))
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                'INSERT INTO steps VALUES (?, ?, ?, ?, ?, ?)',
+                [(run_id, s['step'], s['ordinal'], s['tool'], s['name'], s['runtime_s']) for s in steps])
+            self.db.executemany(
+                'INSERT INTO processes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, s['step'], p['process'], p['runtime_s'], p['cpu_user_s'], p['cpu_system_s'],
+                  p['peak_cpu_percent'], p['avg_cpu_percent'], p['peak_threads'], p['avg_threads'],
+                  p['peak_rss_mib'], p['peak_vms_mib'], p['avg_rss_mib'])
+                 for s in steps for p in s['processes']])
+            self.db.executemany(
+                'INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, s['step'], name, *split_metric(name), *metric_value(value))
+                 for s in steps for name, value in s['metrics'].items()])
+        return run_id
+
+    def query(self, sql, params=()):
+        """(column names, rows) for an SQL query"""
+        cursor = self.db.execute(sql, params)
+        return [d[0] for d in cursor.description], cursor.fetchall()
+
+
+# Headline PPA figures per run, read from the signoff metrics
+SUMMARY_QUERY = """
+SELECT r.path AS run,
+       (SELECT COUNT(*) FROM steps s WHERE s.run_id = r.run_id AND s.ordinal IS NOT NULL) AS steps,
+       (SELECT SUM(runtime_s) FROM steps s WHERE s.run_id = r.run_id) AS runtime_s,
+       (SELECT MAX(peak_rss_mib) FROM processes p WHERE p.run_id = r.run_id) AS peak_rss_mib,
+       (SELECT value FROM metrics m WHERE m.run_id = r.run_id AND m.step = 'final'
+            AND m.name = 'design__instance__count') AS instances,
+       (SELECT value FROM metrics m WHERE m.run_id = r.run_id AND m.step = 'final'
+            AND m.name = 'timing__setup__ws') AS setup_ws,
+       (SELECT value FROM metrics m WHERE m.run_id = r.run_id AND m.step = 'final'
+            AND m.name = 'power__total') AS power_w
+FROM runs r ORDER BY r.path
+"""
+
+
+def print_rows(columns, rows):
+    def fmt(value):
+        if isinstance(value, float):
+            return f"{value:.4g}"
+        return '-' if value is None else str(value)
+
+    cells = [[fmt(v) for v in row] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in cells:
+        print('  '.join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest OpenLane run directories into a SQLite database")
+    parser.add_argument('runs', nargs='*', help="run directories or directories of runs "
+                                                "(default: main/rtl/runs and basys-3/rtl/runs)")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database file")
+    parser.add_argument('--force', action='store_true', help="re-read runs that are already ingested")
+    parser.add_argument('--workers', type=int, help="reader threads (default: Python's executor default)")
+    parser.add_argument('--query', metavar='SQL', help="run a query against the database and print it")
+    args = parser.parse_args()
+
+    print("🗄️  ChaCha20 OpenLane Run Database")
+    print("=" * 40)
+
+    database = RunDatabase(args.db)
+    try:
+        if args.query:
+            print_rows(*database.query(args.query))
+            return 0
+
+        runs = find_runs(args.runs or RUN_ROOTS)
+        if not runs:
+            print("❌ No OpenLane run directories found")
+            return 1
+        started = time.perf_counter()
+        database.ingest(runs, args.force, args.workers)
+        print(f"  ({time.perf_counter() - started:.2f}s) -> {args.db}\n")
+        print_rows(*database.query(SUMMARY_QUERY))
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Multi-corner OpenSTA report parser for the ChaCha20 ASIC
+Streams report_checks path reports and violator lists into NumPy structured arrays for slack analytics
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from run_database import REPO_ROOT, print_rows
+
+RUNS_DIR = REPO_ROOT / 'main' / 'rtl' / 'runs'
+
+# OpenLane corner directory names, e.g. nom_tt_025C_1v80
+CORNER_DIR = re.compile(r'^(nom|min|max)_[a-z]{2}_\w+$')
+CORNER_HEADING = re.compile(r'^=+ (\S+) Corner =+$')
+VIOLATOR = re.compile(r'^\[(\w+) ([\w-]+)\] (\S+) -> (\S+) : (\S+)$')
+SUMMARY = re.compile(r'^(\S+): (\S+)$')
+
+# Path reports written by the STA steps; violator lists and single-number summaries are read separately
+PATH_REPORTS = ('max.rpt', 'min.rpt', 'checks.rpt')
+SUMMARY_REPORTS = ('wns.max.rpt', 'wns.min.rpt', 'tns.max.rpt', 'tns.min.rpt', 'ws.max.rpt', 'ws.min.rpt')
+
+PATH_DTYPE = np.dtype([
+    ('step', 'U40'), ('corner', 'U24'), ('report', 'U48'), ('group', 'U24'), ('path_type', 'U4'),
+    ('startpoint', 'U64'), ('endpoint', 'U64'),
+    ('arrival', 'f8'), ('required', 'f8'), ('slack', 'f8'),
+    ('first_stage', 'i8'), ('stages', 'i4')
+])
+STAGE_DTYPE = np.dtype([
+    ('path', 'i8'), ('pin', 'U64'), ('cell', 'U40'), ('net', 'U96'), ('edge', 'U1'),
+    ('fanout', 'i4'), ('cap', 'f8'), ('slew', 'f8'), ('delay', 'f8'), ('time', 'f8')
+])
+VIOLATOR_DTYPE = np.dtype([
+    ('step', 'U40'), ('corner', 'U24'), ('check', 'U8'), ('kind', 'U16'),
+    ('startpoint', 'U64'), ('endpoint', 'U64'), ('slack', 'f8')
+])
+
+
+def _is_number(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def stream_paths(path, corner=None):
+    """Yield (path record, [stage records]) for every path in an OpenSTA report_checks file
+
+    Stages are the data path pins up to the data arrival time, each carrying
+    the net it drives. The corner comes from the '=== <corner> Corner ==='
+    heading, falling back to `corner`.
+    """
+    report = ''
+    record = None
+    stages = []
+    in_data_path = False
+    with open(path, 'r') as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.startswith('report_'):
+                report = stripped
+                continue
+            heading = CORNER_HEADING.match(stripped)
+            if heading:
+                corner = heading.group(1)
+                continue
+            if stripped.startswith('Startpoint: '):
+                record = {'corner': corner or '', 'report': report, 'group': '', 'path_type': '',
+                          'startpoint': stripped.split()[1], 'endpoint': '',
+                          'arrival': np.nan, 'required': np.nan}
+                stages = []
+                in_data_path = True
+                continue
+            if record is None:
+                continue
+            if stripped.startswith('Endpoint: '):
+                record['endpoint'] = stripped.split()[1]
+                continue
+            if stripped.startswith('Path Group: '):
+                record['group'] = stripped[len('Path Group: '):]
+                continue
+            if stripped.startswith('Path Type: '):
+                record['path_type'] = stripped[len('Path Type: '):]
+                continue
+
+            tokens = stripped.split()
+            if tokens[-1] == '(net)' and len(tokens) == 2:
+                if in_data_path and stages:
+                    stages[-1]['net'] = tokens[0]
+                continue
+            n = 0
+            while n < len(tokens) and _is_number(tokens[n]):
+                n += 1
+            if n == 0:
+                continue
+            numbers = [float(t) for t in tokens[:n]]
+            rest = tokens[n:]
+            if rest[:2] == ['slack', '(VIOLATED)'] or rest[:2] == ['slack', '(MET)']:
+                record['slack'] = numbers[-1]
+                yield record, stages
+                record = None
+            elif rest == ['data', 'arrival', 'time']:
+                record['arrival'] = abs(numbers[-1])
+                in_data_path = False
+            elif rest == ['data', 'required', 'time']:
+                record['required'] = numbers[-1]
+            elif in_data_path and len(rest) == 3 and rest[0] in ('^', 'v') and rest[2].startswith('('):
+                # Columns fill from the right: fanout, cap, slew, delay, time
+                padded = [None] * (5 - n) + numbers
+                stages.append({'pin': rest[1], 'cell': rest[2].strip('()'), 'net': '', 'edge': rest[0],
+                               'fanout': int(padded[0]) if padded[0] is not None else 0,
+                               'cap': padded[1] if padded[1] is not None else np.nan,
+                               'slew': padded[2] if padded[2] is not None else np.nan,
+                               'delay': padded[3], 'time': padded[4]})
+
+
+def read_violators(path, step='', corner=''):
+    """Violator list entries ('[setup reg-reg] a/Q -> b/D : -6.58') as tuples"""
+    rows = []
+    with open(path, 'r') as f:
+        for line in f:
+            match = VIOLATOR.match(line.strip())
+            if match:
+                check, kind, start, end, slack = match.groups()
+                # Pins ('_31735_/Q') name the same points as the path reports' instances ('_31735_')
+                rows.append((step, corner, check, kind, start.rpartition('/')[0] or start,
+                             end.rpartition('/')[0] or end, float(slack)))
+    return rows
+
+
+def read_summary(path):
+    """{corner: value} from a wns/tns/ws summary report"""
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            match = SUMMARY.match(line.strip())
+            if match:
+                try:
+                    values[match.group(1)] = float(match.group(2))
+                except ValueError:
+                    pass
+    return values
+
+
+def corner_of(report_path):
+    name = Path(report_path).parent.name
+    return name if CORNER_DIR.match(name) else None
+
+
+class TimingPaths:
+    """Every parsed path, its stages and the violator lists, as structured arrays"""
+
+    def __init__(self, paths, stages, violators, summary):
+        self.paths = paths
+        self.stages = stages
+        self.violators = violators
+        self.summary = summary      # {step: {'wns.max': {corner: value}, ...}}
+
+    @classmethod
+    def load(cls, step_dirs):
+        """Parse the path reports, violator lists and summaries below the given STA step directories"""
+        path_rows, stage_rows, violator_rows, summary = [], [], [], {}
+        # checks.rpt repeats the worst path in its unconstrained and --slack_max sections; keep one copy
+        parsed = set()
+        for step_dir in step_dirs:
+            step = Path(step_dir).name
+            reports = sorted(Path(step_dir).rglob('*.rpt'))
+            seen = set()
+            for report in reports:
+                if report.name not in PATH_REPORTS:
+                    continue
+                for record, stages in stream_paths(report, corner_of(report)):
+                    seen.add(record['corner'])
+                    key = (step, record['corner'], record['startpoint'], record['endpoint'], record['path_type'])
+                    if key in parsed:
+                        continue
+                    parsed.add(key)
+                    index = len(path_rows)
+                    path_rows.append((step, record['corner'], record['report'][:48], record['group'],
+                                      record['path_type'], record['startpoint'], record['endpoint'],
+                                      record['arrival'], record['required'], record['slack'],
+                                      len(stage_rows), len(stages)))
+                    stage_rows.extend((index, s['pin'], s['cell'], s['net'], s['edge'], s['fanout'],
+                                       s['cap'], s['slew'], s['delay'], s['time']) for s in stages)
+            # Single-corner steps keep their reports at the top level; name the corner from the path reports
+            step_corner = seen.pop() if len(seen) == 1 else ''
+            for report in reports:
+                corner = corner_of(report)
+                if report.name == 'violator_list.rpt':
+                    violator_rows.extend(read_violators(report, step, corner or step_corner))
+                elif report.name in SUMMARY_REPORTS:
+                    summary.setdefault(step, {}).setdefault(report.name[:-len('.rpt')], {}).update(
+                        read_summary(report))
+        return cls(np.array(path_rows, dtype=PATH_DTYPE), np.array(stage_rows, dtype=STAGE_DTYPE),
+                   np.array(violator_rows, dtype=VIOLATOR_DTYPE), summary)
+
+    def corners(self):
+        """(step, corner) pairs present in the paths or violator lists"""
+        pairs = set(zip(self.paths['step'], self.paths['corner']))
+        pairs |= set(zip(self.violators['step'], self.violators['corner']))
+        return sorted(pairs)
+
+    def select(self, corner=None, path_type=None, step=None):
+        """Boolean mask over paths"""
+        mask = np.ones(len(self.paths), dtype=bool)
+        if step is not None:
+            mask &= self.paths['step'] == step
+        if corner is not None:
+            mask &= self.paths['corner'] == corner
+        if path_type is not None:
+            mask &= self.paths['path_type'] == path_type
+        return mask
+
+    def worst_per_endpoint(self, n=1, corner=None, path_type='max', step=None):
+        """Indices of the n worst paths into each endpoint, worst endpoint first"""
+        index = np.flatnonzero(self.select(corner, path_type, step))
+        if len(index) == 0:
+            return index
+        # Sort by endpoint, then slack; keep the first n rows of each endpoint run
+        order = index[np.lexsort((self.paths['slack'][index], self.paths['endpoint'][index]))]
+        endpoints = self.paths['endpoint'][order]
+        starts = np.flatnonzero(np.r_[True, endpoints[1:] != endpoints[:-1]])
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        kept = order[rank < n]
+        return kept[np.argsort(self.paths['slack'][kept], kind='stable')]
+
+    def slacks(self, corner=None, path_type='max', step=None, include_violators=True):
+        """Path slacks, extended by the violator-list slacks of the same check that have no parsed path"""
+        mask = self.select(corner, path_type, step)
+        slack = self.paths['slack'][mask]
+        if include_violators and len(self.violators):
+            check = 'setup' if path_type == 'max' else 'hold'
+            vmask = self.violators['check'] == check
+            if step is not None:
+                vmask &= self.violators['step'] == step
+            if corner is not None:
+                vmask &= self.violators['corner'] == corner
+            fields = ['step', 'corner', 'startpoint', 'endpoint']
+            parsed = set(zip(*(self.paths[f][mask] for f in fields)))
+            vmask &= [key not in parsed for key in zip(*(self.violators[f] for f in fields))]
+            slack = np.concatenate((slack, self.violators['slack'][vmask]))
+        return slack[np.isfinite(slack)]
+
+    def worst_corner(self, step=None, path_type='max'):
+        """Corner with the lowest slack in a step, or None without any"""
+        worst = {}
+        for s, corner in self.corners():
+            slack = self.slacks(corner, path_type, s) if step is None or s == step else []
+            if len(slack):
+                worst[corner] = min(worst.get(corner, np.inf), slack.min())
+        return min(worst, key=worst.get) if worst else None
+
+    def slack_histogram(self, bins=20, corner=None, path_type='max', include_violators=True, step=None):
+        """(counts, edges) of path slack; violator-list slacks extend the path reports"""
+        return np.histogram(self.slacks(corner, path_type, step, include_violators), bins=bins)
+
+    def paths_through(self, pattern):
+        """Indices of paths with a stage pin or net containing `pattern`"""
+        if len(self.stages) == 0:
+            return np.zeros(0, dtype=np.int64)
+        hit = (np.char.find(self.stages['net'], pattern) >= 0) | (np.char.find(self.stages['pin'], pattern) >= 0)
+        return np.unique(self.stages['path'][hit])
+
+    def critical_through(self, pattern='U_QR_', corner=None, path_type='max'):
+        """Index of the worst path through any instance matching `pattern`, or None"""
+        index = self.paths_through(pattern)
+        index = index[self.select(corner, path_type)[index]]
+        if len(index) == 0:
+            return None
+        return int(index[np.argmin(self.paths['slack'][index])])
+
+    def stages_of(self, i):
+        start = self.paths['first_stage'][i]
+        return self.stages[start:start + self.paths['stages'][i]]
+
+
+def latest_run(runs_dir=RUNS_DIR):
+    runs = sorted(p for p in Path(runs_dir).iterdir() if p.is_dir() and p.name.startswith('RUN_'))
+    return runs[-1] if runs else None
+
+
+def default_sta_steps(run):
+    """The post-PnR STA step (all nine corners) plus the last mid-PnR STA that wrote full path reports"""
+    post = sorted(run.glob('*-openroad-stapostpnr'))
+    mid = sorted((p for p in run.glob('*-openroad-stamidpnr*') if (p / 'max.rpt').exists()),
+                 key=lambda p: int(p.name.split('-')[0]))
+    return post[-1:] + mid[-1:]
+
+
+def signoff_step(steps):
+    """Name of the last post-PnR STA step among `steps` (else the first step)"""
+    post = [Path(s).name for s in steps if Path(s).name.endswith('-openroad-stapostpnr')]
+    return post[-1] if post else Path(steps[0]).name
+
+
+def print_histogram(counts, edges, width=40):
+    peak = max(counts.max(), 1) if len(counts) else 1
+    for count, lo, hi in zip(counts, edges[:-1], edges[1:]):
+        print(f"  {lo:9.3f} .. {hi:9.3f} {count:6d} {'█' * int(round(width * count / peak))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse OpenSTA reports from an OpenLane run into slack analytics")
+    parser.add_argument('steps', nargs='*', help="STA step directories (default: post-PnR and last mid-PnR "
+                                                 "STA of the latest run in main/rtl/runs)")
+    parser.add_argument('--corner', help="restrict queries to one corner")
+    parser.add_argument('--top', type=int, default=10, help="endpoints in the worst-path table")
+    parser.add_argument('--per-endpoint', type=int, default=1, help="paths kept per endpoint")
+    parser.add_argument('--through', default='U_QR_', help="instance pattern for the critical path query")
+    parser.add_argument('--bins', type=int, default=16, help="slack histogram bins")
+    parser.add_argument('--step', help="STA step of the slack histogram, or 'all' to mix every loaded step "
+                                       "(default: the post-PnR signoff step)")
+    parser.add_argument('--save', metavar='NPZ', help="write the parsed arrays to a .npz file")
+    args = parser.parse_args()
+
+    steps = [Path(s) for s in args.steps]
+    if not steps:
+        run = latest_run()
+        if run is None:
+            print(f"❌ No runs in {RUNS_DIR}")
+            return 1
+        steps = default_sta_steps(run)
+
+    print("⏲️  ChaCha20 Multi-Corner STA Analytics")
+    print("=" * 40)
+    timing = TimingPaths.load(steps)
+    for step in steps:
+        print(f"  {step}")
+    print(f"  {len(timing.paths)} paths, {len(timing.stages)} stages, {len(timing.violators)} violators")
+
+    print("\n📋 Corners")
+    rows = []
+    for step, corner in timing.corners():
+        mask = timing.select(corner, 'max', step)
+        vmask = (timing.violators['step'] == step) & (timing.violators['corner'] == corner)
+        summary = timing.summary.get(step, {})
+        rows.append((step, corner or '-', int(mask.sum()), timing.paths['slack'][mask].min() if mask.any() else None,
+                     int((timing.violators['check'][vmask] == 'setup').sum()),
+                     int((timing.violators['check'][vmask] == 'hold').sum()),
+                     summary.get('wns.max', {}).get(corner), summary.get('tns.max', {}).get(corner)))
+    print_rows(['step', 'corner', 'setup_paths', 'worst_path_slack', 'setup_violators', 'hold_violators',
+                'wns', 'tns'], rows)
+
+    worst = timing.worst_per_endpoint(args.per_endpoint, args.corner)[:args.top]
+    print(f"\n🎯 Worst setup paths per endpoint{f' ({args.corner})' if args.corner else ''}")
+    print_rows(['step', 'corner', 'startpoint', 'endpoint', 'arrival', 'required', 'slack', 'stages'],
+               [(p['step'], p['corner'], p['startpoint'], p['endpoint'], p['arrival'], p['required'], p['slack'], p['stages'])
+                for p in timing.paths[worst]])
+
+    # Mid-PnR estimates would swamp the worst bins, so the histogram is one step (and one corner) by default
+    step = None if args.step == 'all' else args.step or signoff_step(steps)
+    if step is not None and step not in {s for s, _ in timing.corners()}:
+        print(f"\n❌ No STA step {step!r} loaded")
+        return 1
+    corner = args.corner or (timing.worst_corner(step) if step is not None else None)
+    counts, edges = timing.slack_histogram(args.bins, corner, step=step)
+    print(f"\n📊 Setup slack histogram ({step or 'all steps'}, {corner or 'all corners'}"
+          f"{' (worst)' if corner and not args.corner else ''}: {counts.sum()} paths and violators)")
+    print_histogram(counts, edges)
+
+    critical = timing.critical_through(args.through, args.corner)
+    if critical is None:
+        print(f"\n🔍 No reported path passes through {args.through!r}")
+    else:
+        p = timing.paths[critical]
+        print(f"\n🔍 Critical path through {args.through!r}: {p['startpoint']} -> {p['endpoint']} "
+              f"({p['corner']}, slack {p['slack']:.3f})")
+        # One row per driving pin; the wire delay to the next input is folded into its time
+        print_rows(['pin', 'cell', 'net', 'fanout', 'delay', 'time'],
+                   [(s['pin'], s['cell'], s['net'], s['fanout'], s['delay'], s['time'])
+                    for s in timing.stages_of(critical) if s['net']])
+
+    if args.save:
+        np.savez_compressed(args.save, paths=timing.paths, stages=timing.stages, violators=timing.violators)
+        print(f"\n📝 Wrote {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Flow-step runtime and memory profiler for OpenLane runs
+Ranks steps by wall time and peak RSS, measures how well each uses its threads and tracks steps across runs
+"""
+
+import argparse
+import csv
+import sys
+
+from run_database import DEFAULT_DATABASE, RUN_ROOTS, RunDatabase, find_runs, print_rows
+
+# Busy cores / threads the host could run at once; at or above this a step is limited by cores
+SCALING_EFFICIENCY = 0.6
+# Below this many busy cores a step is effectively single-threaded
+SERIAL_CORES = 1.2
+
+STEP_QUERY = """
+SELECT s.step, s.tool, s.name, s.runtime_s,
+       COUNT(p.process), SUM(p.runtime_s), SUM(p.cpu_user_s + p.cpu_system_s),
+       MAX(p.peak_threads), SUM(p.peak_threads), MAX(p.peak_rss_mib), MAX(p.peak_cpu_percent)
+FROM steps s LEFT JOIN processes p ON p.run_id = s.run_id AND p.step = s.step
+WHERE s.run_id = ? AND s.ordinal IS NOT NULL
+GROUP BY s.step ORDER BY s.ordinal
+"""
+
+
+class StepProfile:
+    """Wall time, CPU time, threads and memory of one flow step"""
+
+    def __init__(self, row, host_cores=None):
+        (self.step, self.tool, self.name, wall, self.processes, process_wall, cpu,
+         max_threads, sum_threads, self.peak_rss_mib, self.peak_cpu_percent) = row
+        self.wall_s = wall or 0.0
+        self.cpu_s = cpu or 0.0
+        # Steps that run several processes side by side (STA/RCX per corner) have all their threads at once
+        overlapped = (process_wall or 0.0) > 1.1 * self.wall_s
+        self.threads = (sum_threads if overlapped else max_threads) or 0
+        self.cores_used = self.cpu_s / self.wall_s if self.wall_s else 0.0
+        # A step cannot run more threads at once than the host has cores
+        usable = min(self.threads, host_cores) if host_cores else self.threads
+        self.efficiency = self.cores_used / usable if usable else None
+
+    @property
+    def key(self):
+        """Step identity across runs (ordinals shift when the flow changes)"""
+        return f"{self.tool}-{self.name}"
+
+    @property
+    def verdict(self):
+        if not self.processes or self.wall_s == 0:
+            return 'no stats'
+        if self.threads <= 1 or self.cores_used < SERIAL_CORES:
+            return 'serial'
+        if self.efficiency >= SCALING_EFFICIENCY:
+            return 'core-bound'
+        return 'underused'
+
+
+def estimate_host_cores(database, run_id):
+    """Cores of the machine a run used, from the highest CPU percentage any process reached"""
+    peak = database.db.execute('SELECT MAX(peak_cpu_percent) FROM processes WHERE run_id = ?',
+                               (run_id,)).fetchone()[0]
+    return max(1, round(peak / 100)) if peak else None
+
+
+def step_profiles(database, run_id, host_cores=None):
+    return [StepProfile(row, host_cores) for row in database.db.execute(STEP_QUERY, (run_id,))]
+
+
+def resolve_run(database, key=None):
+    """(run_id, path) of the requested run, or of the latest run by name"""
+    if key:
+        row = database.db.execute('SELECT run_id, path FROM runs WHERE path = ? OR name = ? '
+                                  'ORDER BY path LIMIT 1', (key, key)).fetchone()
+    else:
+        row = database.db.execute('SELECT run_id, path FROM runs ORDER BY name DESC, path LIMIT 1').fetchone()
+    if row is None:
+        raise KeyError(f"No run {key!r} in the database" if key else "The database holds no runs")
+    return row
+
+
+def print_profile(profiles, top, host_cores):
+    total = sum(p.wall_s for p in profiles) or 1.0
+    print(f"  Host cores (estimated from peak CPU use): {host_cores or '?'}")
+
+    print(f"\n⏱️  Top {top} steps by wall time (flow total {total / 60:.1f} min)")
+    ranked = sorted(profiles, key=lambda p: p.wall_s, reverse=True)[:top]
+    print_rows(['step', 'wall_s', 'flow_%', 'cpu_s', 'cores_used', 'threads', 'efficiency', 'peak_rss_mib', 'verdict'],
+               [(p.step, p.wall_s, 100 * p.wall_s / total, p.cpu_s, p.cores_used, p.threads,
+                 p.efficiency, p.peak_rss_mib, p.verdict) for p in ranked])
+
+    print(f"\n🧠 Top {top} steps by peak RSS")
+    ranked = sorted((p for p in profiles if p.peak_rss_mib is not None),
+                    key=lambda p: p.peak_rss_mib, reverse=True)[:top]
+    print_rows(['step', 'peak_rss_mib', 'wall_s', 'threads'],
+               [(p.step, p.peak_rss_mib, p.wall_s, p.threads) for p in ranked])
+
+    print("\n🛠️  Wall time by tool")
+    tools = {}
+    for p in profiles:
+        tools[p.tool] = tools.get(p.tool, 0.0) + p.wall_s
+    print_rows(['tool', 'wall_s', 'flow_%'],
+               [(tool, wall, 100 * wall / total) for tool, wall in sorted(tools.items(), key=lambda t: -t[1])])
+
+    by_verdict = {}
+    for p in profiles:
+        by_verdict[p.verdict] = by_verdict.get(p.verdict, 0.0) + p.wall_s
+    scaling = by_verdict.get('core-bound', 0.0)
+    print("\n🧮 Where more cores help")
+    for verdict, wall in sorted(by_verdict.items(), key=lambda v: -v[1]):
+        print(f"  {verdict:<13} {wall:9.1f}s  {100 * wall / total:5.1f}% of flow time")
+    # Amdahl: only the steps already keeping every core busy speed up with twice the cores
+    print(f"  Doubling cores saves at most {scaling / 2:.1f}s ({50 * scaling / total:.1f}% of the flow)")
+
+
+def trend_rows(database, keys):
+    """Wall time of the given steps in every run, oldest run first"""
+    runs = database.db.execute('SELECT run_id, path FROM runs ORDER BY name, path').fetchall()
+    table = {key: {} for key in keys}
+    for run_id, path in runs:
+        for p in step_profiles(database, run_id):
+            if p.key in table:
+                table[p.key][path] = p.wall_s
+    return [path for _, path in runs], table
+
+
+def print_trends(database, profiles, top):
+    keys = [p.key for p in sorted(profiles, key=lambda p: p.wall_s, reverse=True)[:top]]
+    runs, table = trend_rows(database, keys)
+    print(f"\n📈 Step wall time across {len(runs)} runs (s)")
+    for i, path in enumerate(runs):
+        print(f"  [{i}] {path}")
+    rows = []
+    for key in keys:
+        times = [table[key].get(path) for path in runs]
+        known = [t for t in times if t is not None]
+        delta = known[-1] - known[-2] if len(known) > 1 else None
+        rows.append([key] + times + [delta])
+    print_rows(['step'] + [f'[{i}]' for i in range(len(runs))] + ['last_delta'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile OpenLane flow steps by runtime, memory and thread use")
+    parser.add_argument('runs', nargs='*', help="run directories to ingest first "
+                                                "(default: main/rtl/runs and basys-3/rtl/runs)")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database file")
+    parser.add_argument('--run', help="run to profile, by path or name (default: latest)")
+    parser.add_argument('--top', type=int, default=10, help="steps per ranking")
+    parser.add_argument('--cores', type=int, help="cores of the machine the run used (default: estimated)")
+    parser.add_argument('--csv', metavar='FILE', help="write every step of the profiled run as CSV")
+    args = parser.parse_args()
+
+    database = RunDatabase(args.db)
+    try:
+        database.ingest(find_runs(args.runs or RUN_ROOTS))
+        try:
+            run_id, path = resolve_run(database, args.run)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            return 1
+
+        print(f"\n🔬 ChaCha20 Flow Step Profile: {path}")
+        print("=" * 40)
+        host_cores = args.cores or estimate_host_cores(database, run_id)
+        profiles = step_profiles(database, run_id, host_cores)
+        print_profile(profiles, args.top, host_cores)
+        print_trends(database, profiles, args.top)
+
+        if args.csv:
+            columns = ['step', 'wall_s', 'cpu_s', 'cores_used', 'threads', 'efficiency',
+                       'peak_rss_mib', 'peak_cpu_percent', 'verdict']
+            with open(args.csv, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows([getattr(p, c) for c in columns] for p in profiles)
+            print(f"\n📝 Wrote {args.csv}")
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
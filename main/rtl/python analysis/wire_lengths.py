@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Routed wirelength analytics for the ChaCha20 ASIC
+Loads OpenROAD's wire_lengths.csv into arrays, attributes every net to the RTL block driving it and flags long, high-fanout nets
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from run_database import DEFAULT_DATABASE, RunDatabase, print_rows, run_key
+from rtl_attribution import (CLOCK_NETWORK, INSERTED, NETLIST_GLOB, OUTPUT_PINS, TOP, HierarchyIndex,
+                             read_netlist)
+from sta_paths import RUNS_DIR, latest_run
+
+WIRELENGTH_GLOB = '*-odb-reportwirelength/wire_lengths.csv'
+ROUTED_NETLIST_GLOB = '*-openroad-detailedrouting/*.nl.v'
+CHECKS_GLOB = '*-openroad-stapostpnr/{corner}/checks.rpt'
+DEFAULT_CORNER = 'nom_tt_025C_1v80'
+FANOUT_METRIC = 'design__max_fanout_violation__count'
+
+# OpenROAD prints each length with its own unit; 'µ' is two bytes in UTF-8
+LENGTH_UNITS = {b'mm': 1e3, b'\xc2\xb5m': 1.0, b'um': 1.0, b'nm': 1e-3}
+UNIT_CHARS = b'abcdefghijklmnopqrstuvwxyz\xc2\xb5'
+# OpenSTA leaves the slack column blank for a slack of -1
+FANOUT_LINE = re.compile(r'^(\S+/\S+)\s+(\d+)\s+(\d+)\s+(?:-?\d+)?\s*\(VIOLATED\)')
+# Nets the clock tree synthesis step creates
+CLOCK_NET = re.compile(r'^clknet_')
+# Single-input cells (buffers, delays, inverters) the resizer and CTS insert; their output carries their input
+REPEATER_PINS = ({'A', 'X'}, {'A', 'Y'})
+HISTOGRAM_EDGES = (0, 10, 25, 50, 100, 250, 500, 1000, np.inf)
+
+# Per-run cache in the run database; bump to rebuild just this table
+WIRES_VERSION = 2
+WIRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wires (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    net TEXT NOT NULL,
+    length_um REAL,
+    driver TEXT,
+    block TEXT,
+    PRIMARY KEY (run_id, net)
+);
+"""
+
+
+def parse_wire_lengths(csv_path):
+    """(net names, lengths in microns) of a wire_lengths.csv in one vectorized pass"""
+    with open(csv_path, 'rb') as f:
+        data = f.read()
+    body = data[data.index(b'\n') + 1:].strip().replace(b'\r', b'')
+    if not body:
+        return np.zeros(0, dtype='U1'), np.zeros(0)
+    fields = np.array(body.replace(b'\n', b',').split(b',')).reshape(-1, 2)
+    text = fields[:, 1]
+    scale = np.ones(len(text))
+    for suffix, factor in LENGTH_UNITS.items():
+        scale[np.char.endswith(text, suffix)] = factor
+    lengths = np.char.rstrip(text, UNIT_CHARS).astype(np.float64) * scale
+    # Names keep the escaped brackets of the DEF ('in_b\[12\]')
+    names = np.char.decode(np.char.replace(fields[:, 0], b'\\', b''), 'utf-8')
+    return names, lengths
+
+
+def net_drivers(netlist_path):
+    """({net: 'instance/pin'} for every cell output, {repeater output net: its input net}, top-level input ports)"""
+    cells, inputs, _ = read_netlist(netlist_path)
+    drivers, repeated = {}, {}
+    for instance, (_, pins) in cells.items():
+        for pin in OUTPUT_PINS:
+            if pin in pins:
+                drivers[pins[pin]] = f"{instance}/{pin}"
+                if set(pins) in REPEATER_PINS:
+                    repeated[pins[pin]] = pins['A']
+    return drivers, repeated, inputs
+
+
+def net_block(net, drivers, repeated, index, inputs):
+    """RTL block a net belongs to: its driver's module, the top-level ports, the clock tree or a PnR buffer
+
+    A routed net driven by a buffer chain the resizer or CTS inserted is
+    followed back to the synthesized cell (or port) feeding the chain.
+    """
+    seen = set()
+    while net not in seen:
+        seen.add(net)
+        instance = drivers.get(net, '').rpartition('/')[0]
+        if instance in index.modules:
+            return index.modules[instance]
+        if CLOCK_NET.match(net):
+            return CLOCK_NETWORK
+        if net in inputs:
+            return TOP
+        if net not in repeated:
+            break
+        net = repeated[net]
+    # Cells PnR created that are not repeaters (or a chain without a synthesized source)
+    return INSERTED
+
+
+def read_fanout_violations(checks_path):
+    """{driver pin: (limit, fanout)} from the max fanout section of an OpenSTA checks.rpt"""
+    violations = {}
+    section = False
+    with open(checks_path, 'r') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith('max '):
+                section = stripped == 'max fanout'
+                continue
+            match = FANOUT_LINE.match(line) if section else None
+            if match:
+                pin, limit, fanout = match.groups()
+                violations[pin] = (int(limit), int(fanout))
+    return violations
+
+
+class WireLengths:
+    """Routed length, driver pin and RTL block of every net of one run, as parallel arrays"""
+
+    def __init__(self, nets, lengths, drivers, blocks, source=''):
+        lengths = np.asarray(lengths, dtype=np.float64)
+        order = np.argsort(-lengths, kind='stable')
+        self.nets = np.asarray(nets)[order]
+        self.lengths = lengths[order]
+        self.drivers = np.asarray(drivers)[order]
+        self.blocks = np.asarray(blocks)[order]
+        self.source = source
+
+    @classmethod
+    def for_run(cls, database, run):
+        """Wirelengths of an ingested run, parsed and attributed once and then read back from the run database"""
+        csvs = sorted(Path(run).glob(WIRELENGTH_GLOB), key=lambda p: int(p.parent.name.split('-')[0]))
+        if not csvs:
+            raise FileNotFoundError(f"No wirelength report ({WIRELENGTH_GLOB}) in {run}")
+        index = HierarchyIndex.for_run(database, run)
+        database.cache_table('wires', WIRES_VERSION, WIRES_SCHEMA)
+        run_id = database.db.execute('SELECT run_id FROM runs WHERE path = ?', (run_key(run),)).fetchone()[0]
+        stored = database.db.execute('SELECT net, length_um, driver, block FROM wires WHERE run_id = ?',
+                                     (run_id,)).fetchall()
+        if stored:
+            nets, lengths, drivers, blocks = zip(*stored)
+            return cls(nets, np.array(lengths, dtype=np.float64), [d or '' for d in drivers], blocks,
+                       f"{csvs[-1]} (cached)")
+
+        nets, lengths = parse_wire_lengths(csvs[-1])
+        # The routed netlist names the drivers of the nets PnR added; fall back to the synthesized one
+        netlists = sorted(Path(run).glob(ROUTED_NETLIST_GLOB)) or sorted(Path(run).glob(NETLIST_GLOB))
+        drivers, repeated, inputs = net_drivers(netlists[-1])
+        driver_pins = [drivers.get(net, '') for net in nets]
+        blocks = [net_block(net, drivers, repeated, index, inputs) for net in nets]
+        with database.db:
+            database.db.executemany('INSERT INTO wires VALUES (?, ?, ?, ?, ?)',
+                                    [(run_id, str(n), float(l), d or None, b)
+                                     for n, l, d, b in zip(nets, lengths, driver_pins, blocks)])
+        print(f"  📐 Attributed {len(nets)} nets from {csvs[-1].name} through {netlists[-1].parent.name}")
+        return cls(nets, lengths, driver_pins, blocks, str(csvs[-1]))
+
+    def distribution(self):
+        """Total, mean and percentile lengths (microns)"""
+        if not len(self.lengths):
+            return {}
+        p50, p90, p99 = np.percentile(self.lengths, (50, 90, 99))
+        return {'nets': len(self.lengths), 'total': float(self.lengths.sum()), 'mean': float(self.lengths.mean()),
+                'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'max': float(self.lengths[0])}
+
+    def histogram(self, edges=HISTOGRAM_EDGES):
+        """[(low, high, nets, length)] per length bucket"""
+        edges = np.asarray(edges, dtype=np.float64)
+        bucket = np.searchsorted(edges, self.lengths, side='right') - 1
+        counts = np.bincount(bucket, minlength=len(edges) - 1)[:len(edges) - 1]
+        totals = np.bincount(bucket, weights=self.lengths, minlength=len(edges) - 1)[:len(edges) - 1]
+        return [(edges[i], edges[i + 1], int(counts[i]), float(totals[i])) for i in range(len(edges) - 1)]
+
+    def by_block(self):
+        """{block: (nets, total length, longest net)} in microns"""
+        names, group = np.unique(self.blocks, return_inverse=True)
+        counts = np.bincount(group, minlength=len(names))
+        totals = np.bincount(group, weights=self.lengths, minlength=len(names))
+        longest = np.zeros(len(names))
+        np.maximum.at(longest, group, self.lengths)
+        return {str(b): (int(counts[i]), float(totals[i]), float(longest[i])) for i, b in enumerate(names)}
+
+    def rank_of(self):
+        """{driver pin: index into the length-sorted arrays} for nets with a known driver"""
+        return {str(d): i for i, d in enumerate(self.drivers) if d}
+
+
+def fanout_metric(database, run):
+    """Max-fanout violation count OpenLane recorded for a run (final metrics), or None"""
+    row = database.db.execute(
+        "SELECT m.value FROM metrics m JOIN runs r ON r.run_id = m.run_id "
+        "WHERE r.path = ? AND m.name = ? ORDER BY m.step = 'final' DESC LIMIT 1",
+        (run_key(run), FANOUT_METRIC)).fetchone()
+    return row[0] if row else None
+
+
+def print_distribution(wires):
+    stats = wires.distribution()
+    print(f"  {stats['nets']} nets, {stats['total'] / 1e3:.1f} mm routed; mean {stats['mean']:.1f} µm, "
+          f"median {stats['p50']:.1f}, p90 {stats['p90']:.1f}, p99 {stats['p99']:.1f}, max {stats['max']:.1f} µm")
+    print_rows(['length_um', 'nets', 'nets_%', 'length_%'],
+               [(f"{low:g}-{high:g}" if np.isfinite(high) else f">{low:g}", nets,
+                 100 * nets / stats['nets'], 100 * total / stats['total'])
+                for low, high, nets, total in wires.histogram()])
+
+
+def print_fanout(wires, violations, recorded, top):
+    ranks = wires.rank_of()
+    joined = [(pin, limit, fanout, ranks.get(pin)) for pin, (limit, fanout) in violations.items()]
+    resolved = [j for j in joined if j[3] is not None]
+    long_cut = max(1, len(wires.lengths) // 20)
+    print(f"  {len(violations)} max-fanout violators in checks.rpt"
+          + (f" (metrics: {recorded:.0f})" if recorded is not None else "")
+          + f"; {len(resolved)} drive a net of the wirelength report, {sum(r < long_cut for *_, r in resolved)} of them "
+          f"in the longest 5% ({wires.lengths[long_cut - 1]:.0f} µm and up)")
+    print(f"  Violators driving resolvable nets, longest first:")
+    print_rows(['driver', 'fanout', 'limit', 'net', 'length_um', 'rank', 'block'],
+               [(pin, fanout, limit, wires.nets[r], float(wires.lengths[r]), r + 1, wires.blocks[r])
+                for pin, limit, fanout, r in sorted(resolved, key=lambda j: j[3])[:top]])
+    missing = len(joined) - len(resolved)
+    if missing:
+        print(f"  {missing} violators drive no net of the wirelength report (no routed netlist to name PnR nets?)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wirelength distribution of a run, attributed to RTL blocks")
+    parser.add_argument('run', nargs='?', help="run directory (default: latest in main/rtl/runs)")
+    parser.add_argument('--db', default=str(DEFAULT_DATABASE), help="SQLite database caching the attributed nets")
+    parser.add_argument('--top', type=int, default=15, help="longest nets to list")
+    parser.add_argument('--block', help="only list nets of RTL blocks containing this text")
+    parser.add_argument('--corner', default=DEFAULT_CORNER, help="STA corner whose max fanout checks are joined")
+    args = parser.parse_args()
+
+    run = Path(args.run) if args.run else latest_run()
+    if run is None:
+        print(f"❌ No runs in {RUNS_DIR}")
+        return 1
+
+    print("📏 ChaCha20 Wirelength Analysis")
+    print("=" * 40)
+    database = RunDatabase(args.db)
+    try:
+        database.ingest([run])
+        started = time.perf_counter()
+        try:
+            wires = WireLengths.for_run(database, run)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"  {wires.source} loaded in {time.perf_counter() - started:.2f}s")
+        recorded = fanout_metric(database, run)
+    finally:
+        database.close()
+    if not len(wires.lengths):
+        print("❌ The wirelength report lists no nets")
+        return 1
+
+    print(f"\n📊 Length distribution")
+    print_distribution(wires)
+
+    selected = np.arange(len(wires.nets))
+    if args.block:
+        selected = selected[np.char.find(wires.blocks.astype(str), args.block) >= 0]
+    print(f"\n🧵 Longest nets" + (f" in blocks matching '{args.block}'" if args.block else ''))
+    print_rows(['net', 'length_um', 'block', 'driver'],
+               [(wires.nets[i], float(wires.lengths[i]), wires.blocks[i], wires.drivers[i] or '-')
+                for i in selected[:args.top]])
+
+    print(f"\n🧩 Wirelength by block")
+    total = float(wires.lengths.sum()) or 1.0
+    print_rows(['block', 'nets', 'total_mm', 'share_%', 'mean_um', 'longest_um'],
+               [(block, nets, length / 1e3, 100 * length / total, length / nets, longest)
+                for block, (nets, length, longest) in sorted(wires.by_block().items(), key=lambda kv: -kv[1][1])])
+
+    checks = sorted(run.glob(CHECKS_GLOB.format(corner=args.corner)))
+    print(f"\n🌿 Max-fanout violators ({args.corner})")
+    if checks:
+        print_fanout(wires, read_fanout_violations(checks[-1]), recorded, args.top)
+    else:
+        print(f"  No post-PnR checks.rpt for {args.corner}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Incremental performance metrics for ChaCha20 ASIC waveforms
+Tails a VCD while the simulator writes it and keeps running throughput, latency and toggle activity
+"""
+
+import argparse
+import json
+import os
+import sys
+import time as clock
+from collections import deque
+from pathlib import Path
+
+from transactions import HANDSHAKES
+from vcd_index import _parse_change
+from vcd_reader import VCDReader, detect_format, to_int
+
+RTL_CONFIG = Path(__file__).resolve().parents[2] / 'rtl' / 'config.json'
+
+# One done pulse is one 64-byte keystream block
+BLOCK_BITS = 512
+WINDOW_CYCLES = 32
+# Appended data is read in chunks of this size, so a large existing dump never sits in memory whole
+CHUNK_BYTES = 8 << 20
+
+
+def load_clock_period(config=RTL_CONFIG):
+    """Target clock period in ns (CLOCK_PERIOD from the OpenLane config)"""
+    with open(config, 'r') as f:
+        return float(json.load(f)['CLOCK_PERIOD'])
+
+
+class WaveformTail:
+    """Reads the value changes appended to a plain VCD since the previous poll"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.reader = None      # VCDReader, once the header has been written
+        self.offset = 0         # byte offset of the first unread body line
+        self.time = 0
+        self.restarted = False
+
+    def _open_header(self):
+        """Parse the header once $enddefinitions is on disk; False while it is still being written"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        if detect_format(self.path) != 'vcd':
+            raise ValueError(f"{self.path} is not a plain VCD; only plain dumps can be tailed")
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    return False
+                offset += len(raw)
+                if b'$enddefinitions' in raw:
+                    break
+            else:
+                return False
+        self.reader = VCDReader(self.path)
+        self.offset = offset
+        return True
+
+    def poll(self, chunk_size=CHUNK_BYTES):
+        """Iterator over batches of (time, code, value) changes appended since the last call
+
+        Restarts are detected here: if the file shrank (the simulation was
+        restarted) the tail starts over and sets `restarted`. The batches are
+        then read lazily, one chunk of at most `chunk_size` bytes at a time; a
+        partially written last line is left for the next poll.
+        """
+        self.restarted = False
+        if self.reader is not None and os.path.getsize(self.path) < self.offset:
+            self.reader = None
+            self.time = 0
+            self.restarted = True
+        if self.reader is None and not self._open_header():
+            return iter(())
+        return self._batches(chunk_size)
+
+    def _batches(self, chunk_size):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            carry = b''
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    return
+                data = carry + data
+                end = data.rfind(b'\n') + 1
+                carry = data[end:]
+                if end:
+                    self.offset += end
+                    yield self._changes(data[:end])
+
+    def _changes(self, data):
+        """(time, code, value) of the complete lines in `data`"""
+        changes = []
+        for line in data.decode('ascii', 'replace').splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if line[0] == '#':
+                self.time = int(line[1:])
+                continue
+            change = _parse_change(line)
+            if change is not None:
+                changes.append((self.time, change[0], change[1]))
+        return changes
+
+
+class _Level:
+    """Current and previous value of a sampled scalar, for posedge sampling"""
+
+    def __init__(self):
+        self.level = False
+        self.before = False
+        self.since = -1
+
+    def set(self, time, value):
+        if time != self.since:
+            self.before = self.level
+            self.since = time
+        self.level = value == '1'
+
+    def at_edge(self, time):
+        # A change stamped with the edge time is not seen by that edge
+        return self.before if self.since == time else self.level
+
+
+class LiveMetrics:
+    """Running throughput, block latency and toggle activity of a growing waveform
+
+    Every change is consumed exactly once: update() only reads what the
+    simulator appended since the previous call, so cost tracks the new data,
+    not the length of the run. Handshakes are sampled on rising clock edges
+    the same way transactions.extract_transactions does.
+    """
+
+    def __init__(self, path, clock_name='clk', period_ns=None, window=WINDOW_CYCLES):
+        self.tail = WaveformTail(path)
+        self.clock_name = clock_name
+        self.period_ns = period_ns if period_ns is not None else load_clock_period()
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.ready = False
+        self.clock_code = None
+        self.handshakes = {}    # kind -> [id code, ...]
+        self.levels = {}        # id code -> _Level for handshake signals
+        self.values = {}        # id code -> last integer value
+        self.bits = 0
+        self.ns_per_unit = 1.0
+
+        self.time = 0
+        self.cycles = 0
+        self.events = {}
+        self.fired = {}
+        self.pending = deque()
+        self.latencies = []
+        self.toggles = 0
+
+        self.window_blocks = 0
+        self.window_toggles = 0
+        # One entry per `window` cycles; blocks is cumulative, the rates are per window
+        self.history = {'cycle': [], 'time_ns': [], 'blocks': [], 'blocks_per_cycle': [],
+                        'throughput_gbps': [], 'activity': []}
+
+    def _bind(self, reader):
+        """Resolve the clock and handshake id codes once the header is known"""
+        self.clock_code = reader.find(self.clock_name).code
+        for kind, signals in HANDSHAKES.items():
+            try:
+                self.handshakes[kind] = [reader.find(s).code for s in signals]
+            except KeyError:
+                continue
+            for code in self.handshakes[kind]:
+                self.levels.setdefault(code, _Level())
+        self.events = {kind: 0 for kind in self.handshakes}
+        self.fired = {kind: False for kind in self.handshakes}
+        self.bits = sum(signals[0].width for signals in reader.codes.values())
+        self.ns_per_unit = reader.timescale_seconds * 1e9
+        self.ready = True
+
+    def update(self):
+        """Consume newly written changes; returns the number of new clock cycles"""
+        batches = self.tail.poll()
+        if self.tail.restarted:
+            self.reset()
+        if self.tail.reader is None:
+            return 0
+        if not self.ready:
+            self._bind(self.tail.reader)
+
+        before = self.cycles
+        for time, code, value in (change for changes in batches for change in changes):
+            self.time = time
+            number = to_int(value)
+            last = self.values.get(code)
+            self.values[code] = number
+            if last is not None:
+                flips = (last ^ number).bit_count()
+                self.toggles += flips
+                self.window_toggles += flips
+            if code == self.clock_code and value == '1' and (last == 0 or (last is None and time > 0)):
+                self._rising_edge(time)
+            if code in self.levels:
+                self.levels[code].set(time, value)
+        return self.cycles - before
+
+    def _rising_edge(self, time):
+        cycle = self.cycles
+        for kind, codes in self.handshakes.items():
+            fired = all(self.levels[code].at_edge(time) for code in codes)
+            # start/done count pulses, not the cycles a level stays high
+            event = fired and not (kind in ('start', 'done') and self.fired[kind])
+            self.fired[kind] = fired
+            if not event:
+                continue
+            self.events[kind] += 1
+            if kind == 'start':
+                self.pending.append(cycle)
+            elif kind == 'done':
+                self.window_blocks += 1
+                if self.pending:
+                    self.latencies.append(cycle - self.pending.popleft())
+        self.cycles += 1
+        if self.cycles % self.window == 0:
+            self._close_window()
+
+    def _close_window(self):
+        self.history['cycle'].append(self.cycles)
+        self.history['time_ns'].append(self.time * self.ns_per_unit)
+        self.history['blocks'].append(self.blocks)
+        self.history['blocks_per_cycle'].append(self.window_blocks / self.window)
+        self.history['throughput_gbps'].append(
+            self.window_blocks * BLOCK_BITS / (self.window * self.period_ns))
+        self.history['activity'].append(self.window_toggles / (max(self.bits, 1) * self.window))
+        self.window_blocks = 0
+        self.window_toggles = 0
+
+    @property
+    def blocks(self):
+        return self.events.get('done', 0)
+
+    def snapshot(self):
+        """Metrics over everything consumed so far"""
+        cycles = max(self.cycles, 1)
+        return {
+            'time_ns': self.time * self.ns_per_unit,
+            'period_ns': self.period_ns,
+            'cycles': self.cycles,
+            'blocks': self.blocks,
+            'blocks_per_cycle': self.blocks / cycles,
+            'cycles_per_block': self.cycles / self.blocks if self.blocks else None,
+            'latency_cycles': sum(self.latencies) / len(self.latencies) if self.latencies else None,
+            # bits per ns is Gbit/s
+            'throughput_gbps': self.blocks * BLOCK_BITS / (cycles * self.period_ns),
+            'activity': self.toggles / (max(self.bits, 1) * cycles),
+            'events': dict(self.events)
+        }
+
+
+def replay_metrics(path, clock_name='clk', period_ns=None, window=WINDOW_CYCLES):
+    """LiveMetrics after consuming a finished waveform in one pass"""
+    metrics = LiveMetrics(path, clock_name, period_ns, window)
+    metrics.update()
+    return metrics
+
+
+def format_metrics(snapshot):
+    cycles_per_block = snapshot['cycles_per_block']
+    latency = snapshot['latency_cycles']
+    return (f"cycle {snapshot['cycles']:>7} | {snapshot['blocks']:>4} blocks | "
+            f"{snapshot['blocks_per_cycle']:.4f} blocks/cycle | "
+            f"{f'{cycles_per_block:.1f}' if cycles_per_block else '-':>6} cycles/block | "
+            f"latency {f'{latency:.1f}' if latency else '-':>6} | "
+            f"{snapshot['throughput_gbps']:.3f} Gbps | activity {snapshot['activity']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Running performance metrics from a (growing) VCD")
+    parser.add_argument('waveform', help="plain .vcd written by the simulator")
+    parser.add_argument('--follow', action='store_true', help="keep tailing the dump until interrupted")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between polls with --follow")
+    parser.add_argument('--window', type=int, default=WINDOW_CYCLES, help="clock cycles per history window")
+    parser.add_argument('--period', type=float, help="clock period in ns (default: CLOCK_PERIOD from config.json)")
+    parser.add_argument('--clock', default='clk', help="clock signal name")
+    args = parser.parse_args()
+
+    metrics = LiveMetrics(args.waveform, args.clock, args.period, args.window)
+    print("📈 ChaCha20 Live Performance Metrics")
+    print("=" * 40)
+    print(f"  Clock period: {metrics.period_ns:g} ns ({1e3 / metrics.period_ns:.1f} MHz)")
+
+    metrics.update()
+    print(f"  {format_metrics(metrics.snapshot())}")
+    try:
+        while args.follow:
+            clock.sleep(args.interval)
+            if metrics.update() or metrics.tail.restarted:
+                if metrics.tail.restarted:
+                    print("  🔄 Waveform restarted")
+                print(f"  {format_metrics(metrics.snapshot())}")
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
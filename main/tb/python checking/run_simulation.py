@@ -2,11 +2,18 @@
 Helper script to run the ChaCha20 ASIC testbench
 """
 
+import argparse
+import gzip
 import os
+import re
+import shutil
 import subprocess
 import sys
+import threading
 
-def try_local_simulation():
+WAVE_FORMATS = ('vcd', 'vcd.gz', 'fst')
+
+def try_local_simulation(wave_format='vcd'):
     """Try to run simulation with available tools"""
     
     print("🔍 Checking for available simulators...")
@@ -38,7 +45,7 @@ def try_local_simulation():
     print(f"\n🚀 Attempting simulation with {sim_name}...")
     
     if sim_cmd == 'iverilog':
-        return run_icarus_simulation()
+        return run_icarus_simulation(wave_format)
     elif sim_cmd in ['vlog', 'vsim']:
         return run_modelsim_simulation()
     elif sim_cmd == 'xvlog':
@@ -46,7 +53,69 @@ def try_local_simulation():
     
     return False
 
-def run_icarus_simulation():
+def find_dumpfile(testbench):
+    """Return the $dumpfile name a testbench writes, if any"""
+    with open(testbench, 'r') as f:
+        match = re.search(r'\$dumpfile\s*\(\s*"([^"]+)"', f.read())
+    return match.group(1) if match else None
+
+def start_gzip_stream(dump_path):
+    """Replace the dump file with a FIFO that is gzip-compressed as vvp writes it"""
+    if not hasattr(os, 'mkfifo'):
+        return None  # No FIFOs on Windows - compress after the run instead
+    if os.path.exists(dump_path):
+        os.remove(dump_path)
+    os.mkfifo(dump_path)
+    
+    def pump():
+        with open(dump_path, 'rb') as src, gzip.open(dump_path + '.gz', 'wb') as dst:
+            while True:
+                block = src.read(1 << 20)
+                if not block:
+                    break
+                dst.write(block)
+                thread.bytes_streamed += len(block)
+    
+    thread = threading.Thread(target=pump, daemon=True)
+    thread.bytes_streamed = 0
+    thread.start()
+    return thread
+
+def finish_wave_output(dump_path, wave_format, pump=None):
+    """Finalize the waveform file after vvp exits and return its path"""
+    if wave_format == 'vcd.gz':
+        if pump is not None:
+            # If vvp never opened the dump the reader is still blocked; a
+            # writer that opens and closes at once releases it with EOF
+            while pump.is_alive():
+                try:
+                    os.close(os.open(dump_path, os.O_WRONLY | os.O_NONBLOCK))
+                except OSError:
+                    pass  # Reader not waiting (yet or any more)
+                pump.join(0.1)
+            os.remove(dump_path)
+            if pump.bytes_streamed == 0:
+                os.remove(dump_path + '.gz')
+        elif os.path.exists(dump_path):
+            with open(dump_path, 'rb') as src, gzip.open(dump_path + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.remove(dump_path)
+        final_path = dump_path + '.gz'
+    elif wave_format == 'fst':
+        # vvp -fst keeps the $dumpfile name; give the file its real extension
+        final_path = os.path.splitext(dump_path)[0] + '.fst'
+        if os.path.exists(dump_path):
+            os.replace(dump_path, final_path)
+    else:
+        final_path = dump_path
+    
+    if os.path.exists(final_path):
+        size_kb = os.path.getsize(final_path) / 1024
+        print(f"📊 Waveform written: {final_path} ({size_kb:.1f} KB)")
+        return final_path
+    return None
+
+def run_icarus_simulation(wave_format='vcd'):
     """Run simulation with Icarus Verilog"""
     try:
         print("📋 Compiling with Icarus Verilog...")
@@ -115,7 +184,17 @@ def run_icarus_simulation():
         
         # Run simulation
         print("🎮 Running full ChaCha20 simulation...")
-        result = subprocess.run(['vvp', 'simulation'], capture_output=True, text=True)
+        dump_path = find_dumpfile(verilog_files[-1])
+        vvp_cmd = ['vvp', 'simulation']
+        pump = None
+        if dump_path and wave_format == 'fst':
+            vvp_cmd.append('-fst')
+        elif dump_path and wave_format == 'vcd.gz':
+            pump = start_gzip_stream(dump_path)
+        
+        result = subprocess.run(vvp_cmd, capture_output=True, text=True)
+        if dump_path:
+            finish_wave_output(dump_path, wave_format, pump)
         
         print("📤 Simulation output:")
         print(result.stdout)
@@ -204,6 +283,11 @@ def create_eda_playground_instructions():
     print("📝 Created EDA_PLAYGROUND_INSTRUCTIONS.md")
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the ChaCha20 ASIC testbench")
+    parser.add_argument('--wave-format', choices=WAVE_FORMATS, default='vcd',
+                        help="waveform dump format (vcd.gz streams through gzip, fst uses vvp -fst)")
+    args = parser.parse_args()
+    
     print("🚀 ChaCha20 ASIC Testbench Runner")
     print("=" * 40)
     
@@ -212,7 +296,7 @@ def main():
         os.chdir('main')
     
     # Try local simulation first
-    if try_local_simulation():
+    if try_local_simulation(args.wave_format):
         print("✅ Local simulation completed successfully!")
         return 0
     else:
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Signal activity and toggle-count profiler for ChaCha20 ASIC waveforms
+Streams a VCD and measures per-signal / per-module switching activity for power estimation
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from vcd_reader import open_waveform, to_int
+
+# Bits set in every byte value, for vectorized popcount of XOR-ed rows
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint32)
+
+FLUSH_SIZE = 4096
+
+
+class _CodeActivity:
+    """Buffered value history of one VCD id code"""
+
+    def __init__(self, width):
+        self.nbytes = (width + 7) // 8
+        self.last = None
+        self.times = []
+        self.values = []
+        self.toggles = 0
+
+
+class ActivityProfile:
+    """Toggle counts and activity factors measured from one waveform"""
+
+    def __init__(self, path, bin_width, timescale):
+        self.path = path
+        self.bin_width = bin_width
+        self.timescale = timescale
+        self.signals = {}       # path -> {'width', 'toggles', 'activity'}
+        self.modules = {}       # scope -> {'bits', 'toggles', 'activity'}
+        self.histogram = np.zeros(0, dtype=np.int64)
+        self.clock = None
+        self.cycles = 0
+        self.end_time = 0
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'timescale': self.timescale,
+            'clock': self.clock,
+            'cycles': self.cycles,
+            'end_time': self.end_time,
+            'bin_width': self.bin_width,
+            'signals': self.signals,
+            'modules': self.modules,
+            'histogram': self.histogram.tolist()
+        }
+
+
+def count_toggles(values, previous, nbytes):
+    """Per-change toggled-bit counts via popcount over XOR of successive values"""
+    rows = values if previous is None else [previous] + values
+    raw = b''.join(v.to_bytes(nbytes, 'little') for v in rows)
+    matrix = np.frombuffer(raw, dtype=np.uint8).reshape(len(rows), nbytes)
+    flips = POPCOUNT_TABLE[matrix[1:] ^ matrix[:-1]].sum(axis=1)
+    if previous is None:
+        # The very first value is initialization, not a toggle
+        flips = np.concatenate((np.zeros(1, dtype=flips.dtype), flips))
+    return flips
+
+
+def profile_activity(path, bin_width=100000, clock='clk'):
+    """Stream a waveform and return its ActivityProfile
+
+    x/z bits are treated as 0, so an x->0 transition is not a toggle.
+    Activity is toggles per bit per clock cycle (a free-running clock is 2.0).
+    """
+    reader = open_waveform(path)
+    profile = ActivityProfile(str(path), bin_width, reader.timescale)
+    codes = {code: _CodeActivity(signals[0].width) for code, signals in reader.codes.items()}
+    histogram = np.zeros(1024, dtype=np.int64)
+
+    def flush(state):
+        nonlocal histogram
+        if not state.values:
+            return
+        flips = count_toggles(state.values, state.last, state.nbytes)
+        state.toggles += int(flips.sum())
+        bins = np.asarray(state.times, dtype=np.int64) // bin_width
+        if bins[-1] >= len(histogram):
+            histogram = np.pad(histogram, (0, max(int(bins[-1]) + 1, 2 * len(histogram)) - len(histogram)))
+        np.add.at(histogram, bins, flips)
+        state.last = state.values[-1]
+        state.times = []
+        state.values = []
+
+    time = 0
+    for time, code, value in reader.changes():
+        state = codes[code]
+        state.times.append(time)
+        state.values.append(to_int(value))
+        if len(state.values) >= FLUSH_SIZE:
+            flush(state)
+    for state in codes.values():
+        flush(state)
+
+    profile.end_time = time
+    n_bins = time // bin_width + 1
+    profile.histogram = np.pad(histogram, (0, max(0, n_bins - len(histogram))))[:n_bins]
+
+    try:
+        clock_signal = reader.find(clock)
+        profile.clock = clock_signal.path
+        # Two toggles (rise + fall) per clock cycle
+        profile.cycles = codes[clock_signal.code].toggles // 2
+    except KeyError:
+        profile.cycles = 0
+    cycles = max(profile.cycles, 1)
+
+    module_codes = {}
+    for signal_path, signal in reader.signals.items():
+        toggles = codes[signal.code].toggles
+        profile.signals[signal_path] = {
+            'width': signal.width,
+            'toggles': toggles,
+            'activity': toggles / (signal.width * cycles)
+        }
+        # Port aliases share a code; count each net once per module
+        module_codes.setdefault('.'.join(signal.scope), {})[signal.code] = signal.width
+
+    for module, widths in module_codes.items():
+        bits = sum(widths.values())
+        toggles = sum(codes[code].toggles for code in widths)
+        profile.modules[module] = {
+            'bits': bits,
+            'toggles': toggles,
+            'activity': toggles / (bits * cycles)
+        }
+    return profile
+
+
+def print_report(profile, top):
+    print(f"📊 {profile.path}")
+    print(f"   Clock: {profile.clock or 'not found'} ({profile.cycles} cycles), "
+          f"end time {profile.end_time} x {profile.timescale}")
+
+    print(f"\n🔝 Top {top} signals by toggle count:")
+    ranked = sorted(profile.signals.items(), key=lambda item: -item[1]['toggles'])
+    for name, stats in ranked[:top]:
+        print(f"  {name:<50} {stats['width']:>4} bits {stats['toggles']:>9} toggles  "
+              f"activity {stats['activity']:.4f}")
+
+    print("\n🧩 Per-module activity:")
+    for name, stats in sorted(profile.modules.items(), key=lambda item: -item[1]['toggles']):
+        print(f"  {name:<40} {stats['bits']:>6} bits {stats['toggles']:>9} toggles  "
+              f"activity {stats['activity']:.4f}")
+
+    print(f"\n📈 Activity histogram ({profile.bin_width} time units per bin):")
+    peak = max(int(profile.histogram.max()), 1) if len(profile.histogram) else 1
+    for i, count in enumerate(profile.histogram):
+        bar = '#' * int(40 * count / peak)
+        print(f"  {i * profile.bin_width:>10} {int(count):>8} {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toggle-count profiler for waveform dumps")
+    parser.add_argument('waveform', help="dump to profile (.vcd, .vcd.gz or .fst)")
+    parser.add_argument('--bin-width', type=int, default=100000,
+                        help="histogram bin width in dump time units (default: 100000)")
+    parser.add_argument('--clock', default='clk', help="clock signal used to count cycles")
+    parser.add_argument('--top', type=int, default=20, help="number of signals to list")
+    parser.add_argument('--json', metavar='FILE', help="write the full profile as JSON")
+    args = parser.parse_args()
+
+    print("⚡ ChaCha20 Toggle Activity Profiler")
+    print("=" * 40)
+
+    profile = profile_activity(args.waveform, args.bin_width, args.clock)
+    print_report(profile, args.top)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(profile.to_dict(), f, indent=2)
+        print(f"\n📝 Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
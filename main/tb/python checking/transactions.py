@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Transaction extraction for ChaCha20 ASIC waveforms
+Samples the asic_top handshakes on rising clock edges and reports block latency
+"""
+
+import sys
+
+import numpy as np
+
+from vcd_reader import open_waveform
+
+# Handshake name -> signals that must all be high at a rising clock edge
+HANDSHAKES = {
+    'start': ('start',),
+    'done': ('done',),
+    'in_word': ('in_state_valid', 'in_state_ready'),
+    'out_word': ('out_state_valid', 'out_state_ready'),
+    'chunk': ('chunk_valid',),
+    'trng': ('trng_request', 'trng_ready')
+}
+
+
+def trace_arrays(trace):
+    """Times and 0/1 levels of a scalar trace as NumPy arrays (x/z read as 0)"""
+    times = np.asarray(trace.times, dtype=np.int64)
+    levels = np.array([v == '1' for v in trace.values], dtype=bool)
+    return times, levels
+
+
+def sample(times, levels, at):
+    """Level of a signal just before each time in `at` (posedge sampling)"""
+    idx = np.searchsorted(times, at, side='left') - 1
+    result = np.zeros(len(at), dtype=bool)
+    valid = idx >= 0
+    result[valid] = levels[idx[valid]]
+    return result
+
+
+def rising_edges(times, levels):
+    """Times at which a scalar trace goes from low to high"""
+    rises = levels[1:] & ~levels[:-1]
+    edges = times[1:][rises]
+    if len(levels) and levels[0] and times[0] > 0:
+        edges = np.concatenate((times[:1], edges))
+    return edges
+
+
+def extract_transactions(path, clock='clk'):
+    """Find every handshake in a waveform
+
+    Returns (edges, events): the rising clock edge times and a dict mapping
+    handshake name to the indices of the clock cycles in which it fired.
+    Handshakes whose signals are not in the dump are left out.
+    """
+    reader = open_waveform(path)
+    names = {clock}
+    for signals in HANDSHAKES.values():
+        names.update(signals)
+
+    resolved = {}
+    for name in names:
+        try:
+            resolved[name] = reader.find(name).path
+        except KeyError:
+            pass
+    if clock not in resolved:
+        raise KeyError(f"No clock signal {clock!r} in {path}")
+
+    traces = reader.load(sorted(set(resolved.values())))
+    arrays = {name: trace_arrays(traces[p]) for name, p in resolved.items()}
+    edges = rising_edges(*arrays[clock])
+
+    events = {}
+    for kind, signals in HANDSHAKES.items():
+        if not all(s in arrays for s in signals):
+            continue
+        fired = np.ones(len(edges), dtype=bool)
+        for s in signals:
+            fired &= sample(*arrays[s], edges)
+        if kind in ('start', 'done'):
+            # Count pulses, not the cycles a level stays high
+            fired &= ~np.concatenate(([False], fired[:-1]))
+        events[kind] = np.flatnonzero(fired)
+    return edges, events
+
+
+def block_latencies(events):
+    """Cycles from each start pulse to the next done pulse"""
+    starts = events.get('start', np.zeros(0, dtype=np.int64))
+    dones = events.get('done', np.zeros(0, dtype=np.int64))
+    latencies = []
+    j = 0
+    for s in starts:
+        while j < len(dones) and dones[j] < s:
+            j += 1
+        if j == len(dones):
+            break
+        latencies.append(int(dones[j] - s))
+        j += 1
+    return np.asarray(latencies, dtype=np.int64)
+
+
+def latency_stats(latencies):
+    if len(latencies) == 0:
+        return {'blocks': 0, 'min': None, 'mean': None, 'max': None}
+    return {
+        'blocks': int(len(latencies)),
+        'min': int(latencies.min()),
+        'mean': float(latencies.mean()),
+        'max': int(latencies.max())
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python transactions.py <dump.vcd|dump.vcd.gz|dump.fst>")
+        return 1
+
+    edges, events = extract_transactions(sys.argv[1])
+    print("🔁 ChaCha20 Transaction Summary")
+    print("=" * 40)
+    print(f"  Clock cycles: {len(edges)}")
+    for kind, cycles in events.items():
+        first = f" (first at cycle {cycles[0]})" if len(cycles) else ""
+        print(f"  {kind:<10} {len(cycles):>6}{first}")
+
+    stats = latency_stats(block_latencies(events))
+    if stats['blocks']:
+        print(f"\n⏱️  Block latency over {stats['blocks']} blocks: "
+              f"min {stats['min']}, mean {stats['mean']:.1f}, max {stats['max']} cycles")
+    else:
+        print("\n⏱️  No complete start -> done block found")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
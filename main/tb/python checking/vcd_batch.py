@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Parallel waveform analytics over a regression directory
+Fans registered analyses out across every dump in a process pool, with a content-hash result cache
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from toggle_profiler import profile_activity
+from transactions import block_latencies, extract_transactions, latency_stats
+
+WAVEFORM_PATTERNS = ('.vcd', '.vcd.gz', '.fst')
+CACHE_FILE = '.vcd_batch_cache.json'
+
+# name -> (function(path) -> dict of columns, version); bump the version to invalidate cached rows
+ANALYSES = {}
+
+# Transactions parsed for the file the worker is on, shared by the analyses that need them
+_transactions = {}
+
+
+def register_analysis(name, version=1):
+    """Decorator adding a per-file analysis to the batch registry"""
+    def decorator(func):
+        ANALYSES[name] = (func, version)
+        return func
+    return decorator
+
+
+def parsed_transactions(path):
+    """extract_transactions(path), parsed once per file per run_analyses call"""
+    if path not in _transactions:
+        _transactions[path] = extract_transactions(path)
+    return _transactions[path]
+
+
+@register_analysis('transactions')
+def analyze_transactions(path):
+    edges, events = parsed_transactions(path)
+    row = {'cycles': len(edges)}
+    for kind, cycles in events.items():
+        row[kind] = len(cycles)
+    return row
+
+
+@register_analysis('latency')
+def analyze_latency(path):
+    _, events = parsed_transactions(path)
+    return latency_stats(block_latencies(events))
+
+
+@register_analysis('toggles')
+def analyze_toggles(path):
+    profile = profile_activity(path)
+    activities = [s['activity'] for s in profile.signals.values()]
+    return {
+        'cycles': profile.cycles,
+        'toggles': sum(m['toggles'] for m in profile.modules.values()),
+        'mean_activity': float(np.mean(activities)) if activities else 0.0
+    }
+
+
+def find_waveforms(root):
+    """All waveform dumps below `root`, sorted"""
+    found = []
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(WAVEFORM_PATTERNS):
+                found.append(os.path.join(dirpath, name))
+    return sorted(found)
+
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class ResultCache:
+    """JSON cache of analysis rows keyed by file content hash
+
+    A (size, mtime) stamp per path lets unchanged files skip rehashing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {'stamps': {}, 'results': {}}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.data = json.load(f)
+
+    def content_hash(self, path):
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        known = self.data['stamps'].get(path)
+        if known and known['stamp'] == stamp:
+            return known['hash']
+        digest = file_hash(path)
+        self.data['stamps'][path] = {'stamp': stamp, 'hash': digest}
+        return digest
+
+    def key(self, digest, analysis):
+        return f"{digest}:{analysis}:v{ANALYSES[analysis][1]}"
+
+    def get(self, digest, analysis):
+        return self.data['results'].get(self.key(digest, analysis))
+
+    def put(self, digest, analysis, row):
+        self.data['results'][self.key(digest, analysis)] = row
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump(self.data, f, indent=1)
+
+
+def run_analyses(path, analyses):
+    """Worker entry point: run the requested analyses on one file"""
+    rows = {}
+    for name in analyses:
+        try:
+            rows[name] = ANALYSES[name][0](path)
+        except Exception as e:
+            rows[name] = {'error': str(e)}
+    _transactions.clear()
+    return path, rows
+
+
+def run_batch(paths, analyses, cache, workers=None):
+    """Analyze all paths, reusing cached rows; returns {path: {analysis: row}}
+
+    Files with identical content are analyzed once.
+    """
+    results = {}
+    digests = {}
+    pending = {}    # digest -> (representative path, analyses still needed)
+    for path in paths:
+        digest = digests[path] = cache.content_hash(path)
+        results[path] = {}
+        for name in analyses:
+            row = cache.get(digest, name)
+            if row is not None:
+                results[path][name] = row
+            elif digest not in pending:
+                pending[digest] = (path, [name])
+            elif name not in pending[digest][1]:
+                pending[digest][1].append(name)
+
+    todo = sum(1 for path in paths if digests[path] in pending)
+    print(f"📦 {len(paths)} dumps: {len(paths) - todo} fully cached, {todo} to analyze")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_analyses, path, names): digest
+                       for digest, (path, names) in pending.items()}
+            for future in as_completed(futures):
+                digest = futures[future]
+                _, rows = future.result()
+                for name, row in rows.items():
+                    if 'error' not in row:
+                        cache.put(digest, name, row)
+                    for path in paths:
+                        if digests[path] == digest:
+                            results[path][name] = row
+                print(f"  ✅ {pending[digest][0]}")
+    cache.save()
+    return results
+
+
+def flatten(results, root):
+    """One table row per file, columns named <analysis>.<field>"""
+    table = []
+    for path, rows in sorted(results.items()):
+        flat = {'file': os.path.relpath(path, root)}
+        for name, row in rows.items():
+            for field, value in row.items():
+                flat[f"{name}.{field}"] = value
+        table.append(flat)
+    return table
+
+
+def print_table(table):
+    columns = []
+    for row in table:
+        for col in row:
+            if col not in columns:
+                columns.append(col)
+
+    def fmt(value):
+        if isinstance(value, float):
+            return f"{value:.4g}"
+        return '-' if value is None else str(value)
+
+    widths = {c: max(len(c), *(len(fmt(r.get(c))) for r in table)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    print('  '.join('-' * widths[c] for c in columns))
+    for row in table:
+        print('  '.join(fmt(row.get(c)).ljust(widths[c]) for c in columns))
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run waveform analyses over a directory of dumps")
+    parser.add_argument('root', nargs='?', default='.', help="directory to search for dumps")
+    parser.add_argument('--analyses', nargs='+', default=sorted(ANALYSES),
+                        choices=sorted(ANALYSES), help="analyses to run (default: all)")
+    parser.add_argument('--workers', type=int, help="process pool size (default: CPU count)")
+    parser.add_argument('--cache', help=f"cache file (default: <root>/{CACHE_FILE})")
+    parser.add_argument('--csv', metavar='FILE', help="also write the table as CSV")
+    args = parser.parse_args()
+
+    print("🧪 ChaCha20 Regression Waveform Analytics")
+    print("=" * 40)
+
+    paths = find_waveforms(args.root)
+    if not paths:
+        print(f"❌ No waveform dumps under {args.root}")
+        return 1
+
+    cache = ResultCache(args.cache or os.path.join(args.root, CACHE_FILE))
+    results = run_batch(paths, args.analyses, cache, args.workers)
+
+    print()
+    table = flatten(results, args.root)
+    columns = print_table(table)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(table)
+        print(f"\n📝 Wrote {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Waveform diff for ChaCha20 ASIC regressions
+Aligns two dumps by signal name and reports where each signal first diverges
+"""
+
+import argparse
+import fnmatch
+import sys
+
+from vcd_reader import open_waveform
+
+
+def extend_value(value, width):
+    """Left-extend a VCD vector value to its declared width (VCD rules)"""
+    if len(value) >= width:
+        return value
+    fill = value[0] if value[0] in 'xXzZ' else '0'
+    return fill * (width - len(value)) + value
+
+
+def normalized_changes(trace, width=None):
+    """Change list of a trace with padded values and redundant rewrites removed"""
+    width = width or trace.signal.width
+    times, values = [], []
+    last = None
+    for time, value in zip(trace.times, trace.values):
+        if width > 1:
+            value = extend_value(value, width)
+        if value != last:
+            times.append(time)
+            values.append(value)
+            last = value
+    return times, values
+
+
+def first_mismatch(a, b):
+    """Index of the first differing element of two lists
+
+    Identical regions are skipped with C-speed slice comparisons that grow
+    geometrically, then the mismatching block is bisected.
+    """
+    limit = min(len(a), len(b))
+    lo, step = 0, 64
+    while lo < limit:
+        hi = min(lo + step, limit)
+        if a[lo:hi] != b[lo:hi]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo, step = hi, step * 2
+    return limit if len(a) != len(b) else None
+
+
+def diff_signal(times_a, values_a, times_b, values_b, count=False):
+    """Compare two normalized change lists
+
+    Returns None when identical, otherwise a dict with the first divergence
+    time and the values on each side. With `count`, also the number of
+    separate divergent intervals and the total divergent time.
+    """
+    mismatches = [m for m in (first_mismatch(times_a, times_b),
+                              first_mismatch(values_a, values_b)) if m is not None]
+    if not mismatches:
+        return None
+    i = min(mismatches)
+
+    # Both sides agree on everything before change i
+    ta = times_a[i] if i < len(times_a) else None
+    tb = times_b[i] if i < len(times_b) else None
+    first_time = min(t for t in (ta, tb) if t is not None)
+
+    def value_at(times, values, t):
+        j = i if i < len(times) and times[i] <= t else i - 1
+        return values[j] if j >= 0 else None
+
+    result = {
+        'time': first_time,
+        'value_a': value_at(times_a, values_a, first_time),
+        'value_b': value_at(times_b, values_b, first_time),
+    }
+    if count:
+        intervals, divergent_time, open_at_end = count_divergence(
+            times_a, values_a, times_b, values_b, i)
+        result['intervals'] = intervals
+        result['divergent_time'] = divergent_time
+        result['diverged_at_end'] = open_at_end
+    return result
+
+
+def count_divergence(times_a, values_a, times_b, values_b, start):
+    """Merge-walk both change lists from `start`, counting disagreeing intervals
+
+    Returns (intervals, divergent_time, diverged_at_end); time still diverged
+    at the last change is not included in divergent_time.
+    """
+    ia = ib = start
+    va = values_a[start - 1] if start > 0 else None
+    vb = values_b[start - 1] if start > 0 else None
+    intervals = 0
+    divergent_time = 0
+    diverged_since = None
+    while ia < len(times_a) or ib < len(times_b):
+        ta = times_a[ia] if ia < len(times_a) else None
+        tb = times_b[ib] if ib < len(times_b) else None
+        t = min(x for x in (ta, tb) if x is not None)
+        if ta == t:
+            va = values_a[ia]
+            ia += 1
+        if tb == t:
+            vb = values_b[ib]
+            ib += 1
+        if va != vb and diverged_since is None:
+            intervals += 1
+            diverged_since = t
+        elif va == vb and diverged_since is not None:
+            divergent_time += t - diverged_since
+            diverged_since = None
+    return intervals, divergent_time, diverged_since is not None
+
+
+def diff_waveforms(path_a, path_b, patterns=None, count=False, strip_top=False):
+    """Diff every signal present in both dumps
+
+    Returns (divergences, only_a, only_b) where divergences maps signal name
+    to the diff_signal() result.
+    """
+    reader_a = open_waveform(path_a)
+    reader_b = open_waveform(path_b)
+
+    def key(path):
+        return path.split('.', 1)[-1] if strip_top else path
+
+    names_a = {key(p): p for p in reader_a.signals}
+    names_b = {key(p): p for p in reader_b.signals}
+    common = sorted(set(names_a) & set(names_b))
+    if patterns:
+        common = [n for n in common if any(fnmatch.fnmatch(n, pat) for pat in patterns)]
+
+    traces_a = reader_a.load([names_a[n] for n in common])
+    traces_b = reader_b.load([names_b[n] for n in common])
+
+    divergences = {}
+    for name in common:
+        trace_a, trace_b = traces_a[names_a[name]], traces_b[names_b[name]]
+        # A port resized between revisions still compares bit-for-bit
+        width = max(trace_a.signal.width, trace_b.signal.width)
+        times_a, values_a = normalized_changes(trace_a, width)
+        times_b, values_b = normalized_changes(trace_b, width)
+        result = diff_signal(times_a, values_a, times_b, values_b, count)
+        if result is not None:
+            divergences[name] = result
+
+    only_a = sorted(set(names_a) - set(names_b))
+    only_b = sorted(set(names_b) - set(names_a))
+    return divergences, only_a, only_b
+
+
+def format_value(value, width=40):
+    if value is None:
+        return '-'
+    return value if len(value) <= width else value[:width - 3] + '...'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two waveform dumps signal by signal")
+    parser.add_argument('before', help="reference dump (.vcd, .vcd.gz or .fst)")
+    parser.add_argument('after', help="dump to compare against the reference")
+    parser.add_argument('--signals', nargs='+', metavar='GLOB',
+                        help="only compare signals matching these patterns")
+    parser.add_argument('--count', action='store_true',
+                        help="also count divergent intervals per signal")
+    parser.add_argument('--strip-top', action='store_true',
+                        help="ignore the top-level testbench scope name when aligning")
+    args = parser.parse_args()
+
+    print("🔍 ChaCha20 Waveform Diff")
+    print("=" * 40)
+
+    divergences, only_a, only_b = diff_waveforms(args.before, args.after, args.signals,
+                                                 args.count, args.strip_top)
+
+    if only_a:
+        print(f"⚠️  {len(only_a)} signals only in {args.before}")
+    if only_b:
+        print(f"⚠️  {len(only_b)} signals only in {args.after}")
+
+    if not divergences:
+        print("✅ No divergence in common signals")
+        return 0
+
+    print(f"❌ {len(divergences)} signals diverge (ordered by first divergence):\n")
+    for name, result in sorted(divergences.items(), key=lambda item: (item[1]['time'], item[0])):
+        line = (f"  t={result['time']:<10} {name:<45} "
+                f"{format_value(result['value_a'])} -> {format_value(result['value_b'])}")
+        if args.count:
+            tail = " (still diverged at end)" if result['diverged_at_end'] else ""
+            line += f"  [{result['intervals']} intervals, {result['divergent_time']} time units{tail}]"
+        print(line)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Checkpoint index for random access into large VCD dumps
+One pass stores byte offsets plus full signal snapshots; queries seek and replay a short tail
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time as clock
+from bisect import bisect_right
+
+from vcd_reader import SCALAR_CHARS, SignalTrace, VCDReader
+
+INDEX_SUFFIX = '.vcdidx'
+INDEX_VERSION = 2
+DEFAULT_CHECKPOINTS = 256
+
+
+def _open_binary(path, fmt):
+    # gzip streams seek by decompressing forward; plain files seek directly
+    return gzip.open(path, 'rb') if fmt == 'vcd.gz' else open(path, 'rb')
+
+
+def _data_size(path, fmt):
+    """Size of the dump text: the gzip trailer records it (modulo 4 GiB) for .vcd.gz"""
+    size = os.path.getsize(path)
+    if fmt != 'vcd.gz':
+        return size
+    with open(path, 'rb') as f:
+        f.seek(-4, os.SEEK_END)
+        data_size = int.from_bytes(f.read(4), 'little')
+    # Past 4 GiB the field wraps; text dumps are far larger than their compressed stream
+    while size > 1 << 20 and data_size < size:
+        data_size += 1 << 32
+    return data_size
+
+
+def _parse_change(line):
+    """(code, value) for a value-change line, or None for anything else"""
+    first = line[0]
+    if first in 'bBrR':
+        parts = line.split()
+        return (parts[1], parts[0][1:]) if len(parts) > 1 else None
+    if first in SCALAR_CHARS:
+        return line[1:], first
+    return None
+
+
+def build_index(path, fmt, interval=None, checkpoints=DEFAULT_CHECKPOINTS):
+    """Scan a dump once and return its checkpoint list
+
+    Checkpoints are placed every `interval` time units when given, otherwise
+    every 1/`checkpoints` of the (uncompressed) dump, always on a timestamp boundary.
+    Each holds the time of the last timestamp before the boundary, the byte
+    offset of the next '#' line and the value of every id code at that point.
+    """
+    # Offsets count decompressed bytes, so the spacing must too
+    spacing = max(_data_size(path, fmt) // checkpoints, 1)
+    values = {}
+    result = []
+    current = -1
+    offset = 0
+    last_offset = None
+    next_time = interval
+    with _open_binary(path, fmt) as f:
+        for raw in f:
+            offset += len(raw)
+            if b'$enddefinitions' in raw:
+                break
+        # Body start: nothing has been dumped yet
+        result.append({'time': -1, 'offset': offset, 'values': {}})
+        last_offset = offset
+        for raw in f:
+            line = raw.decode('ascii', 'replace').strip()
+            if line.startswith('#'):
+                t = int(line[1:])
+                if interval is not None:
+                    due = t >= next_time
+                else:
+                    due = offset - last_offset >= spacing
+                if due and current >= 0:
+                    result.append({'time': current, 'offset': offset, 'values': dict(values)})
+                    last_offset = offset
+                    if interval is not None:
+                        next_time = (t // interval + 1) * interval
+                current = t
+            elif line:
+                change = _parse_change(line)
+                if change is not None:
+                    values[change[0]] = change[1]
+            offset += len(raw)
+    return result
+
+
+class IndexedWaveform(VCDReader):
+    """VCDReader with a sidecar checkpoint index for time-range queries"""
+
+    def __init__(self, path, rebuild=False, interval=None, checkpoints=DEFAULT_CHECKPOINTS):
+        super().__init__(path)
+        if self.format == 'fst':
+            raise ValueError("FST dumps are already indexed; convert to VCD for a checkpoint index")
+        self.index_path = self.path + INDEX_SUFFIX
+        self.checkpoints = None if rebuild else self._load_index()
+        if self.checkpoints is None:
+            self.checkpoints = build_index(self.path, self.format, interval, checkpoints)
+            self._save_index()
+        self._times = [cp['time'] for cp in self.checkpoints]
+
+    def _stamp(self):
+        st = os.stat(self.path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return None
+        with gzip.open(self.index_path, 'rt') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION or data.get('stamp') != self._stamp():
+            return None  # Stale: the dump was rewritten since indexing
+        return data['checkpoints']
+
+    def _save_index(self):
+        with gzip.open(self.index_path, 'wt') as f:
+            json.dump({'version': INDEX_VERSION, 'stamp': self._stamp(),
+                       'checkpoints': self.checkpoints}, f)
+
+    def checkpoint_for(self, time):
+        """Last checkpoint at or before `time`"""
+        return self.checkpoints[max(bisect_right(self._times, time) - 1, 0)]
+
+    def changes(self, codes=None, start=None, end=None):
+        """Stream (time, code, value) from the checkpoint before `start` up to `end`
+
+        The checkpoint snapshot is emitted first (at the checkpoint time), so
+        every requested signal has its value in effect at `start`. On .vcd.gz
+        the seek still decompresses from the start of the file; the index only
+        saves parsing the skipped part.
+        """
+        wanted = set(codes) if codes is not None else None
+        cp = self.checkpoint_for(start if start is not None else -1)
+        for code, value in cp['values'].items():
+            if wanted is None or code in wanted:
+                yield cp['time'], code, value
+
+        time = cp['time']
+        with _open_binary(self.path, self.format) as f:
+            f.seek(cp['offset'])
+            for raw in f:
+                line = raw.decode('ascii', 'replace').strip()
+                if not line:
+                    continue
+                if line.startswith('#'):
+                    time = int(line[1:])
+                    if end is not None and time > end:
+                        return
+                    continue
+                change = _parse_change(line)
+                if change is not None and (wanted is None or change[0] in wanted):
+                    yield time, change[0], change[1]
+
+    def load(self, names=None, start=None, end=None):
+        """Per-signal traces covering [start, end], read from the nearest checkpoint"""
+        selected = list(self.signals.values()) if names is None else [self.find(n) for n in names]
+        traces = {s.path: SignalTrace(s) for s in selected}
+        by_code = {}
+        for s in selected:
+            by_code.setdefault(s.code, []).append(traces[s.path])
+        for time, code, value in self.changes(by_code.keys(), start, end):
+            for trace in by_code[code]:
+                trace.append(time, value)
+        return traces
+
+    def values_at(self, names, time):
+        """Value of each named signal at `time`"""
+        traces = self.load(names, time, time)
+        return {path: trace.value_at(time) for path, trace in traces.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a VCD checkpoint index")
+    parser.add_argument('waveform', help="dump to index (.vcd or .vcd.gz)")
+    parser.add_argument('--interval', type=int, help="checkpoint every N time units")
+    parser.add_argument('--checkpoints', type=int, default=DEFAULT_CHECKPOINTS,
+                        help="checkpoint count when spacing by file size (default: 256)")
+    parser.add_argument('--rebuild', action='store_true', help="ignore an existing index")
+    parser.add_argument('--at', type=int, metavar='TIME', help="print signal values at TIME")
+    parser.add_argument('--signals', nargs='+', default=None, help="signals to print with --at")
+    args = parser.parse_args()
+
+    print("🗂️  ChaCha20 Waveform Checkpoint Index")
+    print("=" * 40)
+
+    started = clock.perf_counter()
+    wave = IndexedWaveform(args.waveform, args.rebuild, args.interval, args.checkpoints)
+    print(f"✅ {len(wave.checkpoints)} checkpoints ({wave.index_path}) "
+          f"in {clock.perf_counter() - started:.2f}s")
+
+    if args.at is not None:
+        started = clock.perf_counter()
+        names = args.signals or sorted(wave.signals)
+        values = wave.values_at(names, args.at)
+        print(f"\n🔎 Values at t={args.at} ({clock.perf_counter() - started:.3f}s):")
+        for path, value in values.items():
+            print(f"  {path:<50} {value if value is not None else '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
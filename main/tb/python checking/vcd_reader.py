@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Streaming waveform reader for ChaCha20 ASIC simulation dumps
+Reads plain VCD, gzip-compressed VCD (.vcd.gz) and FST through the same API
+"""
+
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+from bisect import bisect_right
+
+GZIP_MAGIC = b'\x1f\x8b'
+FST_HEADER_BLOCK = b'\x00'
+
+TIME_UNITS = {
+    's': 1.0,
+    'ms': 1e-3,
+    'us': 1e-6,
+    'ns': 1e-9,
+    'ps': 1e-12,
+    'fs': 1e-15
+}
+
+SCALAR_CHARS = '01xzXZuUwWlLhH-'
+
+
+def detect_format(path):
+    """Sniff the on-disk waveform format: 'vcd', 'vcd.gz' or 'fst'"""
+    with open(path, 'rb') as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return 'vcd.gz'
+    if magic[:1] == FST_HEADER_BLOCK:
+        return 'fst'
+    return 'vcd'
+
+
+class _ProcessStream:
+    """Text stream over a converter subprocess' stdout (used for FST)"""
+
+    def __init__(self, cmd):
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, text=True)
+        self.stream = self.proc.stdout
+
+    def __iter__(self):
+        return iter(self.stream)
+
+    def readline(self):
+        return self.stream.readline()
+
+    def close(self):
+        self.stream.close()
+        if self.proc.poll() is None:
+            self.proc.terminate()
+        self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_waveform_stream(path):
+    """Open any supported waveform file as a stream of VCD text lines"""
+    fmt = detect_format(path)
+    if fmt == 'vcd.gz':
+        return gzip.open(path, 'rt')
+    if fmt == 'fst':
+        fst2vcd = shutil.which('fst2vcd')
+        if fst2vcd is None:
+            raise RuntimeError(f"{path} is an FST dump; install GTKWave (fst2vcd) to read it")
+        return _ProcessStream([fst2vcd, str(path)])
+    return open(path, 'r')
+
+
+def parse_timescale(text):
+    """Convert a $timescale body such as '1ps' or '10 ns' to seconds"""
+    text = text.replace(' ', '')
+    digits = text.rstrip('abcdefghijklmnopqrstuvwxyz')
+    unit = text[len(digits):]
+    return float(digits or 1) * TIME_UNITS.get(unit, 1e-9)
+
+
+class Signal:
+    """One $var declaration from the waveform header"""
+
+    def __init__(self, code, name, scope, width, var_type):
+        self.code = code
+        self.name = name
+        self.scope = scope
+        self.width = width
+        self.var_type = var_type
+        self.path = '.'.join(scope + [name])
+
+    def __repr__(self):
+        return f"Signal({self.path}, width={self.width}, code={self.code!r})"
+
+
+class SignalTrace:
+    """Value-change history of one signal, sorted by time"""
+
+    def __init__(self, signal):
+        self.signal = signal
+        self.times = []
+        self.values = []
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, time, value):
+        # $dumpvars and same-timestamp rewrites collapse into one entry
+        if self.times and self.times[-1] == time:
+            self.values[-1] = value
+        else:
+            self.times.append(time)
+            self.values.append(value)
+
+    def index_at(self, time):
+        """Index of the change in effect at `time` (-1 before the first change)"""
+        return bisect_right(self.times, time) - 1
+
+    def value_at(self, time):
+        """Signal value at `time`, or None before the first change"""
+        i = self.index_at(time)
+        return self.values[i] if i >= 0 else None
+
+
+def to_int(value):
+    """Convert a VCD value string to int, treating x/z bits as 0"""
+    try:
+        return int(value, 2)
+    except ValueError:
+        return int(''.join('1' if c == '1' else '0' for c in value), 2)
+
+
+class VCDReader:
+    """Header-plus-streaming reader for VCD, VCD.gz and FST waveform files"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.format = detect_format(self.path)
+        self.timescale = '1ns'
+        self.timescale_seconds = 1e-9
+        self.signals = {}   # hierarchical path -> Signal
+        self.codes = {}     # id code -> [Signal, ...] (aliases share a code)
+        self._read_header()
+
+    def _read_header(self):
+        scope = []
+        with open_waveform_stream(self.path) as stream:
+            tokens = []
+            for line in stream:
+                tokens.extend(line.split())
+                while '$end' in tokens:
+                    end = tokens.index('$end')
+                    command, tokens = tokens[:end], tokens[end + 1:]
+                    if command and command[0] == '$enddefinitions':
+                        return
+                    self._header_command(command, scope)
+
+    def _header_command(self, command, scope):
+        if not command:
+            return
+        keyword = command[0]
+        if keyword == '$timescale':
+            self.timescale = ''.join(command[1:])
+            self.timescale_seconds = parse_timescale(self.timescale)
+        elif keyword == '$scope':
+            scope.append(command[2] if len(command) > 2 else command[-1])
+        elif keyword == '$upscope':
+            if scope:
+                scope.pop()
+        elif keyword == '$var':
+            var_type, width, code, name = command[1], int(command[2]), command[3], command[4]
+            signal = Signal(code, name, list(scope), width, var_type)
+            self.signals[signal.path] = signal
+            self.codes.setdefault(code, []).append(signal)
+
+    def find(self, name):
+        """Resolve a full path or a unique suffix such as 'dut.fsm_state'"""
+        if name in self.signals:
+            return self.signals[name]
+        matches = [s for path, s in self.signals.items() if path.endswith('.' + name)]
+        if not matches:
+            raise KeyError(f"No signal named {name!r} in {self.path}")
+        # Prefer the shallowest match (e.g. the testbench clk over dut.clk)
+        return min(matches, key=lambda s: len(s.scope))
+
+    def changes(self, codes=None):
+        """Stream (time, code, value) tuples from the dump body"""
+        wanted = set(codes) if codes is not None else None
+        time = 0
+        with open_waveform_stream(self.path) as stream:
+            for line in stream:
+                if '$enddefinitions' in line:
+                    break
+            for line in stream:
+                line = line.strip()
+                if not line:
+                    continue
+                first = line[0]
+                if first == '#':
+                    time = int(line[1:])
+                    continue
+                if first in 'bBrR':
+                    parts = line.split()
+                    if len(parts) < 2:
+                        continue
+                    value, code = parts[0][1:], parts[1]
+                elif first in SCALAR_CHARS:
+                    value, code = first, line[1:]
+                else:
+                    continue    # $dumpvars / $dumpoff / $comment / $end
+                if wanted is None or code in wanted:
+                    yield time, code, value
+
+    def load(self, names=None):
+        """Load per-signal traces; `names` limits the read to those signals"""
+        if names is None:
+            selected = list(self.signals.values())
+        else:
+            selected = [self.find(name) for name in names]
+        traces = {s.path: SignalTrace(s) for s in selected}
+        by_code = {}
+        for s in selected:
+            by_code.setdefault(s.code, []).append(traces[s.path])
+        for time, code, value in self.changes(by_code.keys()):
+            for trace in by_code[code]:
+                trace.append(time, value)
+        return traces
+
+
+def open_waveform(path):
+    """Open a VCD, VCD.gz or FST waveform for reading"""
+    return VCDReader(path)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python vcd_reader.py <dump.vcd|dump.vcd.gz|dump.fst>")
+        return 1
+
+    path = sys.argv[1]
+    reader = open_waveform(path)
+    print(f"📊 {os.path.basename(path)} ({reader.format}, timescale {reader.timescale})")
+    print(f"   {len(reader.signals)} signals, {len(reader.codes)} unique id codes")
+
+    counts = {}
+    end_time = 0
+    for time, code, _ in reader.changes():
+        counts[code] = counts.get(code, 0) + 1
+        end_time = time
+    print(f"   End time: {end_time}")
+
+    for path_name, signal in sorted(reader.signals.items()):
+        print(f"  {path_name:<50} {signal.width:>4} bits  {counts.get(signal.code, 0):>6} changes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,7 @@
 Generates all visualizations and organizes files for presentation
 """
 
-import os
 import sys
-import subprocess
 import shutil
 from pathlib import Path
 
@@ -96,35 +94,15 @@ class PresentationOrganizer:
     def generate_visualizations(self):
         """Generate all visualizations"""
         vis_dir = self.presentation_dir / "visualization"
-        os.chdir(vis_dir)
-        
-        print("\n🎨 Generating 3D chip visualization...")
-        try:
-            result = subprocess.run([sys.executable, "chip_3d_generator.py"], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ 3D visualization generated")
-            else:
-                print(f"❌ 3D generation failed: {result.stderr}")
-        except Exception as e:
-            print(f"❌ Error generating 3D: {e}")
-        
-        print("\n📊 Generating block diagrams...")
-        try:
-            result = subprocess.run([sys.executable, "block_diagram_generator.py"],
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ Block diagrams generated")
-            else:
-                print(f"❌ Block diagram failed: {result.stderr}")
-        except Exception as e:
-            print(f"❌ Error generating diagrams: {e}")
+        sys.path.insert(0, str(vis_dir))
+        from image_build import build_images
         
-        # Move generated images to images folder
-        images_dir = self.presentation_dir / "images"
-        for img_file in vis_dir.glob("*.png"):
-            shutil.move(img_file, images_dir / img_file.name)
-            print(f"🖼️  Moved image: {img_file.name}")
+        # Stale images are regenerated concurrently, straight into the images folder
+        print("\n🎨 Regenerating out-of-date visualizations...")
+        if build_images(images_dir=self.presentation_dir / "images"):
+            print("✅ Visualizations up to date")
+        else:
+            print("❌ Some visualizations failed to generate")
     
     def create_documentation(self):
         """Create presentation documentation"""
@@ -48,17 +48,10 @@ def main():
     elif choice == "3":
         vis_dir = base_dir / "visualization"
         if vis_dir.exists():
-            os.chdir(vis_dir)
-            print("Generating 3D visualization...")
-            subprocess.run([sys.executable, "chip_3d_generator_fixed.py"])
-            print("Generating block diagrams...")
-            subprocess.run([sys.executable, "block_diagram_generator_fixed.py"])
-            
-            # Move images
-            images_dir = base_dir / "images"
-            for img in vis_dir.glob("*.png"):
-                img.rename(images_dir / img.name)
-                print(f"Moved: {img.name}")
+            # Only images whose generator or inputs changed are regenerated
+            sys.path.insert(0, str(vis_dir))
+            from image_build import build_images
+            build_images(images_dir=base_dir / "images")
         else:
             print("Visualization scripts not found")
     
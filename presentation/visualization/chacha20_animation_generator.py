@@ -3,25 +3,58 @@ ChaCha20 ASIC Animated Visualization Generator
 Creates dynamic animations showing the encryption process, data flow, and FSM states
 """
 
+import argparse
+import sys
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
 from matplotlib.patches import Rectangle, FancyBboxPatch, Circle, Arrow
 import matplotlib.patches as mpatches
 
+from headless import preview_enabled
+from parallel_export import export_animation
+from rtl_fsm import ASIC_TOP_RTL, extract_fsm
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / 'main' / 'tb' / 'python checking'))
+
+from live_metrics import BLOCK_BITS, replay_metrics
+
+# Simulation the throughput and activity meters are measured from
+DEFAULT_WAVEFORM = REPO_ROOT / 'presentation' / 'verification' / 'simulation_results' / 'integration' / 'tb_asic_top_full_cycle.vcd'
+
+# Data blocks spawn every 10 frames and move 0.3 per frame until x reaches 16
+BLOCK_SPAWN_INTERVAL = 10
+BLOCK_SPEED = 0.3
+BLOCK_END_X = 16
+# A block lives 53 frames, so at most 6 are on screen; 8 patch slots is plenty
+MAX_DATA_BLOCKS = 8
+# Round counter and FSM state advance every 20 frames
+STEP_INTERVAL = 20
+
+def short_state_name(state):
+    """Timeline label: first four letters, or initials for multi-word states (CORE_WAIT -> CW)"""
+    words = state.split('_')
+    return state[:4] if len(words) == 1 else ''.join(word[0] for word in words)
+
 class ChaCha20Animator:
-    def __init__(self):
+    def __init__(self, waveform=DEFAULT_WAVEFORM):
         self.fig, self.ax = plt.subplots(figsize=(16, 12))
         self.frame_count = 120  # 6 seconds at 20fps
-        
-        # Animation state
-        self.current_state = 0
-        self.round_counter = 0
-        self.data_blocks = []
+        self.waveform = str(waveform)
         
         # FSM States
-        self.fsm_states = ['IDLE', 'ACQUIRE', 'LOAD_IN', 'CORE', 'CORE_WAIT', 'OUTPUT', 'COMPLETE']
-        self.current_fsm = 0
+        # Main controller states in encoding order, read from the RTL so the timeline tracks asic_top.v
+        self.fsm_states = extract_fsm(ASIC_TOP_RTL).state_names()
+        self.timeline_step = min(1.8, 13 / max(len(self.fsm_states) - 1, 1))
+        
+        # Meter readings measured from a simulation run rather than made up
+        self.load_metrics()
+        
+        # Animation state: precomputed per frame, so any frame renders on its own
+        self.compute_trajectories(self.frame_count)
         
         # Colors
         self.colors = {
@@ -34,6 +67,68 @@ class ChaCha20Animator:
             'inactive': '#4C566A'
         }
         
+    def load_metrics(self):
+        """Running throughput and toggle activity per window of the recorded simulation"""
+        metrics = replay_metrics(self.waveform)
+        history = metrics.history
+        if history['cycle']:
+            cycles = np.asarray(history['cycle'], dtype=float)
+            blocks = np.asarray(history['blocks'], dtype=float)
+            self.run_throughput = blocks * BLOCK_BITS / (cycles * metrics.period_ns)
+            self.run_activity = np.asarray(history['activity'])
+        else:
+            # Shorter than one window: hold the whole-run figures
+            snapshot = metrics.snapshot()
+            self.run_throughput = np.array([snapshot['throughput_gbps']])
+            self.run_activity = np.array([snapshot['activity']])
+    
+    def compute_trajectories(self, frame_count):
+        """Precompute every animated quantity as an array indexed by frame"""
+        frames = np.arange(frame_count)
+        
+        # Block k spawns at frame 10k and has already moved one step on that frame
+        spawns = np.arange(0, frame_count, BLOCK_SPAWN_INTERVAL)
+        x = BLOCK_SPEED * (frames[:, None] - spawns[None, :] + 1)
+        live = (frames[:, None] >= spawns[None, :]) & (x < BLOCK_END_X)
+        self.block_x = np.full((frame_count, MAX_DATA_BLOCKS), np.nan)
+        for k in range(len(spawns)):
+            slot = self.block_x[:, k % MAX_DATA_BLOCKS]
+            slot[live[:, k]] = x[live[:, k], k]
+        
+        steps = frames // STEP_INTERVAL + 1
+        self.round_at = steps % 21
+        self.fsm_at = steps % len(self.fsm_states)
+        
+        round_phase = (frames % STEP_INTERVAL) / STEP_INTERVAL
+        angles = np.arange(4)[None, :] * np.pi/2 + round_phase[:, None] * np.pi/2
+        self.qr_x = 8 + 1.2 * np.cos(angles)
+        self.qr_y = 5.5 + 1.2 * np.sin(angles)
+        
+        # Meters replay the simulation's windows once over the animation
+        windows = frames * len(self.run_throughput) // frame_count
+        self.throughput = self.run_throughput[windows]
+        self.activity = self.run_activity[windows]
+        self.military = frames % 60 < 30
+    
+    def timeline_x(self, i):
+        """x position of the i-th FSM state box on the bottom timeline"""
+        return 2 + i * self.timeline_step
+    
+    def frame_state(self, frame):
+        """Animation state at `frame`, looked up from the precomputed trajectories"""
+        if frame >= len(self.round_at):
+            self.compute_trajectories(max(frame + 1, self.frame_count))
+        return {
+            'block_x': self.block_x[frame],
+            'round': int(self.round_at[frame]),
+            'fsm': int(self.fsm_at[frame]),
+            'qr_x': self.qr_x[frame],
+            'qr_y': self.qr_y[frame],
+            'throughput': self.throughput[frame],
+            'activity': self.activity[frame],
+            'security': "MILITARY GRADE" if self.military[frame] else "AES-256 EQUIV"
+        }
+    
     def setup_plot(self):
         """Setup the main plot area"""
         self.ax.set_xlim(0, 16)
@@ -46,7 +141,7 @@ class ChaCha20Animator:
         self.ax.text(8, 11.5, 'ChaCha20 ASIC - Live Encryption Process', 
                     fontsize=20, ha='center', color='white', weight='bold')
         
-    def draw_chip_layout(self):
+    def draw_chip_layout(self, frame=0):
         """Draw the main chip layout"""
         # Main chip boundary
         chip = FancyBboxPatch((1, 1), 14, 9, 
@@ -104,56 +199,32 @@ class ChaCha20Animator:
                                  edgecolor='red',
                                  linewidth=2)
         self.ax.add_patch(fsm_ctrl)
-        self.ax.text(8, 2.25, f'FSM: {self.fsm_states[self.current_fsm]}', 
-                    ha='center', va='center', color='white', weight='bold', fontsize=11)
+        self.fsm_label = self.ax.text(8, 2.25, f'FSM: {self.fsm_states[self.fsm_at[frame]]}', 
+                                      ha='center', va='center', color='white', weight='bold', fontsize=11)
         
     def draw_data_flow(self, frame):
         """Animate data flowing through the chip"""
-        # Calculate animation phase
-        phase = (frame % 40) / 40.0
-        
-        # Data blocks moving through pipeline
-        if frame % 10 == 0:
-            self.data_blocks.append({'x': 0, 'y': 5.5, 'active': True})
-        
-        # Update and draw data blocks
-        active_blocks = []
-        for block in self.data_blocks:
-            if block['active']:
-                block['x'] += 0.3
-                
-                # Data block visualization
-                if block['x'] < 16:
-                    color = self.colors['data'] if block['x'] < 12 else self.colors['active']
-                    data_rect = Rectangle((block['x'], block['y']-0.2), 0.4, 0.4,
-                                        facecolor=color, edgecolor='yellow', alpha=0.8)
-                    self.ax.add_patch(data_rect)
-                    active_blocks.append(block)
-        
-        self.data_blocks = active_blocks
+        for x in self.frame_state(frame)['block_x']:
+            if np.isnan(x):
+                continue
+            color = self.colors['data'] if x < 12 else self.colors['active']
+            data_rect = Rectangle((x, 5.3), 0.4, 0.4,
+                                facecolor=color, edgecolor='yellow', alpha=0.8)
+            self.ax.add_patch(data_rect)
         
     def draw_round_animation(self, frame):
         """Show ChaCha20 rounds animation"""
-        # Round counter animation
-        round_phase = (frame % 20) / 20.0
-        if frame % 20 == 0:
-            self.round_counter = (self.round_counter + 1) % 21
+        state = self.frame_state(frame)
             
         # Draw round indicator
-        round_text = f"Round: {self.round_counter}/20"
+        round_text = f"Round: {state['round']}/20"
         self.ax.text(8, 6.5, round_text, ha='center', va='center',
                     color='yellow', weight='bold', fontsize=10,
                     bbox=dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.7))
         
         # Quarter round animation (4 blocks rotating)
-        if self.round_counter > 0:
-            center_x, center_y = 8, 5.5
-            radius = 1.2
-            for i in range(4):
-                angle = (i * np.pi/2) + (round_phase * np.pi/2)
-                x = center_x + radius * np.cos(angle)
-                y = center_y + radius * np.sin(angle)
-                
+        if state['round'] > 0:
+            for i, (x, y) in enumerate(zip(state['qr_x'], state['qr_y'])):
                 qr_circle = Circle((x, y), 0.15, 
                                  facecolor='cyan', edgecolor='white', alpha=0.8)
                 self.ax.add_patch(qr_circle)
@@ -162,18 +233,13 @@ class ChaCha20Animator:
     
     def draw_fsm_animation(self, frame):
         """Animate FSM state transitions"""
-        # FSM state progression
-        if frame % 20 == 0:
-            self.current_fsm = (self.current_fsm + 1) % len(self.fsm_states)
-        
-        # FSM State indicator with glow effect
-        glow_alpha = 0.3 + 0.4 * np.sin(frame * 0.3)
+        current_fsm = self.frame_state(frame)['fsm']
         
         # State timeline at bottom
         for i, state in enumerate(self.fsm_states):
-            x_pos = 2 + i * 1.8
-            color = self.colors['active'] if i == self.current_fsm else self.colors['inactive']
-            alpha = 1.0 if i == self.current_fsm else 0.5
+            x_pos = self.timeline_x(i)
+            color = self.colors['active'] if i == current_fsm else self.colors['inactive']
+            alpha = 1.0 if i == current_fsm else 0.5
             
             state_box = FancyBboxPatch((x_pos-0.4, 0.2), 0.8, 0.6,
                                       boxstyle="round,pad=0.05",
@@ -181,14 +247,14 @@ class ChaCha20Animator:
                                       edgecolor='white')
             self.ax.add_patch(state_box)
             
-            text_color = 'white' if i == self.current_fsm else 'gray'
-            self.ax.text(x_pos, 0.5, state[:4], ha='center', va='center',
+            text_color = 'white' if i == current_fsm else 'gray'
+            self.ax.text(x_pos, 0.5, short_state_name(state), ha='center', va='center',
                         color=text_color, fontsize=8, weight='bold')
         
         # Connection lines between states
         for i in range(len(self.fsm_states)-1):
-            x1 = 2 + i * 1.8 + 0.4
-            x2 = 2 + (i+1) * 1.8 - 0.4
+            x1 = self.timeline_x(i) + 0.4
+            x2 = self.timeline_x(i+1) - 0.4
             arrow = mpatches.FancyArrowPatch((x1, 0.5), (x2, 0.5),
                                            arrowstyle='->', mutation_scale=15,
                                            color='white', alpha=0.6)
@@ -196,31 +262,42 @@ class ChaCha20Animator:
     
     def draw_performance_meters(self, frame):
         """Show performance metrics"""
+        state = self.frame_state(frame)
+        
         # Throughput meter
-        throughput = 50 + 30 * np.sin(frame * 0.1)
-        self.ax.text(14.5, 10, f'Throughput\n{throughput:.1f} Gbps', 
+        self.ax.text(14.5, 10, f'Throughput\n{state["throughput"]:.3f} Gbps', 
                     ha='center', va='center', color='lime', fontsize=10,
                     bbox=dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.8))
         
-        # Power meter
-        power = 100 + 20 * np.sin(frame * 0.15 + 1)
-        self.ax.text(1.5, 10, f'Power\n{power:.1f} mW', 
+        # Toggle activity meter
+        self.ax.text(1.5, 10, f'Toggle activity\n{100 * state["activity"]:.1f}% / cycle', 
                     ha='center', va='center', color='orange', fontsize=10,
                     bbox=dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.8))
         
         # Security level indicator
-        security_level = "MILITARY GRADE" if frame % 60 < 30 else "AES-256 EQUIV"
-        self.ax.text(8, 9.5, f'Security: {security_level}', 
+        self.ax.text(8, 9.5, f'Security: {state["security"]}', 
                     ha='center', va='center', color='red', fontsize=12, weight='bold',
                     bbox=dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.8))
     
+    def draw_legend(self):
+        """Add the component color legend"""
+        legend_elements = [
+            mpatches.Patch(color=self.colors['core'], label='ChaCha20 Core'),
+            mpatches.Patch(color=self.colors['trng'], label='TRNG Module'),
+            mpatches.Patch(color=self.colors['io'], label='I/O Controllers'),
+            mpatches.Patch(color=self.colors['data'], label='Data Flow'),
+            mpatches.Patch(color=self.colors['active'], label='Active State')
+        ]
+        self.ax.legend(handles=legend_elements, loc='upper right', 
+                      bbox_to_anchor=(0.98, 0.98), fontsize=9)
+    
     def animate_frame(self, frame):
-        """Main animation function"""
+        """Main animation function (redraw mode: rebuilds every artist)"""
         self.ax.clear()
         self.setup_plot()
         
         # Draw static elements
-        self.draw_chip_layout()
+        self.draw_chip_layout(frame)
         
         # Draw animated elements
         self.draw_data_flow(frame)
@@ -229,26 +306,150 @@ class ChaCha20Animator:
         self.draw_performance_meters(frame)
         
         # Add legend
-        legend_elements = [
-            mpatches.Patch(color=self.colors['core'], label='ChaCha20 Core'),
-            mpatches.Patch(color=self.colors['trng'], label='TRNG Module'),
-            mpatches.Patch(color=self.colors['io'], label='I/O Controllers'),
-            mpatches.Patch(color=self.colors['data'], label='Data Flow'),
-            mpatches.Patch(color=self.colors['active'], label='Active State')
-        ]
-        self.ax.legend(handles=legend_elements, loc='upper right', 
-                      bbox_to_anchor=(0.98, 0.98), fontsize=9)
+        self.draw_legend()
         
         return []
     
-    def create_animation(self, filename='chacha20_asic_animation.gif'):
-        """Create and save the animation"""
+    def build_static_layer(self):
+        """Draw the parts of the scene that never change, once per figure"""
+        self.ax.clear()
+        self.setup_plot()
+        self.draw_chip_layout()
+        self.fsm_label.set_animated(True)
+        
+        # Arrows between the FSM timeline boxes
+        for i in range(len(self.fsm_states)-1):
+            x1 = self.timeline_x(i) + 0.4
+            x2 = self.timeline_x(i+1) - 0.4
+            arrow = mpatches.FancyArrowPatch((x1, 0.5), (x2, 0.5),
+                                           arrowstyle='->', mutation_scale=15,
+                                           color='white', alpha=0.6)
+            self.ax.add_patch(arrow)
+        
+        self.draw_legend()
+        self.create_dynamic_artists()
+        self.static_built = True
+    
+    def create_dynamic_artists(self):
+        """Create the per-frame artists once; frames only update their properties"""
+        meter_box = dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.8)
+        
+        self.block_patches = []
+        for _ in range(MAX_DATA_BLOCKS):
+            patch = Rectangle((0, 5.3), 0.4, 0.4, facecolor=self.colors['data'],
+                              edgecolor='yellow', alpha=0.8, visible=False, animated=True)
+            self.ax.add_patch(patch)
+            self.block_patches.append(patch)
+        
+        self.round_label = self.ax.text(8, 6.5, '', ha='center', va='center',
+                                        color='yellow', weight='bold', fontsize=10,
+                                        bbox=dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.7),
+                                        animated=True)
+        
+        self.qr_circles = []
+        self.qr_labels = []
+        for i in range(4):
+            circle = Circle((8, 5.5), 0.15, facecolor='cyan', edgecolor='white',
+                            alpha=0.8, animated=True)
+            self.ax.add_patch(circle)
+            self.qr_circles.append(circle)
+            self.qr_labels.append(self.ax.text(8, 5.5, f'QR{i+1}', ha='center', va='center',
+                                               color='black', fontsize=8, weight='bold',
+                                               animated=True))
+        
+        self.state_boxes = []
+        self.state_labels = []
+        for i, state in enumerate(self.fsm_states):
+            x_pos = self.timeline_x(i)
+            box = FancyBboxPatch((x_pos-0.4, 0.2), 0.8, 0.6,
+                                 boxstyle="round,pad=0.05",
+                                 facecolor=self.colors['inactive'], alpha=0.5,
+                                 edgecolor='white', animated=True)
+            self.ax.add_patch(box)
+            self.state_boxes.append(box)
+            self.state_labels.append(self.ax.text(x_pos, 0.5, short_state_name(state), ha='center', va='center',
+                                                  color='gray', fontsize=8, weight='bold',
+                                                  animated=True))
+        
+        self.throughput_label = self.ax.text(14.5, 10, '', ha='center', va='center',
+                                             color='lime', fontsize=10, bbox=meter_box,
+                                             animated=True)
+        self.activity_label = self.ax.text(1.5, 10, '', ha='center', va='center',
+                                           color='orange', fontsize=10, bbox=meter_box,
+                                           animated=True)
+        self.security_label = self.ax.text(8, 9.5, '', ha='center', va='center',
+                                           color='red', fontsize=12, weight='bold',
+                                           bbox=meter_box, animated=True)
+        
+        self.dynamic_artists = (self.block_patches + [self.round_label] +
+                                self.qr_circles + self.qr_labels +
+                                self.state_boxes + self.state_labels +
+                                [self.fsm_label, self.throughput_label,
+                                 self.activity_label, self.security_label])
+    
+    def init_blit(self):
+        """FuncAnimation init_func: build the static layer once"""
+        if not getattr(self, 'static_built', False):
+            self.build_static_layer()
+        return self.dynamic_artists
+    
+    def update_frame(self, frame):
+        """Blit-mode animation function: update the dynamic artists in place"""
+        if not getattr(self, 'static_built', False):
+            self.build_static_layer()
+        state = self.frame_state(frame)
+        
+        # Data blocks (one fixed patch slot per block)
+        for x, patch in zip(state['block_x'], self.block_patches):
+            if np.isnan(x):
+                patch.set_visible(False)
+                continue
+            patch.set_xy((x, 5.3))
+            patch.set_facecolor(self.colors['data'] if x < 12 else self.colors['active'])
+            patch.set_visible(True)
+        
+        # Round counter and quarter-round circles
+        self.round_label.set_text(f"Round: {state['round']}/20")
+        show_qr = state['round'] > 0
+        for circle, label, x, y in zip(self.qr_circles, self.qr_labels, state['qr_x'], state['qr_y']):
+            circle.center = (x, y)
+            label.set_position((x, y))
+            circle.set_visible(show_qr)
+            label.set_visible(show_qr)
+        
+        # FSM controller label and state timeline
+        self.fsm_label.set_text(f"FSM: {self.fsm_states[state['fsm']]}")
+        for i, (box, label) in enumerate(zip(self.state_boxes, self.state_labels)):
+            active = i == state['fsm']
+            box.set_facecolor(self.colors['active'] if active else self.colors['inactive'])
+            box.set_alpha(1.0 if active else 0.5)
+            label.set_color('white' if active else 'gray')
+        
+        # Performance meters
+        self.throughput_label.set_text(f"Throughput\n{state['throughput']:.3f} Gbps")
+        self.activity_label.set_text(f"Toggle activity\n{100 * state['activity']:.1f}% / cycle")
+        self.security_label.set_text(f"Security: {state['security']}")
+        
+        return self.dynamic_artists
+    
+    def create_animation(self, filename='chacha20_asic_animation.gif', mode='blit'):
+        """Create and save the animation
+        
+        mode='blit' builds the chip layout once and only updates the moving
+        artists; mode='redraw' clears and rebuilds the whole scene per frame.
+        """
         print("Creating ChaCha20 ASIC animation...")
         
         # Create animation
-        anim = animation.FuncAnimation(self.fig, self.animate_frame, 
-                                     frames=self.frame_count, 
-                                     interval=50, blit=False, repeat=True)
+        if mode == 'blit':
+            anim = animation.FuncAnimation(self.fig, self.update_frame,
+                                         init_func=self.init_blit,
+                                         frames=self.frame_count,
+                                         interval=50, blit=True, repeat=True)
+        else:
+            anim = animation.FuncAnimation(self.fig, self.animate_frame, 
+                                         frames=self.frame_count, 
+                                         interval=50, blit=False, repeat=True)
         
         # Save as GIF
         print(f"Saving animation as {filename}...")
@@ -259,22 +460,47 @@ class ChaCha20Animator:
         print(f"File: {filename}")
         
         return anim
+    
+    def export(self, filename='chacha20_asic_animation.gif', dpi=100, workers=None):
+        """Render the animation in a process pool and encode it (GIF via pillow, else ffmpeg)"""
+        print(f"Exporting ChaCha20 ASIC animation to {filename}...")
+        return export_animation(ChaCha20Animator, 'update_frame', self.frame_count,
+                                filename, fps=20, dpi=dpi, workers=workers,
+                                animator_kwargs={'waveform': self.waveform})
 
 def main():
     """Generate the ChaCha20 ASIC animation"""
-    animator = ChaCha20Animator()
+    parser = argparse.ArgumentParser(description="Render the ChaCha20 ASIC animation")
+    parser.add_argument('--output', default='chacha20_asic_animation.gif', help="GIF output file")
+    parser.add_argument('--waveform', default=str(DEFAULT_WAVEFORM),
+                        help="plain .vcd the throughput and activity meters are measured from")
+    parser.add_argument('--mp4', action='store_true', help="also encode an MP4 (needs ffmpeg)")
+    parser.add_argument('--workers', type=int, help="render processes (default: one per CPU)")
+    parser.add_argument('--no-preview', action='store_true',
+                        help="skip the live preview window (implied when no display is available)")
+    args = parser.parse_args()
+    
+    # Decided before the first figure exists, so batch runs never touch a GUI backend
+    preview = preview_enabled(not args.no_preview)
+    animator = ChaCha20Animator(args.waveform)
     
-    # Create animation
-    anim = animator.create_animation('chacha20_asic_animation.gif')
+    # Render frames in parallel
+    animator.export(args.output, workers=args.workers)
     
-    # Also create MP4 version if ffmpeg available
-    try:
-        anim.save('chacha20_asic_animation.mp4', writer='ffmpeg', fps=20, dpi=150)
-        print("MP4 version also saved!")
-    except:
-        print("MP4 save failed (ffmpeg not available), but GIF created successfully!")
+    if args.mp4:
+        try:
+            animator.export(str(Path(args.output).with_suffix('.mp4')), dpi=150, workers=args.workers)
+            print("MP4 version also saved!")
+        except RuntimeError as e:
+            print(f"MP4 save failed ({e}), but GIF created successfully!")
     
-    plt.show()
+    if preview:
+        anim = animation.FuncAnimation(animator.fig, animator.update_frame,
+                                       init_func=animator.init_blit,
+                                       frames=animator.frame_count,
+                                       interval=50, blit=True, repeat=True)
+        plt.show()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
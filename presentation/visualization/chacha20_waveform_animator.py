@@ -3,30 +3,158 @@ ChaCha20 ASIC Waveform Animation Generator
 Creates animated waveforms showing real simulation signals
 """
 
+import argparse
+import sys
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
 
+from headless import preview_enabled
+from parallel_export import export_animation
+from rtl_fsm import ASIC_TOP_RTL, CORE_RTL, LEGACY_ASIC_TOP_RTL, extract_fsm
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / 'main' / 'tb' / 'python checking'))
+
+from live_metrics import BLOCK_BITS, replay_metrics
+from vcd_index import IndexedWaveform
+from vcd_reader import detect_format, open_waveform, to_int
+
+DEFAULT_WAVEFORM = REPO_ROOT / 'presentation' / 'verification' / 'simulation_results' / 'integration' / 'tb_asic_top_full_cycle.vcd'
+
+# asic_top state encodings by register width, read from the RTL: the archived dumps were
+# recorded from the 3-bit controller, before the key/nonce streaming states were added
+ASIC_FSM_STATES = {fsm.width: fsm.state_names()
+                   for fsm in (extract_fsm(LEGACY_ASIC_TOP_RTL), extract_fsm(ASIC_TOP_RTL))}
+CORE_FSM_STATES = extract_fsm(CORE_RTL).state_names()
+
+# Digital lanes on the top plot, drawn if present in the dump
+HANDSHAKE_SIGNALS = ['in_state_valid', 'in_state_ready', 'out_state_valid',
+                     'out_state_ready', 'chunk_valid', 'trng_ready']
+
+
+def decode_trace(trace):
+    """Change times and integer values of a trace as NumPy arrays"""
+    times = np.asarray(trace.times, dtype=np.int64)
+    values = np.array([to_int(v) for v in trace.values], dtype=np.int64)
+    return times, values
+
+
+def bin_envelope(times, values, starts, width):
+    """Min/max of a step signal over each [start, start + width) bin
+
+    Each bin covers the value in effect at its left edge plus every change
+    inside it, so narrow pulses and fast clocks survive decimation.
+    """
+    lo = np.clip(np.searchsorted(times, starts, side='right') - 1, 0, None)
+    hi = np.maximum(np.searchsorted(times, starts + width, side='left'), lo + 1)
+    # reduceat over interleaved [lo, hi) pairs; even results are the bin reductions
+    padded = np.append(values, values[-1])
+    index = np.empty(2 * len(lo), dtype=np.int64)
+    index[0::2] = lo
+    index[1::2] = hi
+    return np.minimum.reduceat(padded, index)[0::2], np.maximum.reduceat(padded, index)[0::2]
+
+
 class WaveformAnimator:
-    def __init__(self):
+    def __init__(self, waveform=DEFAULT_WAVEFORM, indexed=False, frame_count=200,
+                 window_cycles=40, resolution=800, start=None, end=None):
         self.fig, (self.ax1, self.ax2, self.ax3) = plt.subplots(3, 1, figsize=(14, 10))
         self.fig.patch.set_facecolor('black')
-        
-        # Simulation parameters
-        self.time_window = 100
-        self.sample_rate = 50
-        self.frame_count = 200
-        
-        # Signal data
-        self.clk_data = []
-        self.fsm_data = []
-        self.data_valid = []
-        self.encryption_progress = []
-        
+
+        # Animation parameters
+        self.frame_count = frame_count
+        self.window_cycles = window_cycles
+        self.resolution = resolution    # min/max bins per window
+
+        self.waveform = str(waveform)
+        self.indexed = indexed
+        self.start = start              # animated time range, in dump time units
+        self.end = end
+        self.load_signals(indexed)
+        self.build_windows()
+
         self.setup_plots()
-        
+
+    def load_signals(self, indexed):
+        """Decode clock, FSM and handshake signals into arrays up front
+
+        With `indexed`, only the [start, end] range is read, from the checkpoint
+        before `start`; the plain reader parses the whole dump.
+        """
+        reader = IndexedWaveform(self.waveform) if indexed else open_waveform(self.waveform)
+        self.ns_per_unit = reader.timescale_seconds * 1e9
+
+        wanted = {'clk': 'clk', 'asic_fsm': 'fsm_state',
+                  'core_fsm': 'chacha_unit.fsm_state', 'round': 'chacha_unit.round_count'}
+        for name in HANDSHAKE_SIGNALS:
+            wanted[name] = name
+        resolved = {}
+        for key, name in wanted.items():
+            try:
+                resolved[key] = reader.find(name)
+            except KeyError:
+                pass
+        if 'clk' not in resolved:
+            raise KeyError(f"No clock signal in {self.waveform}")
+
+        paths = sorted({s.path for s in resolved.values()})
+        traces = reader.load(paths, self.start, self.end) if indexed else reader.load(paths)
+        self.signals = {key: decode_trace(traces[s.path]) for key, s in resolved.items()}
+        self.handshakes = [name for name in HANDSHAKE_SIGNALS if name in self.signals]
+
+        asic_width = resolved['asic_fsm'].width if 'asic_fsm' in resolved else 3
+        self.asic_states = ASIC_FSM_STATES.get(asic_width, [f'S{i}' for i in range(1 << asic_width)])
+
+        # Clock period from the spacing of rising edges
+        clk_times, clk_values = self.signals['clk']
+        rises = clk_times[1:][(clk_values[1:] == 1) & (clk_values[:-1] == 0)]
+        self.clock_period = int(np.median(np.diff(rises))) if len(rises) > 1 else 1
+        self.start_time = max(int(clk_times[0]), self.start or 0)
+        self.end_time = max(int(times[-1]) for times, _ in self.signals.values())
+        if self.end is not None:
+            self.end_time = min(self.end_time, self.end)
+
+        # Completed blocks and running throughput per clock cycle, for the title; only
+        # plain VCDs can be replayed by the incremental metrics reader, and the replay
+        # reads the whole dump, which an indexed range read is there to avoid
+        self.metrics = None
+        if detect_format(self.waveform) == 'vcd' and not indexed:
+            metrics = replay_metrics(self.waveform, window=1)
+            if metrics.history['cycle']:
+                self.metrics = {key: np.asarray(values) for key, values in metrics.history.items()}
+                self.metrics['throughput_gbps'] = (self.metrics['blocks'] * BLOCK_BITS /
+                                                   (self.metrics['cycle'] * metrics.period_ns))
+
+    def build_windows(self):
+        """Place each frame's window on a shared bin grid and precompute envelopes"""
+        window = self.window_cycles * self.clock_period
+        self.bin_width = max(window // self.resolution, 1)
+        window = self.bin_width * self.resolution
+
+        # Window start (in bins) for each frame, sliding evenly over the trace
+        span_bins = max((self.end_time - self.start_time - window) // self.bin_width, 0)
+        self.frame_bins = np.linspace(0, span_bins, self.frame_count).astype(np.int64)
+
+        # Only bins that some frame shows are computed, so cost is bounded by
+        # frame_count * resolution however long the trace is
+        needed = np.unique((self.frame_bins[:, None] + np.arange(self.resolution + 1)[None, :]).ravel())
+        self.needed_bins = needed
+        starts = self.start_time + needed * self.bin_width
+        self.envelopes = {key: bin_envelope(times, values, starts, self.bin_width)
+                          for key, (times, values) in self.signals.items()}
+
+    def window_at(self, frame):
+        """Bin times (ns) and per-signal (min, max) envelopes for one frame"""
+        first = np.searchsorted(self.needed_bins, self.frame_bins[frame])
+        span = slice(first, first + self.resolution + 1)
+        t = (self.start_time + self.needed_bins[span] * self.bin_width) * self.ns_per_unit
+        return t, {key: (lo[span], hi[span]) for key, (lo, hi) in self.envelopes.items()}
+
     def setup_plots(self):
-        """Setup the waveform plots"""
+        """Setup the waveform plots and create the line artists reused by every frame"""
         for ax in [self.ax1, self.ax2, self.ax3]:
             ax.set_facecolor('black')
             ax.tick_params(colors='white')
@@ -34,106 +162,142 @@ class WaveformAnimator:
             ax.spines['top'].set_color('white')
             ax.spines['left'].set_color('white')
             ax.spines['right'].set_color('white')
-        
+            ax.grid(True, alpha=0.3, color='gray')
+
         # Plot titles
         self.ax1.set_title('ChaCha20 ASIC - Clock & Control Signals', color='white', fontsize=14, weight='bold')
-        self.ax2.set_title('FSM State Transitions', color='white', fontsize=12)
-        self.ax3.set_title('Encryption Progress & Data Flow', color='white', fontsize=12)
-        
+        self.ax2.set_title('ASIC Top FSM State Transitions', color='white', fontsize=12)
+        self.ax3.set_title('ChaCha20 Core FSM & Round Progress', color='white', fontsize=12)
+
         self.ax3.set_xlabel('Time (ns)', color='white', fontsize=10)
-        
-    def generate_signals(self, frame):
-        """Generate realistic ASIC signals"""
-        t = np.linspace(frame, frame + self.time_window, self.sample_rate)
-        
-        # Clock signal (100MHz)
-        clk = 0.5 * (1 + np.sign(np.sin(2 * np.pi * 0.1 * t)))
-        
-        # FSM states (encoded as integers)
-        fsm_state = ((frame // 20) % 7)  # 7 FSM states cycling
-        fsm = np.full_like(t, fsm_state)
-        
-        # Data valid signal
-        data_valid = np.random.choice([0, 1], size=len(t), p=[0.3, 0.7])
-        
-        # Encryption progress (0-20 rounds)
-        round_progress = (frame % 400) / 20  # 20 rounds over 400 frames
-        progress = np.full_like(t, min(round_progress, 20))
-        
-        return t, clk, fsm, data_valid, progress
-    
+
+        # Plot 1: clock and handshakes as stacked digital lanes
+        lanes = ['clk'] + self.handshakes
+        lane_colors = ['cyan', 'lime', 'springgreen', 'magenta', 'violet', 'gold', 'orange']
+        self.lanes = {}
+        for i, name in enumerate(lanes):
+            offset = 1.5 * (len(lanes) - 1 - i)
+            line, = self.ax1.plot([], [], color=lane_colors[i % len(lane_colors)], linewidth=1.5)
+            self.lanes[name] = (line, offset)
+        self.ax1.set_ylim(-0.3, 1.5 * len(lanes) - 0.2)
+        self.ax1.set_yticks([offset + 0.5 for _, offset in self.lanes.values()])
+        self.ax1.set_yticklabels([name.upper() for name in self.lanes], fontsize=8)
+
+        # Plot 2: asic_top FSM
+        self.asic_line, = self.ax2.plot([], [], 'red', linewidth=3)
+        self.ax2.set_ylim(-0.5, len(self.asic_states) - 0.5)
+        self.ax2.set_yticks(range(len(self.asic_states)))
+        self.ax2.set_yticklabels(self.asic_states, fontsize=8)
+
+        # Plot 3: ChaCha20 core FSM, with the double-round counter on a second axis
+        self.core_line, = self.ax3.plot([], [], 'orange', linewidth=2, label='Core FSM')
+        self.ax3.set_ylim(-0.5, len(CORE_FSM_STATES) - 0.5)
+        self.ax3.set_yticks(range(len(CORE_FSM_STATES)))
+        self.ax3.set_yticklabels(CORE_FSM_STATES, fontsize=8)
+        self.round_ax = self.ax3.twinx()
+        self.round_ax.tick_params(colors='yellow')
+        self.round_line, = self.round_ax.plot([], [], 'yellow', linewidth=2, label='Round')
+        # Older cores count single rounds (to 20), newer ones double rounds (to 10)
+        self.round_max = max(10, int(self.signals['round'][1].max())) if 'round' in self.signals else 10
+        self.round_ax.set_ylim(-0.5, self.round_max + 0.5)
+
+        self.title = self.fig.suptitle('', color='white', fontsize=16, weight='bold')
+
+    @staticmethod
+    def envelope_path(t, lo, hi):
+        """Polyline through each bin's min then max (min/max decimation)"""
+        return np.repeat(t, 2), np.column_stack((lo, hi)).ravel()
+
     def animate_waveforms(self, frame):
         """Update waveform displays"""
-        # Clear previous plots
-        self.ax1.clear()
-        self.ax2.clear() 
-        self.ax3.clear()
-        
-        # Generate new signals
-        t, clk, fsm, data_valid, progress = self.generate_signals(frame)
-        
+        t, env = self.window_at(frame)
+
         # Plot 1: Clock and control signals
-        self.ax1.plot(t, clk, 'cyan', linewidth=2, label='CLK (100MHz)')
-        self.ax1.plot(t, data_valid * 0.8, 'lime', linewidth=2, label='DATA_VALID')
-        self.ax1.set_ylim(-0.2, 1.2)
-        self.ax1.legend(loc='upper right', fancybox=True, framealpha=0.8)
-        self.ax1.grid(True, alpha=0.3, color='gray')
-        
-        # Plot 2: FSM states
-        fsm_names = ['IDLE', 'ACQUIRE', 'LOAD_IN', 'CORE', 'CORE_WAIT', 'OUTPUT', 'COMPLETE']
-        current_state = int(fsm[0])
-        
-        self.ax2.plot(t, fsm, 'red', linewidth=3, label=f'Current: {fsm_names[current_state]}')
-        self.ax2.set_ylim(-0.5, 6.5)
-        self.ax2.set_yticks(range(7))
-        self.ax2.set_yticklabels(fsm_names, fontsize=8)
-        self.ax2.legend(loc='upper right', fancybox=True, framealpha=0.8)
-        self.ax2.grid(True, alpha=0.3, color='gray')
-        
-        # Plot 3: Encryption progress
-        self.ax3.plot(t, progress, 'yellow', linewidth=2, label=f'Round: {int(progress[0])}/20')
-        
-        # Add some noise to simulate real data
-        noise = 0.1 * np.random.randn(len(t))
-        data_signal = 10 + 2 * np.sin(0.05 * t) + noise
-        self.ax3.plot(t, data_signal, 'orange', alpha=0.7, linewidth=1, label='Data Activity')
-        
-        self.ax3.set_ylim(-1, 25)
-        self.ax3.legend(loc='upper right', fancybox=True, framealpha=0.8)
-        self.ax3.grid(True, alpha=0.3, color='gray')
-        
-        # Add performance metrics
-        throughput = 50 + 20 * np.sin(frame * 0.1)
-        power = 100 + 15 * np.sin(frame * 0.08)
-        
-        self.fig.suptitle(f'ChaCha20 ASIC Live Simulation | Throughput: {throughput:.1f} Gbps | Power: {power:.1f} mW', 
-                         color='white', fontsize=16, weight='bold')
-        
+        for name, (line, offset) in self.lanes.items():
+            x, y = self.envelope_path(t, *env[name])
+            line.set_data(x, np.minimum(y, 1) + offset)
+
+        # Plot 2 and 3: FSM states and round counter
+        current = {}
+        for key, line in (('asic_fsm', self.asic_line), ('core_fsm', self.core_line),
+                          ('round', self.round_line)):
+            if key in env:
+                line.set_data(*self.envelope_path(t, *env[key]))
+                current[key] = int(env[key][1][-1])
+        for ax in (self.ax1, self.ax2, self.ax3):
+            ax.set_xlim(t[0], t[-1])
+
+        asic_state = current.get('asic_fsm', 0)
+        asic_name = self.asic_states[asic_state] if asic_state < len(self.asic_states) else str(asic_state)
+        title = (f'ChaCha20 ASIC Simulation | {Path(self.waveform).name} | '
+                 f'{t[-1]:.0f} ns | FSM: {asic_name} | Round: {current.get("round", 0)}/{self.round_max}')
+        if self.metrics is not None:
+            i = max(np.searchsorted(self.metrics['time_ns'], t[-1], side='right') - 1, 0)
+            title += (f"\nCycle {self.metrics['cycle'][i]} | {self.metrics['blocks'][i]} blocks | "
+                      f"{self.metrics['throughput_gbps'][i]:.3f} Gbps")
+        self.title.set_text(title)
+
         # Color code the background based on FSM state
         bg_colors = ['#001122', '#112200', '#220011', '#002211', '#111100', '#220000', '#001100']
-        self.fig.patch.set_facecolor(bg_colors[current_state])
-        
+        self.fig.patch.set_facecolor(bg_colors[asic_state % len(bg_colors)])
+
         return []
-    
+
     def create_animation(self, filename='chacha20_waveform_animation.gif'):
         """Create and save the waveform animation"""
         print("Creating ChaCha20 waveform animation...")
-        
+
         anim = animation.FuncAnimation(self.fig, self.animate_waveforms,
-                                     frames=self.frame_count, 
+                                     frames=self.frame_count,
                                      interval=100, blit=False, repeat=True)
-        
+
         print(f"Saving waveform animation as {filename}...")
         anim.save(filename, writer='pillow', fps=10, dpi=120)
-        
+
         print(f"Waveform animation saved successfully!")
         return anim
 
+    def export(self, filename='chacha20_waveform_animation.gif', dpi=120, workers=None):
+        """Render the waveform animation in a process pool and encode it"""
+        print(f"Exporting ChaCha20 waveform animation to {filename}...")
+        kwargs = {'waveform': self.waveform, 'indexed': self.indexed, 'frame_count': self.frame_count,
+                  'window_cycles': self.window_cycles, 'resolution': self.resolution,
+                  'start': self.start, 'end': self.end}
+        return export_animation(WaveformAnimator, 'animate_waveforms', self.frame_count,
+                                filename, fps=10, dpi=dpi, workers=workers,
+                                animator_kwargs=kwargs)
+
 def main():
     """Generate ChaCha20 waveform animation"""
-    animator = WaveformAnimator()
-    anim = animator.create_animation('chacha20_waveform_animation.gif')
-    plt.show()
+    parser = argparse.ArgumentParser(description="Animate a ChaCha20 ASIC simulation dump")
+    parser.add_argument('waveform', nargs='?', default=str(DEFAULT_WAVEFORM),
+                        help="dump to animate (.vcd, .vcd.gz or .fst)")
+    parser.add_argument('--start', type=int, help="first time to animate (dump time units)")
+    parser.add_argument('--end', type=int, help="last time to animate (dump time units)")
+    parser.add_argument('--indexed', action='store_true',
+                        help="read only --start..--end through a checkpoint index (.vcd/.vcd.gz only)")
+    parser.add_argument('--window', type=int, default=40, help="clock cycles per frame window")
+    parser.add_argument('--frames', type=int, default=200, help="number of frames")
+    parser.add_argument('--output', default='chacha20_waveform_animation.gif', help="output file")
+    parser.add_argument('--workers', type=int, help="render processes (default: one per CPU)")
+    parser.add_argument('--no-preview', action='store_true',
+                        help="skip the live preview window (implied when no display is available)")
+    args = parser.parse_args()
+    if args.indexed and args.start is None and args.end is None:
+        parser.error("--indexed needs --start and/or --end; a whole-dump read is faster without the index")
+
+    # Decided before the first figure exists, so batch runs never touch a GUI backend
+    preview = preview_enabled(not args.no_preview)
+    animator = WaveformAnimator(args.waveform, args.indexed, args.frames, args.window,
+                                start=args.start, end=args.end)
+    animator.export(args.output, workers=args.workers)
+
+    if preview:
+        anim = animation.FuncAnimation(animator.fig, animator.animate_waveforms,
+                                       frames=animator.frame_count,
+                                       interval=100, blit=False, repeat=True)
+        plt.show()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
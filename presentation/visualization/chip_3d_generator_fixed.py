@@ -3,11 +3,36 @@ ChaCha20 ASIC 3D Visualization Generator
 Creates professional 3D chip visualizations for presentations
 """
 
+import shutil
+
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import to_rgba_array
+
+# Unit cube corners and the corner indices of each face
+UNIT_CORNERS = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                         [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]], dtype=float)
+BOX_FACES = np.array([[0, 1, 2, 3], [4, 5, 6, 7], [0, 3, 7, 4],
+                      [1, 2, 6, 5], [0, 1, 5, 4], [3, 2, 6, 7]])
+BOTTOM, TOP = 0, 1
+SIDES = [2, 3, 4, 5]
+
+# Camera angles (elev, azim, title); every view renders the same prebuilt scene
+VIEWS = {
+    'isometric': (25, 45, 'ChaCha20 ASIC - Isometric View')
+}
+
+FLOORPLAN_LABELS = {'ChaCha20 Core': 'ChaCha20\nCore', 'I/O Ctrl': 'I/O\nCtrl'}
+
+def box_faces(origins, sizes, faces=None):
+    """Quad faces of N axis-aligned boxes as an (N * faces, 4, 3) vertex array"""
+    corners = origins[:, None, :] + UNIT_CORNERS[None, :, :] * sizes[:, None, :]
+    selected = BOX_FACES if faces is None else BOX_FACES[faces]
+    return corners[:, selected].reshape(-1, 4, 3)
 
 class ChaCha20ChipVisualizer:
     def __init__(self):
@@ -24,185 +49,98 @@ class ChaCha20ChipVisualizer:
         # Chip dimensions (mm)
         self.chip_size = (10, 10, 1.5)  # Length, Width, Height
         self.die_size = (8, 8, 0.2)
+        self.pad_size = 0.3
+        self.num_pads = 8
         
-    def create_substrate(self, ax):
-        """Create the chip substrate/package"""
-        x_size, y_size, z_size = self.chip_size
-        
-        # Define substrate vertices
-        vertices = [
-            [[0, 0, 0], [x_size, 0, 0], [x_size, y_size, 0], [0, y_size, 0]],  # Bottom
-            [[0, 0, z_size], [x_size, 0, z_size], [x_size, y_size, z_size], [0, y_size, z_size]],  # Top
-            [[0, 0, 0], [0, 0, z_size], [0, y_size, z_size], [0, y_size, 0]],  # Left
-            [[x_size, 0, 0], [x_size, 0, z_size], [x_size, y_size, z_size], [x_size, y_size, 0]],  # Right
-            [[0, 0, 0], [x_size, 0, 0], [x_size, 0, z_size], [0, 0, z_size]],  # Front
-            [[0, y_size, 0], [x_size, y_size, 0], [x_size, y_size, z_size], [0, y_size, z_size]]  # Back
-        ]
+        self.build_geometry()
+        self.scene = None
         
-        for face in vertices:
-            face = Poly3DCollection([face], alpha=0.7, facecolor=self.colors['substrate'])
-            face.set_edgecolor('black')
-            ax.add_collection3d(face)
-    
-    def create_die(self, ax):
-        """Create the die/silicon layer"""
-        x_size, y_size, z_size = self.die_size
-        x_offset = (self.chip_size[0] - x_size) / 2
-        y_offset = (self.chip_size[1] - y_size) / 2
-        z_offset = self.chip_size[2]
-        
-        vertices = [
-            [[x_offset, y_offset, z_offset], 
-             [x_offset + x_size, y_offset, z_offset],
-             [x_offset + x_size, y_offset + y_size, z_offset], 
-             [x_offset, y_offset + y_size, z_offset]],  # Bottom of die
-            [[x_offset, y_offset, z_offset + z_size], 
-             [x_offset + x_size, y_offset, z_offset + z_size],
-             [x_offset + x_size, y_offset + y_size, z_offset + z_size], 
-             [x_offset, y_offset + y_size, z_offset + z_size]]  # Top of die
-        ]
-        
-        for face in vertices:
-            poly = Poly3DCollection([face], alpha=0.8, facecolor=self.colors['die'])
-            poly.set_edgecolor('navy')
-            ax.add_collection3d(poly)
-    
-    def create_functional_blocks(self, ax):
-        """Create functional blocks on the die"""
+    def build_geometry(self):
+        """Block and bond pad tables shared by the 3D scene and the floorplan"""
         x_offset = (self.chip_size[0] - self.die_size[0]) / 2
         y_offset = (self.chip_size[1] - self.die_size[1]) / 2
         z_base = self.chip_size[2] + self.die_size[2]
         
-        # ChaCha20 Core (center, largest block)
-        core_size = (4, 4, 0.1)
-        core_x = x_offset + 2
-        core_y = y_offset + 2
-        self.create_block(ax, core_x, core_y, z_base, core_size, 
-                         self.colors['core'], 'ChaCha20 Core')
-        
-        # TRNG Block (top right)
-        trng_size = (1.5, 1.5, 0.08)
-        trng_x = x_offset + 6
-        trng_y = y_offset + 6
-        self.create_block(ax, trng_x, trng_y, z_base, trng_size, 
-                         self.colors['trng'], 'TRNG')
-        
-        # I/O Controller (bottom left)
-        io_size = (1.5, 1.5, 0.08)
-        io_x = x_offset + 0.5
-        io_y = y_offset + 0.5
-        self.create_block(ax, io_x, io_y, z_base, io_size, 
-                         self.colors['io'], 'I/O Ctrl')
-        
-        # FSM Controller (top left)
-        fsm_size = (1.2, 1.2, 0.08)
-        fsm_x = x_offset + 0.5
-        fsm_y = y_offset + 6
-        self.create_block(ax, fsm_x, fsm_y, z_base, fsm_size, 
-                         self.colors['metal'], 'FSM')
-    
-    def create_block(self, ax, x, y, z, size, color, label):
-        """Create a 3D block representing a functional unit"""
-        x_size, y_size, z_size = size
-        
-        # Top face only (most visible)
-        vertices = [
-            [x, y, z],
-            [x + x_size, y, z],
-            [x + x_size, y + y_size, z],
-            [x, y + y_size, z]
-        ]
-        
-        # Side faces for depth
-        side_faces = [
-            [[x, y, z], [x + x_size, y, z], [x + x_size, y, z + z_size], [x, y, z + z_size]],
-            [[x + x_size, y, z], [x + x_size, y + y_size, z], 
-             [x + x_size, y + y_size, z + z_size], [x + x_size, y, z + z_size]],
-            [[x + x_size, y + y_size, z], [x, y + y_size, z], 
-             [x, y + y_size, z + z_size], [x + x_size, y + y_size, z + z_size]],
-            [[x, y + y_size, z], [x, y, z], [x, y, z + z_size], [x, y + y_size, z + z_size]]
+        # (label, color key, x, y, size): ChaCha20 core in the centre, TRNG top right,
+        # I/O controller bottom left, FSM controller top left
+        blocks = [
+            ('ChaCha20 Core', 'core', x_offset + 2, y_offset + 2, (4, 4, 0.1)),
+            ('TRNG', 'trng', x_offset + 6, y_offset + 6, (1.5, 1.5, 0.08)),
+            ('I/O Ctrl', 'io', x_offset + 0.5, y_offset + 0.5, (1.5, 1.5, 0.08)),
+            ('FSM', 'metal', x_offset + 0.5, y_offset + 6, (1.2, 1.2, 0.08))
         ]
-        
-        # Top face
-        poly = Poly3DCollection([vertices], alpha=0.8, facecolor=color, edgecolor='black', linewidth=0.5)
-        ax.add_collection3d(poly)
-        
-        # Side faces
-        for face in side_faces:
-            poly = Poly3DCollection([face], alpha=0.6, facecolor=color, edgecolor='black', linewidth=0.3)
-            ax.add_collection3d(poly)
-        
-        # Add label
-        center_x = x + x_size/2
-        center_y = y + y_size/2
-        center_z = z + z_size + 0.1
-        ax.text(center_x, center_y, center_z, label, fontsize=8, ha='center')
+        self.block_labels = [label for label, _, _, _, _ in blocks]
+        self.block_colors = [self.colors[key] for _, key, _, _, _ in blocks]
+        self.block_origins = np.array([[x, y, z_base] for _, _, x, y, _ in blocks])
+        self.block_sizes = np.array([size for _, _, _, _, size in blocks], dtype=float)
+        
+        # Bond pads along the top and bottom die edges, lower-left corners
+        pad_x = x_offset + 0.5 + np.arange(self.num_pads) * (self.die_size[0] - 1) / (self.num_pads - 1)
+        top_y = np.full(self.num_pads, y_offset + self.die_size[1] - 0.2)
+        bottom_y = np.full(self.num_pads, y_offset + 0.2 - self.pad_size)
+        self.pad_origins = np.column_stack([np.tile(pad_x, 2), np.concatenate([top_y, bottom_y]),
+                                            np.full(2 * self.num_pads, z_base + 0.05)])
     
-    def create_bond_pads(self, ax):
-        """Create bond pads around the die perimeter"""
+    def build_scene(self):
+        """Every face of the chip as one vertex array with per-face styles (built once)"""
+        if self.scene is not None:
+            return self.scene
+        
         x_offset = (self.chip_size[0] - self.die_size[0]) / 2
         y_offset = (self.chip_size[1] - self.die_size[1]) / 2
-        z_base = self.chip_size[2] + self.die_size[2] + 0.05
-        
-        pad_size = 0.3
-        pad_height = 0.02
-        
-        # Pads along edges
-        num_pads = 8
-        
-        # Top edge pads
-        for i in range(num_pads):
-            pad_x = x_offset + 0.5 + i * (self.die_size[0] - 1) / (num_pads - 1)
-            pad_y = y_offset + self.die_size[1] - 0.2
-            
-            pad_vertices = [
-                [pad_x, pad_y, z_base],
-                [pad_x + pad_size, pad_y, z_base],
-                [pad_x + pad_size, pad_y + pad_size, z_base],
-                [pad_x, pad_y + pad_size, z_base]
-            ]
-            
-            pad_face = Poly3DCollection([pad_vertices], alpha=0.9,
-                                      facecolor=self.colors['pads'], 
-                                      edgecolor='gold')
-            ax.add_collection3d(pad_face)
+        pad_sizes = np.tile([self.pad_size, self.pad_size, 0.0], (len(self.pad_origins), 1))
+        
+        # (faces, face colors, alpha, edge color, line width) per layer
+        layers = [
+            (box_faces(np.zeros((1, 3)), np.array([self.chip_size])),
+             [self.colors['substrate']], 0.7, 'black', 1.0),
+            (box_faces(np.array([[x_offset, y_offset, self.chip_size[2]]]), np.array([self.die_size]),
+                       [BOTTOM, TOP]),
+             [self.colors['die']], 0.8, 'navy', 1.0),
+            (box_faces(self.block_origins, self.block_sizes, SIDES),
+             np.repeat(self.block_colors, len(SIDES)), 0.6, 'black', 0.3),
+            (box_faces(self.block_origins, self.block_sizes, [TOP]),
+             self.block_colors, 0.8, 'black', 0.5),
+            (box_faces(self.pad_origins, pad_sizes, [TOP]),
+             [self.colors['pads']], 0.9, 'gold', 1.0)
+        ]
         
-        # Bottom edge pads
-        for i in range(num_pads):
-            pad_x = x_offset + 0.5 + i * (self.die_size[0] - 1) / (num_pads - 1)
-            pad_y = y_offset + 0.2 - pad_size
-            
-            pad_vertices = [
-                [pad_x, pad_y, z_base],
-                [pad_x + pad_size, pad_y, z_base],
-                [pad_x + pad_size, pad_y + pad_size, z_base],
-                [pad_x, pad_y + pad_size, z_base]
-            ]
-            
-            pad_face = Poly3DCollection([pad_vertices], alpha=0.9,
-                                      facecolor=self.colors['pads'], 
-                                      edgecolor='gold')
-            ax.add_collection3d(pad_face)
+        faces, facecolors, edgecolors, linewidths = [], [], [], []
+        for verts, colors, alpha, edge, width in layers:
+            faces.append(verts)
+            facecolors.append(np.broadcast_to(to_rgba_array(colors, alpha), (len(verts), 4)))
+            edgecolors.append(np.broadcast_to(to_rgba_array(edge), (len(verts), 4)))
+            linewidths.append(np.full(len(verts), width))
+        
+        self.scene = {
+            'verts': np.concatenate(faces),
+            'facecolors': np.concatenate(facecolors),
+            'edgecolors': np.concatenate(edgecolors),
+            'linewidths': np.concatenate(linewidths),
+            # Label anchors just above each block
+            'labels': self.block_origins + self.block_sizes * [0.5, 0.5, 1] + [0, 0, 0.1]
+        }
+        return self.scene
     
-    def generate_isometric_view(self, filename="chacha20_chip_isometric.png"):
-        """Generate isometric 3D view"""
+    def draw_scene(self, ax):
+        """Add the prebuilt scene to a 3D axes as a single depth-sorted collection"""
+        scene = self.build_scene()
+        ax.add_collection3d(Poly3DCollection(scene['verts'], facecolors=scene['facecolors'],
+                                             edgecolors=scene['edgecolors'],
+                                             linewidths=scene['linewidths']))
+        for (x, y, z), label in zip(scene['labels'], self.block_labels):
+            ax.text(x, y, z, label, fontsize=8, ha='center')
+    
+    def generate_views(self, views):
+        """Render several camera angles of one scene: views = [(filename, elev, azim, title)]"""
         fig = plt.figure(figsize=(12, 10))
         ax = fig.add_subplot(111, projection='3d')
+        self.draw_scene(ax)
         
-        # Create chip components
-        self.create_substrate(ax)
-        self.create_die(ax)
-        self.create_functional_blocks(ax)
-        self.create_bond_pads(ax)
-        
-        # Set viewing angle for isometric view
-        ax.view_init(elev=25, azim=45)
-        
-        # Set labels and title
+        # Set labels
         ax.set_xlabel('Length (mm)')
         ax.set_ylabel('Width (mm)')
         ax.set_zlabel('Height (mm)')
-        ax.set_title('ChaCha20 ASIC - Isometric View', fontsize=16, fontweight='bold')
         
         # Set axis limits
         ax.set_xlim(0, self.chip_size[0])
@@ -210,19 +148,29 @@ class ChaCha20ChipVisualizer:
         ax.set_zlim(0, self.chip_size[2] + 0.5)
         
         # Add legend
-        legend_elements = [
+        ax.legend(handles=self.legend_elements(), loc='upper left', bbox_to_anchor=(0.02, 0.98))
+        plt.tight_layout()
+        
+        # Only the camera changes between views; the geometry is not rebuilt
+        for filename, elev, azim, title in views:
+            ax.view_init(elev=elev, azim=azim)
+            ax.set_title(title, fontsize=16, fontweight='bold')
+            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            print(f"Generated: {filename}")
+        return fig
+    
+    def generate_isometric_view(self, filename="chacha20_chip_isometric.png"):
+        """Generate isometric 3D view"""
+        return self.generate_views([(filename,) + VIEWS['isometric']])
+    
+    def legend_elements(self):
+        return [
             patches.Patch(color=self.colors['core'], label='ChaCha20 Core'),
             patches.Patch(color=self.colors['trng'], label='TRNG'),
             patches.Patch(color=self.colors['io'], label='I/O Controller'),
             patches.Patch(color=self.colors['metal'], label='FSM Controller'),
             patches.Patch(color=self.colors['pads'], label='Bond Pads')
         ]
-        ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(0.02, 0.98))
-        
-        plt.tight_layout()
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        print(f"Generated: {filename}")
-        return fig
     
     def generate_top_view(self, filename="chacha20_chip_top_view.png"):
         """Generate top-down view (floorplan)"""
@@ -240,50 +188,19 @@ class ChaCha20ChipVisualizer:
                                    linewidth=2, edgecolor='navy', facecolor=self.colors['die'], alpha=0.5)
         ax.add_patch(die_rect)
         
-        # Draw functional blocks
-        # ChaCha20 Core
-        core_rect = patches.Rectangle((x_offset + 2, y_offset + 2), 4, 4,
-                                    linewidth=1, edgecolor='black', facecolor=self.colors['core'], alpha=0.8)
-        ax.add_patch(core_rect)
-        ax.text(x_offset + 4, y_offset + 4, 'ChaCha20\nCore', ha='center', va='center', fontweight='bold')
-        
-        # TRNG
-        trng_rect = patches.Rectangle((x_offset + 6, y_offset + 6), 1.5, 1.5,
-                                    linewidth=1, edgecolor='black', facecolor=self.colors['trng'], alpha=0.8)
-        ax.add_patch(trng_rect)
-        ax.text(x_offset + 6.75, y_offset + 6.75, 'TRNG', ha='center', va='center', fontweight='bold')
-        
-        # I/O Controller
-        io_rect = patches.Rectangle((x_offset + 0.5, y_offset + 0.5), 1.5, 1.5,
-                                  linewidth=1, edgecolor='black', facecolor=self.colors['io'], alpha=0.8)
-        ax.add_patch(io_rect)
-        ax.text(x_offset + 1.25, y_offset + 1.25, 'I/O\nCtrl', ha='center', va='center', fontweight='bold')
-        
-        # FSM Controller
-        fsm_rect = patches.Rectangle((x_offset + 0.5, y_offset + 6), 1.2, 1.2,
-                                   linewidth=1, edgecolor='black', facecolor=self.colors['metal'], alpha=0.8)
-        ax.add_patch(fsm_rect)
-        ax.text(x_offset + 1.1, y_offset + 6.6, 'FSM', ha='center', va='center', fontweight='bold')
+        # Functional blocks and bond pads from the shared geometry tables, one collection each
+        block_rects = [patches.Rectangle((x, y), w, h)
+                       for (x, y, _), (w, h, _) in zip(self.block_origins, self.block_sizes)]
+        ax.add_collection(PatchCollection(block_rects, facecolors=self.block_colors, alpha=0.8,
+                                          edgecolors='black', linewidths=1))
+        for (x, y, _), (w, h, _), label in zip(self.block_origins, self.block_sizes, self.block_labels):
+            ax.text(x + w/2, y + h/2, FLOORPLAN_LABELS.get(label, label), ha='center', va='center',
+                    fontweight='bold')
         
-        # Draw bond pads
-        pad_size = 0.3
-        num_pads = 8
-        
-        # Top pads
-        for i in range(num_pads):
-            pad_x = x_offset + 0.5 + i * (self.die_size[0] - 1) / (num_pads - 1)
-            pad_y = y_offset + self.die_size[1] - 0.2
-            pad_circle = patches.Circle((pad_x + pad_size/2, pad_y + pad_size/2), pad_size/2,
-                                      facecolor=self.colors['pads'], edgecolor='gold', linewidth=1)
-            ax.add_patch(pad_circle)
-        
-        # Bottom pads
-        for i in range(num_pads):
-            pad_x = x_offset + 0.5 + i * (self.die_size[0] - 1) / (num_pads - 1)
-            pad_y = y_offset + 0.2 - pad_size
-            pad_circle = patches.Circle((pad_x + pad_size/2, pad_y + pad_size/2), pad_size/2,
-                                      facecolor=self.colors['pads'], edgecolor='gold', linewidth=1)
-            ax.add_patch(pad_circle)
+        pad_centers = self.pad_origins[:, :2] + self.pad_size / 2
+        ax.add_collection(PatchCollection([patches.Circle(c, self.pad_size/2) for c in pad_centers],
+                                          facecolors=self.colors['pads'], edgecolors='gold',
+                                          linewidths=1))
         
         ax.set_xlim(0, self.chip_size[0])
         ax.set_ylim(0, self.chip_size[1])
@@ -294,14 +211,7 @@ class ChaCha20ChipVisualizer:
         ax.grid(True, alpha=0.3)
         
         # Legend
-        legend_elements = [
-            patches.Patch(color=self.colors['core'], label='ChaCha20 Core'),
-            patches.Patch(color=self.colors['trng'], label='TRNG'),
-            patches.Patch(color=self.colors['io'], label='I/O Controller'),
-            patches.Patch(color=self.colors['metal'], label='FSM Controller'),
-            patches.Patch(color=self.colors['pads'], label='Bond Pads')
-        ]
-        ax.legend(handles=legend_elements, loc='center left', bbox_to_anchor=(1, 0.5))
+        ax.legend(handles=self.legend_elements(), loc='center left', bbox_to_anchor=(1, 0.5))
         
         plt.tight_layout()
         plt.savefig(filename, dpi=300, bbox_inches='tight')
@@ -313,19 +223,19 @@ def main():
     print("=" * 45)
     
     visualizer = ChaCha20ChipVisualizer()
+    scene = visualizer.build_scene()
+    print(f"Scene: {len(scene['verts'])} faces in one collection ({len(visualizer.block_origins)} blocks, "
+          f"{len(visualizer.pad_origins)} pads)")
     
-    print("Generating 3D isometric view...")
-    visualizer.generate_isometric_view()
+    print("Generating 3D isometric view and main presentation image...")
+    # The main presentation image is the isometric view; copy it rather than render it twice
+    visualizer.generate_isometric_view("chacha20_chip_isometric.png")
+    shutil.copyfile("chacha20_chip_isometric.png", "chacha20_chip_main.png")
+    print("Generated: chacha20_chip_main.png")
     
     print("Generating top view floorplan...")
     visualizer.generate_top_view()
     
-    print("Generating additional views...")
-    
-    # Generate main hero image
-    print("Creating main presentation image...")
-    fig = visualizer.generate_isometric_view("chacha20_chip_main.png")
-    
     print("All visualizations generated successfully!")
     print("Files created:")
     print("  - chacha20_chip_isometric.png")
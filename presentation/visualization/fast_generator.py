@@ -8,6 +8,25 @@ import numpy as np
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import matplotlib.patches as patches
+from matplotlib.colors import to_rgba_array
+
+# Components on the chip top: (x, y, width, height) with label and color
+BLOCK_RECTS = np.array([[2, 2, 4, 4], [0.5, 6, 1.5, 1.5], [1, 0.5, 6, 1]])
+BLOCK_LABELS = ['ChaCha20\nCore', 'TRNG', 'I/O Controller']
+BLOCK_COLORS = ['red', 'orange', 'green']
+
+# Bond pad centres: bottom, right, top and left edges
+PAD_CENTERS = np.array([(1, 0.2), (3, 0.2), (5, 0.2), (7, 0.2),
+                        (7.8, 2), (7.8, 4), (7.8, 6),
+                        (6, 7.8), (4, 7.8), (2, 7.8),
+                        (0.2, 6), (0.2, 4), (0.2, 2)])
+PAD_SIZE = 0.4
+
+def rect_faces(origins, sizes, z):
+    """Horizontal quads at height z from (N, 2) corners and sizes, as an (N, 4, 3) array"""
+    corners = np.array([[0, 0], [1, 0], [1, 1], [0, 1]])
+    xy = origins[:, None, :] + corners[None, :, :] * sizes[:, None, :]
+    return np.concatenate([xy, np.full(xy.shape[:2] + (1,), z)], axis=2)
 
 def create_simple_chip():
     """Create a simple, fast 3D chip visualization"""
@@ -28,36 +47,15 @@ def create_simple_chip():
     for i in range(4):
         ax.plot([x[i], x[i]], [y[i], y[i]], [0, 1], 'k-', linewidth=1)
     
-    # Add colored blocks for components
-    # ChaCha20 Core (red)
-    core_verts = [[2, 2, 1], [6, 2, 1], [6, 6, 1], [2, 6, 1]]
-    core_face = Poly3DCollection([core_verts], alpha=0.7, facecolor='red', edgecolor='black')
-    ax.add_collection3d(core_face)
-    ax.text(4, 4, 1.2, 'ChaCha20\nCore', ha='center', va='center', fontweight='bold')
-    
-    # TRNG (orange)
-    trng_verts = [[0.5, 6, 1], [2, 6, 1], [2, 7.5, 1], [0.5, 7.5, 1]]
-    trng_face = Poly3DCollection([trng_verts], alpha=0.7, facecolor='orange', edgecolor='black')
-    ax.add_collection3d(trng_face)
-    ax.text(1.25, 6.75, 1.2, 'TRNG', ha='center', va='center', fontweight='bold')
-    
-    # I/O (green)
-    io_verts = [[1, 0.5, 1], [7, 0.5, 1], [7, 1.5, 1], [1, 1.5, 1]]
-    io_face = Poly3DCollection([io_verts], alpha=0.7, facecolor='green', edgecolor='black')
-    ax.add_collection3d(io_face)
-    ax.text(4, 1, 1.2, 'I/O Controller', ha='center', va='center', fontweight='bold')
-    
-    # Bond pads (gold)
-    pad_positions = [(1, 0.2), (3, 0.2), (5, 0.2), (7, 0.2),  # bottom
-                     (7.8, 2), (7.8, 4), (7.8, 6),              # right
-                     (6, 7.8), (4, 7.8), (2, 7.8),              # top
-                     (0.2, 6), (0.2, 4), (0.2, 2)]              # left
-    
-    for px, py in pad_positions:
-        pad_verts = [[px-0.2, py-0.2, 1], [px+0.2, py-0.2, 1], 
-                     [px+0.2, py+0.2, 1], [px-0.2, py+0.2, 1]]
-        pad_face = Poly3DCollection([pad_verts], alpha=0.9, facecolor='gold', edgecolor='black')
-        ax.add_collection3d(pad_face)
+    # Component tops and bond pads as one vertex array, drawn by a single collection
+    verts = np.concatenate([rect_faces(BLOCK_RECTS[:, :2], BLOCK_RECTS[:, 2:], 1),
+                            rect_faces(PAD_CENTERS - PAD_SIZE/2, np.full_like(PAD_CENTERS, PAD_SIZE), 1)])
+    facecolors = to_rgba_array(BLOCK_COLORS + ['gold'] * len(PAD_CENTERS))
+    facecolors[:, 3] = [0.7] * len(BLOCK_COLORS) + [0.9] * len(PAD_CENTERS)
+    ax.add_collection3d(Poly3DCollection(verts, facecolors=facecolors, edgecolor='black'))
+    
+    for (x, y, w, h), label in zip(BLOCK_RECTS, BLOCK_LABELS):
+        ax.text(x + w/2, y + h/2, 1.2, label, ha='center', va='center', fontweight='bold')
     
     # Set view and labels
     ax.set_xlim(0, 8)
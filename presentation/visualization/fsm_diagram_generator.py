@@ -3,13 +3,45 @@ ChaCha20 ASIC FSM State Diagram Generator
 Creates detailed finite state machine diagrams showing all states and transitions
 """
 
+import argparse
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Circle
+from matplotlib.patches import FancyBboxPatch, ConnectionPatch
 import numpy as np
 
+from rtl_fsm import ASIC_TOP_RTL, CORE_RTL, draw_fsm, extract_fsm, layout_fsm, loop_bound, transition_counts
+
+# ChaCha20 core instance inside the top-level testbench dumps
+CORE_SIGNAL = 'chacha_unit.fsm_state'
+
+# Drawing role per RTL state name; states the RTL adds later fall back to 'idle'
+STATE_ROLES = {
+    'IDLE': 'idle', 'ACQUIRE': 'acquire', 'STREAM_KEY_OUT': 'output', 'STREAM_NONCE_OUT': 'output',
+    'LOAD_IN': 'process', 'CORE': 'process', 'CORE_WAIT': 'wait', 'OUTPUT': 'output',
+    'COMPLETE': 'complete', 'INIT': 'acquire', 'ROUND': 'process'
+}
+
+STATE_NOTES = {
+    'IDLE': "System reset\nWaiting for start",
+    'ACQUIRE': "Acquiring key\nand nonce",
+    'STREAM_KEY_OUT': "Echo key\nchunks out",
+    'STREAM_NONCE_OUT': "Echo nonce\nchunks out",
+    'LOAD_IN': "Loading input\ndata stream",
+    'CORE': "Starting\nChaCha20 core",
+    'CORE_WAIT': "Waiting for\ncore completion",
+    'OUTPUT': "Streaming\noutput data",
+    'COMPLETE': "Operation\ncomplete",
+    'INIT': "Initialize state\nmatrix setup",
+    'ROUND': "Execute 20 rounds\nof quarter rounds"
+}
+
 class ChaCha20FSMDiagram:
-    def __init__(self):
+    def __init__(self, top_rtl=ASIC_TOP_RTL, core_rtl=CORE_RTL, waveform=None):
+        self.top_rtl = top_rtl
+        self.core_rtl = core_rtl
+        self.waveform = waveform
         self.colors = {
             'idle': '#95A5A6',
             'acquire': '#3498DB',
@@ -90,65 +122,57 @@ class ChaCha20FSMDiagram:
                        fontsize=8, bbox=dict(boxstyle="round,pad=0.2", 
                        facecolor='white', alpha=0.8))
     
+    def state_colors(self, fsm):
+        """Color each extracted state by its role"""
+        return {name: self.colors[STATE_ROLES.get(name, 'idle')] for name in fsm.states}
+    
+    def observed_counts(self, fsm, signal=None):
+        """Transition counts from the waveform, or None when there is none or it does not match"""
+        if self.waveform is None:
+            return None, None
+        try:
+            return transition_counts(fsm, self.waveform, signal)
+        except (KeyError, ValueError) as e:
+            print(f"  No transition counts for {fsm.module}.{fsm.register}: {e}")
+            return None, None
+    
+    def draw_state_notes(self, ax, fsm, centers, offset, fontsize=8):
+        for name, (x, y) in centers.items():
+            if name in STATE_NOTES:
+                ax.text(x, y - offset, STATE_NOTES[name], ha='center', va='center',
+                       fontsize=fontsize, style='italic', color=self.colors['text'])
+    
     def generate_main_fsm_diagram(self, filename="chacha20_main_fsm.png"):
         """Generate the main ASIC controller FSM diagram"""
-        fig, ax = plt.subplots(figsize=(14, 10))
-        
-        # Main FSM States (based on trueAsicTop.v)
-        states = [
-            (3, 8, "IDLE\n000", self.colors['idle'], "System reset\nWaiting for start"),
-            (7, 8, "ACQUIRE\n001", self.colors['acquire'], "Acquiring key,\nnonce, counter"),
-            (11, 8, "LOAD_IN\n010", self.colors['process'], "Loading input\ndata stream"),
-            (7, 5, "CORE\n011", self.colors['process'], "Starting\nChaCha20 core"),
-            (11, 5, "CORE_WAIT\n100", self.colors['wait'], "Waiting for\ncore completion"),
-            (7, 2, "OUTPUT\n101", self.colors['output'], "Streaming\noutput data"),
-            (3, 2, "COMPLETE\n110", self.colors['complete'], "Operation\ncomplete")
-        ]
-        
-        # Draw main states
-        for x, y, label, color, desc in states:
-            self.create_state_box(ax, x, y, 2.5, 1.5, label, color)
-            # Add description below
-            ax.text(x, y - 1.2, desc, ha='center', va='center', 
-                   fontsize=8, style='italic', color=self.colors['text'])
-        
-        # State transitions
-        transitions = [
-            ((3, 8), (7, 8), "start"),
-            ((7, 8), (11, 8), "key/nonce/counter\nacquired"),
-            ((11, 8), (7, 5), "input data\nloaded"),
-            ((7, 5), (11, 5), "core_start"),
-            ((11, 5), (7, 2), "core_done"),
-            ((7, 2), (3, 2), "output\ncomplete"),
-            ((3, 2), (3, 8), "reset/restart", True, -1.5)
-        ]
-        
-        for i, transition in enumerate(transitions):
-            if len(transition) == 5:  # curved arrow
-                start, end, text, curved, offset = transition
-                self.create_arrow(ax, start, end, text, curved, offset)
-            else:
-                start, end, text = transition
-                self.create_arrow(ax, start, end, text)
-        
-        # Add ACQUIRE sub-states
-        sub_states = [
-            (5.5, 6.5, "KEY\n00", self.colors['sub_state']),
-            (7, 6.5, "NONCE\n01", self.colors['sub_state']),
-            (8.5, 6.5, "COUNTER\n10", self.colors['sub_state'])
-        ]
-        
-        for x, y, label, color in sub_states:
-            self.create_sub_state_box(ax, x, y, 1.2, 0.8, label, color)
-        
-        # Sub-state transitions
-        self.create_arrow(ax, (5.5, 6.5), (7, 6.5), "")
-        self.create_arrow(ax, (7, 6.5), (8.5, 6.5), "")
-        
-        # Add title and labels
-        ax.set_xlim(0, 14)
-        ax.set_ylim(0, 10)
-        ax.set_title('ChaCha20 ASIC Main Controller FSM\nState Transitions and Sub-states', 
+        fsm = extract_fsm(self.top_rtl)
+        acquire = extract_fsm(self.top_rtl, 'acquire_sub_state')
+        counts, unexpected = self.observed_counts(fsm)
+        
+        _, n_columns, n_rows = layout_fsm(fsm)
+        width = 2.8 * n_columns
+        fig, ax = plt.subplots(figsize=(max(width, 14), 10))
+        
+        centers = draw_fsm(ax, fsm, (0, 2.5, width, 2.5 + 2.6 * n_rows), self.state_colors(fsm),
+                           counts, unexpected, box_size=(2.1, 1.0), fontsize=10,
+                           arrow_color=self.colors['arrow'])
+        self.draw_state_notes(ax, fsm, centers, 0.9)
+        
+        # ACQUIRE sub-states, laid out in their own band underneath
+        if acquire.states:
+            _, sub_columns, _ = layout_fsm(acquire)
+            x0 = centers['ACQUIRE'][0] - 1.5 * sub_columns / 2 if 'ACQUIRE' in centers else 0
+            draw_fsm(ax, acquire, (x0, 0.3, x0 + 1.5 * sub_columns, 1.5),
+                     {name: self.colors['sub_state'] for name in acquire.states},
+                     box_size=(1.2, 0.8), fontsize=8, arrow_color=self.colors['arrow'])
+            ax.text(x0 + 1.5 * sub_columns / 2, 1.9, "ACQUIRE sub-states", ha='center',
+                   va='center', fontsize=9, style='italic', color=self.colors['text'])
+        
+        ax.set_xlim(0, max(width, 14))
+        ax.set_ylim(0, 4 + 2.6 * n_rows)
+        source = f"{Path(self.top_rtl).name}, {len(fsm.states)} states"
+        if counts is not None:
+            source += f", transition counts from {Path(self.waveform).name}"
+        ax.set_title(f'ChaCha20 ASIC Main Controller FSM\nState Transitions and Sub-states ({source})', 
                     fontsize=16, fontweight='bold', pad=20)
         
         # Add legend
@@ -177,53 +201,30 @@ class ChaCha20FSMDiagram:
     
     def generate_chacha_core_fsm(self, filename="chacha20_core_fsm.png"):
         """Generate the ChaCha20 core FSM diagram"""
-        fig, ax = plt.subplots(figsize=(12, 8))
-        
-        # ChaCha20 Core FSM States (based on chacha20_core.v)
-        states = [
-            (2, 6, "IDLE\n000", self.colors['idle'], "Waiting for\nstart signal"),
-            (6, 6, "INIT\n001", self.colors['acquire'], "Initialize state\nmatrix setup"),
-            (10, 6, "ROUND\n010", self.colors['process'], "Execute 20 rounds\nof quarter rounds"),
-            (10, 3, "OUTPUT\n011", self.colors['output'], "Generate final\nkeystream output"),
-            (6, 3, "COMPLETE\n100", self.colors['complete'], "Signal done\nto controller")
-        ]
-        
-        # Draw states
-        for x, y, label, color, desc in states:
-            self.create_state_box(ax, x, y, 2.2, 1.2, label, color)
-            ax.text(x, y - 1.0, desc, ha='center', va='center', 
-                   fontsize=8, style='italic', color=self.colors['text'])
-        
-        # Transitions
-        transitions = [
-            ((2, 6), (6, 6), "start"),
-            ((6, 6), (10, 6), "matrix ready"),
-            ((10, 6), (10, 3), "20 rounds\ncomplete"),
-            ((10, 3), (6, 3), "keystream\nready"),
-            ((6, 3), (2, 6), "next block", True, -1.0)
-        ]
-        
-        for transition in transitions:
-            if len(transition) == 5:  # curved arrow
-                start, end, text, curved, offset = transition
-                self.create_arrow(ax, start, end, text, curved, offset)
-            else:
-                start, end, text = transition
-                self.create_arrow(ax, start, end, text)
-        
-        # Add round counter detail
-        ax.text(10, 4.5, "Round Counter:\n0 → 20\n(QR operations)", 
-               ha='center', va='center', fontsize=9, 
-               bbox=dict(boxstyle="round,pad=0.3", facecolor='lightblue', alpha=0.7))
-        
-        # Self-loop for ROUND state
-        circle_center = (11.5, 6)
-        circle = Circle(circle_center, 0.3, fill=False, edgecolor=self.colors['arrow'], linewidth=2)
-        ax.add_patch(circle)
-        self.create_arrow(ax, (10.8, 6.3), (11.2, 6.3), "round < 20")
-        
-        ax.set_xlim(0, 13)
-        ax.set_ylim(1, 8)
+        fsm = extract_fsm(self.core_rtl)
+        counts, unexpected = self.observed_counts(fsm, CORE_SIGNAL)
+        
+        _, n_columns, n_rows = layout_fsm(fsm)
+        width = 2.6 * n_columns
+        fig, ax = plt.subplots(figsize=(max(width, 12), 8))
+        
+        centers = draw_fsm(ax, fsm, (0, 2, width, 2 + 2.5 * n_rows), self.state_colors(fsm),
+                           counts, unexpected, box_size=(2.0, 1.0), fontsize=10,
+                           arrow_color=self.colors['arrow'])
+        self.draw_state_notes(ax, fsm, centers, 1.0)
+        
+        # ROUND stays in its state while its loop condition holds (a hold, not a transition);
+        # each ROUND cycle is one double round
+        bound = loop_bound(self.core_rtl, 'ROUND')
+        if 'ROUND' in centers and bound:
+            x, y = centers['ROUND']
+            counter, count = bound
+            ax.text(x, y - 2.0, f"{counter}:\n0 → {count - 1}\n({count} double rounds)", 
+                   ha='center', va='center', fontsize=9, 
+                   bbox=dict(boxstyle="round,pad=0.3", facecolor='lightblue', alpha=0.7))
+        
+        ax.set_xlim(0, max(width, 12))
+        ax.set_ylim(-0.5, 4 + 2.5 * n_rows)
         ax.set_title('ChaCha20 Core FSM\nEncryption Engine State Machine', 
                     fontsize=16, fontweight='bold', pad=20)
         
@@ -242,73 +243,29 @@ class ChaCha20FSMDiagram:
         """Generate a comprehensive diagram showing all FSMs together"""
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
         
-        # Top: Main Controller FSM
-        ax1.set_title('ASIC Top-Level Controller FSM', fontsize=14, fontweight='bold', pad=10)
-        
-        # Main states (simplified for space)
-        main_states = [
-            (2, 2, "IDLE", self.colors['idle']),
-            (4, 2, "ACQUIRE", self.colors['acquire']),
-            (6, 2, "LOAD_IN", self.colors['process']),
-            (8, 2, "CORE", self.colors['process']),
-            (10, 2, "CORE_WAIT", self.colors['wait']),
-            (12, 2, "OUTPUT", self.colors['output']),
-            (14, 2, "COMPLETE", self.colors['complete'])
-        ]
-        
-        for x, y, label, color in main_states:
-            self.create_state_box(ax1, x, y, 1.5, 0.8, label, color)
-        
-        # Main transitions
-        for i in range(len(main_states) - 1):
-            start = (main_states[i][0], main_states[i][1])
-            end = (main_states[i+1][0], main_states[i+1][1])
-            self.create_arrow(ax1, start, end)
-        
-        # Return arrow
-        self.create_arrow(ax1, (14, 2), (2, 2), "restart", True, -0.8)
-        
-        # ACQUIRE sub-states
-        ax1.text(4, 0.5, "Sub-states: KEY → NONCE → COUNTER", 
-                ha='center', va='center', fontsize=9, style='italic')
-        
-        # Bottom: ChaCha20 Core FSM
-        ax2.set_title('ChaCha20 Core FSM', fontsize=14, fontweight='bold', pad=10)
-        
-        core_states = [
-            (3, 2, "IDLE", self.colors['idle']),
-            (6, 2, "INIT", self.colors['acquire']),
-            (9, 2, "ROUND", self.colors['process']),
-            (12, 2, "OUTPUT", self.colors['output']),
-            (15, 2, "COMPLETE", self.colors['complete'])
-        ]
-        
-        for x, y, label, color in core_states:
-            self.create_state_box(ax2, x, y, 1.5, 0.8, label, color)
-        
-        # Core transitions
-        for i in range(len(core_states) - 1):
-            start = (core_states[i][0], core_states[i][1])
-            end = (core_states[i+1][0], core_states[i+1][1])
-            self.create_arrow(ax2, start, end)
-        
-        # Round loop
-        circle = Circle((9, 3.2), 0.3, fill=False, edgecolor=self.colors['arrow'], linewidth=2)
-        ax2.add_patch(circle)
-        ax2.text(9, 3.8, "20 rounds", ha='center', va='center', fontsize=8)
-        
-        # Return arrow
-        self.create_arrow(ax2, (15, 2), (3, 2), "next block", True, -0.8)
-        
-        # Set limits and clean up
-        for ax in [ax1, ax2]:
+        main_fsm = extract_fsm(self.top_rtl)
+        core_fsm = extract_fsm(self.core_rtl)
+        acquire = extract_fsm(self.top_rtl, 'acquire_sub_state')
+        
+        for ax, fsm, title, signal in [(ax1, main_fsm, 'ASIC Top-Level Controller FSM', None),
+                                       (ax2, core_fsm, 'ChaCha20 Core FSM', CORE_SIGNAL)]:
+            ax.set_title(title, fontsize=14, fontweight='bold', pad=10)
+            counts, unexpected = self.observed_counts(fsm, signal)
+            _, _, n_rows = layout_fsm(fsm)
+            draw_fsm(ax, fsm, (0, 0.8, 16, 0.8 + 1.3 * n_rows), self.state_colors(fsm),
+                     counts, unexpected, box_size=(1.5, 0.8), fontsize=8,
+                     arrow_color=self.colors['arrow'])
             ax.set_xlim(0, 16)
-            ax.set_ylim(0, 4)
+            ax.set_ylim(0, 1.8 + 1.3 * n_rows)
             ax.set_xticks([])
             ax.set_yticks([])
             for spine in ax.spines.values():
                 spine.set_visible(False)
         
+        # ACQUIRE sub-states
+        ax1.text(8, 0.3, "ACQUIRE sub-states: " + " → ".join(acquire.states), 
+                ha='center', va='center', fontsize=9, style='italic')
+        
         # Overall title
         fig.suptitle('ChaCha20 ASIC Complete FSM Architecture\nHierarchical State Machine Design', 
                     fontsize=18, fontweight='bold')
@@ -319,10 +276,14 @@ class ChaCha20FSMDiagram:
         return fig
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate the FSM diagrams from the RTL")
+    parser.add_argument('--vcd', help="annotate transitions with counts observed in this waveform")
+    args = parser.parse_args()
+    
     print("ChaCha20 ASIC FSM State Diagram Generator")
     print("=" * 45)
     
-    fsm_gen = ChaCha20FSMDiagram()
+    fsm_gen = ChaCha20FSMDiagram(waveform=args.vcd)
     
     print("Generating main controller FSM diagram...")
     fsm_gen.generate_main_fsm_diagram()
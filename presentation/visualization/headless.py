@@ -0,0 +1,36 @@
+"""
+Headless Rendering Support
+Pins a non-interactive matplotlib backend for batch renders and only opens preview windows when a display exists
+"""
+
+import os
+import sys
+
+BATCH_BACKEND = 'Agg'
+
+
+def display_available():
+    """True when a GUI window could be opened (CHACHA20_HEADLESS=1 forces False)"""
+    if os.environ.get('CHACHA20_HEADLESS', '') not in ('', '0'):
+        return False
+    if sys.platform.startswith('linux'):
+        return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    return True
+
+
+def pin_batch_backend():
+    """Force the non-interactive backend for this process and any workers it starts
+
+    Safe to call after pyplot has been imported as long as no figure is open yet.
+    """
+    os.environ['MPLBACKEND'] = BATCH_BACKEND
+    import matplotlib
+    matplotlib.use(BATCH_BACKEND, force=True)
+
+
+def preview_enabled(requested=True):
+    """Whether to open a live preview; pins the batch backend when not"""
+    if requested and display_available():
+        return True
+    pin_batch_backend()
+    return False
@@ -0,0 +1,231 @@
+"""
+Incremental Presentation Image Build
+Regenerates only the images whose generator script, parameters or input data changed
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+VIS_DIR = Path(__file__).resolve().parent
+PRESENTATION_DIR = VIS_DIR.parent
+REPO_ROOT = PRESENTATION_DIR.parent
+IMAGES_DIR = PRESENTATION_DIR / "images"
+MANIFEST_NAME = ".build_manifest.json"
+# Local modules outside this directory, relative to it
+TB_CHECKING = '../../main/tb/python checking'
+# rtl_fsm reads waveforms through the testbench's VCD reader for transition counts
+RTL_FSM_DEPS = ['rtl_fsm.py', f'{TB_CHECKING}/vcd_reader.py']
+LIVE_METRICS_DEPS = [f'{TB_CHECKING}/{name}.py' for name in ('live_metrics', 'transactions', 'vcd_index', 'vcd_reader')]
+SIMULATION_WAVEFORM = 'presentation/verification/simulation_results/integration/tb_asic_top_full_cycle.vcd'
+
+# Build graph: target -> generator script (+ local modules it imports, transitively), command
+# line parameters, input data files (relative to the repo root) and the images it writes.
+# 'renders' maps each output to the generator class and method batch_render calls in-process;
+# 'animation' names the animator class of a GIF target, which is only built on request.
+TARGETS = {
+    'block_diagrams': {
+        'script': 'block_diagram_generator_fixed.py',
+        'deps': [],
+        'args': [],
+        'inputs': [],
+        'outputs': ['chacha20_block_diagram.png', 'chacha20_dataflow.png'],
+        'renders': ('ChaCha20BlockDiagram', {'chacha20_block_diagram.png': 'generate_architecture_diagram',
+                                             'chacha20_dataflow.png': 'generate_dataflow_diagram'})
+    },
+    'chip_3d': {
+        'script': 'chip_3d_generator_fixed.py',
+        'deps': [],
+        'args': [],
+        'inputs': [],
+        'outputs': ['chacha20_chip_isometric.png', 'chacha20_chip_top_view.png',
+                    'chacha20_chip_main.png'],
+        'renders': ('ChaCha20ChipVisualizer', {'chacha20_chip_isometric.png': 'generate_isometric_view',
+                                               'chacha20_chip_top_view.png': 'generate_top_view'})
+    },
+    'fast': {
+        'script': 'fast_generator.py',
+        'deps': [],
+        'args': [],
+        'inputs': [],
+        'outputs': ['chacha20_chip_fast.png', 'chacha20_block_diagram_fast.png']
+    },
+    'fsm': {
+        'script': 'fsm_diagram_generator.py',
+        'deps': RTL_FSM_DEPS,
+        'args': [],
+        'inputs': ['main/rtl/asic_top.v', 'main/rtl/chacha20_core.v'],
+        'outputs': ['chacha20_main_fsm.png', 'chacha20_core_fsm.png', 'chacha20_complete_fsm.png'],
+        'renders': ('ChaCha20FSMDiagram', {'chacha20_main_fsm.png': 'generate_main_fsm_diagram',
+                                           'chacha20_core_fsm.png': 'generate_chacha_core_fsm',
+                                           'chacha20_complete_fsm.png': 'generate_combined_fsm_diagram'})
+    },
+    'nested_fsm': {
+        'script': 'nested_fsm_generator.py',
+        'deps': RTL_FSM_DEPS,
+        'args': [],
+        'inputs': ['main/rtl/asic_top.v', 'main/rtl/chacha20_core.v'],
+        'outputs': ['chacha20_nested_fsm.png', 'chacha20_detailed_nested.png'],
+        'renders': ('NestedFSMDiagram', {'chacha20_nested_fsm.png': 'generate_nested_fsm_diagram',
+                                         'chacha20_detailed_nested.png': 'generate_detailed_nested_view'})
+    },
+    'performance': {
+        'script': 'performance_dashboard.py',
+        'deps': ['headless.py'] + LIVE_METRICS_DEPS,
+        'args': ['--no-preview'],
+        'inputs': [SIMULATION_WAVEFORM, 'main/rtl/config.json'],
+        'outputs': ['chacha20_performance_dashboard.png'],
+        'renders': ('PerformanceDashboard', {'chacha20_performance_dashboard.png': 'generate_snapshot'})
+    },
+    'asic_animation': {
+        'script': 'chacha20_animation_generator.py',
+        'deps': ['headless.py', 'parallel_export.py'] + RTL_FSM_DEPS + LIVE_METRICS_DEPS,
+        'args': ['--no-preview'],
+        'inputs': [SIMULATION_WAVEFORM, 'main/rtl/asic_top.v', 'main/rtl/config.json'],
+        'outputs': ['chacha20_asic_animation.gif'],
+        'animation': 'ChaCha20Animator'
+    },
+    'waveform_animation': {
+        'script': 'chacha20_waveform_animator.py',
+        'deps': ['headless.py', 'parallel_export.py'] + RTL_FSM_DEPS + LIVE_METRICS_DEPS,
+        'args': ['--no-preview'],
+        'inputs': [SIMULATION_WAVEFORM, 'main/rtl/asic_top.v', 'main/rtl/chacha20_core.v',
+                   'presentation/source_code/rtl/asic_top.v', 'main/rtl/config.json'],
+        'outputs': ['chacha20_waveform_animation.gif'],
+        'animation': 'WaveformAnimator'
+    }
+}
+
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def combined_hash(paths):
+    """One digest over several files (names included, so renames count)"""
+    sha = hashlib.sha256()
+    for path in paths:
+        sha.update(str(path).encode())
+        sha.update(file_hash(path).encode() if Path(path).exists() else b'missing')
+    return sha.hexdigest()
+
+
+def target_key(spec):
+    """Everything an image depends on; any change makes the target stale"""
+    return {
+        'script_hash': combined_hash([VIS_DIR / name for name in [spec['script']] + spec['deps']]),
+        'params': spec['args'],
+        'input_hash': combined_hash([REPO_ROOT / name for name in spec['inputs']])
+    }
+
+
+class ImageBuild:
+    """Build graph over TARGETS with a manifest stored next to the images"""
+
+    def __init__(self, images_dir=IMAGES_DIR, targets=TARGETS, animations=False):
+        self.images_dir = Path(images_dir)
+        self.targets = {name: spec for name, spec in targets.items() if animations or 'animation' not in spec}
+        self.manifest_path = self.images_dir / MANIFEST_NAME
+        self.manifest = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+
+    def stale_targets(self, force=False):
+        """Targets with a missing output or a changed script, parameter or input"""
+        stale = {}
+        for name, spec in self.targets.items():
+            key = target_key(spec)
+            if force or any(self.manifest.get(out) != dict(key, target=name) or
+                            not (self.images_dir / out).exists() for out in spec['outputs']):
+                stale[name] = key
+        return stale
+
+    def run_target(self, name):
+        """Run one generator in a scratch directory and move its declared outputs"""
+        spec = self.targets[name]
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix=f'img_{name}_') as work:
+            env = dict(os.environ, MPLBACKEND='Agg')
+            result = subprocess.run([sys.executable, str(VIS_DIR / spec['script'])] + spec['args'],
+                                    cwd=work, env=env, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip()
+                                   else f"exit code {result.returncode}")
+            missing = [out for out in spec['outputs'] if not (Path(work) / out).exists()]
+            if missing:
+                raise RuntimeError(f"did not write {', '.join(missing)}")
+            for out in spec['outputs']:
+                shutil.move(str(Path(work) / out), str(self.images_dir / out))
+        return time.perf_counter() - started
+
+    def build(self, force=False, workers=None):
+        """Regenerate stale targets concurrently; returns {target: seconds or error}"""
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        stale = self.stale_targets(force)
+        print(f"🧱 {len(self.targets)} image targets: {len(self.targets) - len(stale)} up to date, "
+              f"{len(stale)} to rebuild")
+
+        results = {}
+        if stale:
+            # Generators are independent subprocesses, so threads are enough to overlap them
+            with ThreadPoolExecutor(max_workers=workers or len(stale)) as pool:
+                futures = {pool.submit(self.run_target, name): name for name in stale}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        results[name] = e
+                        print(f"  ❌ {name}: {e}")
+                        continue
+                    for out in self.targets[name]['outputs']:
+                        self.manifest[out] = dict(stale[name], target=name)
+                    print(f"  ✅ {name} ({results[name]:.1f}s): {', '.join(self.targets[name]['outputs'])}")
+
+            with open(self.manifest_path, 'w') as f:
+                json.dump(self.manifest, f, indent=1, sort_keys=True)
+        return results
+
+
+def build_images(force=False, workers=None, images_dir=IMAGES_DIR, animations=False):
+    """Bring presentation/images up to date; True when every stale target rebuilt"""
+    results = ImageBuild(images_dir, animations=animations).build(force, workers)
+    return not any(isinstance(r, Exception) for r in results.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate stale presentation images")
+    parser.add_argument('--force', action='store_true', help="rebuild every target")
+    parser.add_argument('--workers', type=int, help="concurrent generators (default: one per stale target)")
+    parser.add_argument('--animations', action='store_true', help="also rebuild the GIF animations")
+    parser.add_argument('--list', action='store_true', help="only show which targets are stale")
+    args = parser.parse_args()
+
+    print("🖼️  ChaCha20 Presentation Image Build")
+    print("=" * 40)
+
+    if args.list:
+        build = ImageBuild(animations=args.animations)
+        stale = build.stale_targets(args.force)
+        for name, spec in build.targets.items():
+            status = "stale" if name in stale else "up to date"
+            print(f"  {name:<20} {status:<11} {', '.join(spec['outputs'])}")
+        return 0
+    return 0 if build_images(args.force, args.workers, animations=args.animations) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
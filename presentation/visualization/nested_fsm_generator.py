@@ -7,9 +7,21 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, ConnectionPatch, Rectangle
 import numpy as np
+from pathlib import Path
+
+from rtl_fsm import ASIC_TOP_RTL, CORE_RTL, arm_condition, draw_fsm, extract_fsm, layout_fsm, loop_bound
+
+# Main controller color per RTL state name (key into the 'main_*' colors)
+MAIN_ROLES = {
+    'IDLE': 'idle', 'ACQUIRE': 'acquire', 'STREAM_KEY_OUT': 'output', 'STREAM_NONCE_OUT': 'output',
+    'LOAD_IN': 'process', 'CORE': 'process', 'CORE_WAIT': 'wait', 'OUTPUT': 'output',
+    'COMPLETE': 'complete'
+}
 
 class NestedFSMDiagram:
-    def __init__(self):
+    def __init__(self, top_rtl=ASIC_TOP_RTL, core_rtl=CORE_RTL):
+        self.top_rtl = top_rtl
+        self.core_rtl = core_rtl
         self.colors = {
             'main_idle': '#95A5A6',
             'main_acquire': '#3498DB',
@@ -95,130 +107,52 @@ class NestedFSMDiagram:
                        fontsize=7, bbox=dict(boxstyle="round,pad=0.15", 
                        facecolor='white', alpha=0.9))
     
+    def main_colors(self, fsm):
+        return {name: self.colors['main_' + MAIN_ROLES.get(name, 'idle')] for name in fsm.states}
+    
+    def core_colors(self, fsm):
+        return {name: self.colors.get('core_' + name.lower(), self.colors['core_idle']) for name in fsm.states}
+    
     def generate_nested_fsm_diagram(self, filename="chacha20_nested_fsm.png"):
         """Generate the complete nested FSM diagram"""
         fig, ax = plt.subplots(figsize=(18, 12))
         
-        # Main Controller States (outer level)
-        main_states = [
-            (3, 9, "IDLE\n000", self.colors['main_idle'], "System Reset\nWaiting for start"),
-            (7, 9, "ACQUIRE\n001", self.colors['main_acquire'], "Key/Nonce/Counter\nAcquisition"),
-            (11, 9, "LOAD_IN\n010", self.colors['main_process'], "Input Data\nStreaming"),
-            (15, 9, "CORE_WAIT\n100", self.colors['main_wait'], "Monitoring Core\nExecution")
-        ]
+        main_fsm = extract_fsm(self.top_rtl)
+        core_fsm = extract_fsm(self.core_rtl)
         
-        # Draw main states (top level)
-        for x, y, label, color, desc in main_states:
-            self.create_state_box(ax, x, y, 2.5, 1.2, label, color)
-            ax.text(x, y - 1.0, desc, ha='center', va='center', 
-                   fontsize=8, style='italic', color=self.colors['text'])
-        
-        # Main transitions (top level)
-        main_transitions = [
-            ((3, 9), (7, 9), "start"),
-            ((7, 9), (11, 9), "acquired"),
-            ((11, 9), (15, 9), "loaded")
-        ]
-        
-        for start, end, text in main_transitions:
-            self.create_arrow(ax, start, end, text)
-        
-        # ACQUIRE sub-states
-        acquire_substates = [
-            (5.5, 7.2, "KEY", self.colors['main_acquire']),
-            (7, 7.2, "NONCE", self.colors['main_acquire']),
-            (8.5, 7.2, "COUNTER", self.colors['main_acquire'])
-        ]
-        
-        for x, y, label, color in acquire_substates:
-            self.create_state_box(ax, x, y, 1.0, 0.6, label, color, fontsize=8)
-        
-        # Sub-state arrows
-        self.create_arrow(ax, (5.5, 7.2), (7, 7.2), "")
-        self.create_arrow(ax, (7, 7.2), (8.5, 7.2), "")
+        # Main controller states (outer level), laid out from asic_top.v
+        _, _, main_rows = layout_fsm(main_fsm)
+        main_centers = draw_fsm(ax, main_fsm, (0.5, 7.2, 17.5, 7.2 + 1.3 * main_rows),
+                                self.main_colors(main_fsm), box_size=(1.6, 0.9), fontsize=8,
+                                arrow_color=self.colors['arrow'])
         
         # ============ NESTED CHACHA20 CORE FSM ============
         
         # Create nested area for ChaCha20 Core
-        self.create_nested_area(ax, 9, 4.5, 12, 6, "ChaCha20 Core FSM (Nested)")
-        
-        # Core FSM States (nested inside)
-        core_states = [
-            (4, 5.5, "CORE\nIDLE\n000", self.colors['core_idle'], "Awaiting\nStart Signal"),
-            (7, 5.5, "CORE\nINIT\n001", self.colors['core_init'], "State Matrix\nInitialization"),
-            (10, 5.5, "CORE\nROUND\n010", self.colors['core_round'], "20 Rounds\nQR Operations"),
-            (13, 5.5, "CORE\nOUTPUT\n011", self.colors['core_output'], "Keystream\nGeneration"),
-            (10, 3, "CORE\nCOMPLETE\n100", self.colors['core_complete'], "Signal Done\nto Controller")
-        ]
-        
-        # Draw core states
-        for x, y, label, color, desc in core_states:
-            self.create_state_box(ax, x, y, 1.8, 1.0, label, color, fontsize=9)
-            ax.text(x, y - 0.8, desc, ha='center', va='center', 
-                   fontsize=7, style='italic', color=self.colors['text'])
-        
-        # Core transitions
-        core_transitions = [
-            ((4, 5.5), (7, 5.5), "start"),
-            ((7, 5.5), (10, 5.5), "initialized"),
-            ((10, 5.5), (13, 5.5), "rounds done"),
-            ((13, 5.5), (10, 3), "output ready")
-        ]
-        
-        for start, end, text in core_transitions:
-            self.create_arrow(ax, start, end, text, color='#E74C3C')
-        
-        # Round counter loop
-        loop_center = (10, 6.8)
-        loop_radius = 0.4
-        circle = patches.Circle(loop_center, loop_radius, fill=False, 
-                              edgecolor='#E74C3C', linewidth=2)
-        ax.add_patch(circle)
-        ax.text(10, 7.5, "Round < 20\nLoop Back", ha='center', va='center', 
-               fontsize=7, bbox=dict(boxstyle="round,pad=0.2", 
-               facecolor='#FADBD8', alpha=0.8))
-        
-        # Arrow from ROUND back to itself
-        self.create_arrow(ax, (10.8, 6.2), (10.8, 6.8), "", color='#E74C3C')
+        self.create_nested_area(ax, 9, 3.5, 15, 5, "ChaCha20 Core FSM (Nested)")
+        core_centers = draw_fsm(ax, core_fsm, (2, 2.5, 16, 4.5), self.core_colors(core_fsm),
+                                box_size=(1.8, 1.0), fontsize=9, arrow_color='#E74C3C')
+        
+        # ROUND holds while its loop condition (read from chacha20_core.v) is true
+        condition = arm_condition(self.core_rtl, 'ROUND')
+        if 'ROUND' in core_centers and condition:
+            x, y = core_centers['ROUND']
+            ax.text(x, y - 1.0, f"{condition}\nStay in ROUND", ha='center', va='center', 
+                   fontsize=7, bbox=dict(boxstyle="round,pad=0.2", 
+                   facecolor='#FADBD8', alpha=0.8))
         
         # ============ CONNECTION BETWEEN LEVELS ============
         
-        # Main CORE state that triggers the nested FSM
-        main_core_state = (9, 1.5, "CORE\n011", self.colors['main_process'], "Execute ChaCha20\nEncryption")
-        x, y, label, color, desc = main_core_state
-        self.create_state_box(ax, x, y, 2.5, 1.2, label, color)
-        ax.text(x, y - 1.0, desc, ha='center', va='center', 
-               fontsize=8, style='italic', color=self.colors['text'])
-        
-        # Connection from LOAD_IN to CORE
-        self.create_arrow(ax, (11, 8.4), (9, 2.7), "core_start", curved=True, offset=-1.5)
-        
-        # Connection from CORE_WAIT to nested core
-        self.create_arrow(ax, (15, 8.4), (4, 6.1), "monitor", curved=True, offset=1.0, color='#F39C12')
-        
-        # Connection from nested core back to main flow
-        self.create_arrow(ax, (10, 2.2), (15, 8.4), "core_done", curved=True, offset=2.0, color='#27AE60')
-        
-        # Final states
-        output_state = (12, 1.5, "OUTPUT\n101", self.colors['main_output'], "Stream Ciphertext\nOutput")
-        complete_state = (15, 1.5, "COMPLETE\n110", self.colors['main_complete'], "Operation\nComplete")
-        
-        x, y, label, color, desc = output_state
-        self.create_state_box(ax, x, y, 2.5, 1.2, label, color)
-        ax.text(x, y - 1.0, desc, ha='center', va='center', 
-               fontsize=8, style='italic', color=self.colors['text'])
-        
-        x, y, label, color, desc = complete_state
-        self.create_state_box(ax, x, y, 2.5, 1.2, label, color)
-        ax.text(x, y - 1.0, desc, ha='center', va='center', 
-               fontsize=8, style='italic', color=self.colors['text'])
-        
-        # Final transitions
-        self.create_arrow(ax, (9, 1.5), (12, 1.5), "done")
-        self.create_arrow(ax, (12, 1.5), (15, 1.5), "complete")
-        
-        # Restart loop
-        self.create_arrow(ax, (15, 2.7), (3, 8.4), "restart/reset", curved=True, offset=-2.5)
+        first_core = core_centers[core_fsm.reset]
+        last_core = core_centers[list(core_fsm.states)[-1]]
+        if 'CORE' in main_centers:
+            x, y = main_centers['CORE']
+            self.create_arrow(ax, (x, y - 0.5), (first_core[0], first_core[1] + 0.6),
+                              "core_start", curved=True, offset=1.0, color='#F39C12')
+        if 'CORE_WAIT' in main_centers:
+            x, y = main_centers['CORE_WAIT']
+            self.create_arrow(ax, (last_core[0], last_core[1] + 0.6), (x, y - 0.5),
+                              "core_done", curved=True, offset=1.0, color='#27AE60')
         
         # ============ ANNOTATIONS ============
         
@@ -227,14 +161,13 @@ class NestedFSMDiagram:
                color=self.colors['border'], 
                bbox=dict(boxstyle="round,pad=0.5", facecolor='#E8F6F3', alpha=0.8))
         
-        ax.text(1, 2, "Core Execution Level", fontsize=14, fontweight='bold', 
+        ax.text(1, 0.5, "Core Execution Level", fontsize=14, fontweight='bold', 
                color=self.colors['border'],
                bbox=dict(boxstyle="round,pad=0.5", facecolor='#FDF2E9', alpha=0.8))
         
-        # Add timing information
-        ax.text(16, 4.5, "Nested FSM\nDetails:\n\n• 20 QR rounds\n• ~320 clock cycles\n• Parallel operation\n• State preservation", 
-               fontsize=9, ha='left', va='center',
-               bbox=dict(boxstyle="round,pad=0.4", facecolor='#F4F6F7', alpha=0.9))
+        ax.text(9, 0.5, f"States extracted from {Path(self.top_rtl).name} ({len(main_fsm.states)}) "
+               f"and {Path(self.core_rtl).name} ({len(core_fsm.states)})",
+               fontsize=9, ha='center', va='center', style='italic', color=self.colors['text'])
         
         # Set limits and clean up
         ax.set_xlim(0, 18)
@@ -270,39 +203,41 @@ class NestedFSMDiagram:
         # LEFT: Overview with highlight
         ax1.set_title('System Overview\n(CORE State Highlighted)', fontsize=14, fontweight='bold')
         
-        # Main system states
-        overview_states = [
-            (2, 7, "IDLE", self.colors['main_idle']),
-            (2, 5, "ACQUIRE", self.colors['main_acquire']),
-            (2, 3, "LOAD_IN", self.colors['main_process']),
-            (2, 1, "CORE", '#FF6B6B'),  # Highlighted
-            (5, 1, "OUTPUT", self.colors['main_output']),
-            (5, 3, "COMPLETE", self.colors['main_complete'])
-        ]
-        
-        for x, y, label, color in overview_states:
+        # Main system states from the RTL, down the left column and back up the right
+        main_fsm = extract_fsm(self.top_rtl)
+        names = list(main_fsm.states)
+        per_column = (len(names) + 1) // 2
+        rows = np.linspace(7.2, 0.8, per_column)
+        overview_states = [(2, rows[i], name) if i < per_column else (5, rows[2 * per_column - 1 - i], name)
+                           for i, name in enumerate(names)]
+        colors = self.main_colors(main_fsm)
+        
+        for x, y, label in overview_states:
+            color = colors[label]
             if label == "CORE":
                 # Special highlighting for CORE state
+                color = '#FF6B6B'
                 highlight = FancyBboxPatch((x-0.8, y-0.6), 1.6, 1.2,
                                          boxstyle="round,pad=0.1", 
                                          facecolor='yellow', alpha=0.3,
                                          edgecolor='red', linewidth=3)
                 ax1.add_patch(highlight)
+                
+                # Zoom indicator
+                zoom_box = FancyBboxPatch((x-0.8, y-0.6), 1.6, 1.2,
+                                        boxstyle="round,pad=0.1", 
+                                        facecolor='none',
+                                        edgecolor='red', linewidth=3, linestyle='--')
+                ax1.add_patch(zoom_box)
+                
+                # Arrow pointing to detailed view
+                ax1.annotate('', xy=(8, 4), xytext=(x + 1.5, y),
+                            arrowprops=dict(arrowstyle='->', lw=3, color='red'))
+                ax1.text(6.5, (y + 4) / 2, 'ZOOM IN', fontsize=12, fontweight='bold', 
+                        color='red', rotation=30)
             
-            self.create_state_box(ax1, x, y, 1.4, 1.0, label, color, fontsize=10)
-        
-        # Zoom indicator
-        zoom_box = FancyBboxPatch((1.2, 0.4), 1.6, 1.2,
-                                boxstyle="round,pad=0.1", 
-                                facecolor='none',
-                                edgecolor='red', linewidth=3, linestyle='--')
-        ax1.add_patch(zoom_box)
-        
-        # Arrow pointing to detailed view
-        ax1.annotate('', xy=(8, 4), xytext=(3.5, 1),
-                    arrowprops=dict(arrowstyle='->', lw=3, color='red'))
-        ax1.text(5.5, 2.5, 'ZOOM IN', fontsize=12, fontweight='bold', 
-                color='red', rotation=30)
+            self.create_state_box(ax1, x, y, 1.4, 0.7, label.replace('_', '\n', 1) if len(label) > 10 else label,
+                                  color, fontsize=8)
         
         ax1.set_xlim(0, 9)
         ax1.set_ylim(0, 8)
@@ -310,54 +245,33 @@ class NestedFSMDiagram:
         # RIGHT: Detailed CORE FSM
         ax2.set_title('CORE State Internal FSM\n(Detailed View)', fontsize=14, fontweight='bold')
         
-        # Detailed core states
-        detailed_states = [
-            (2, 7, "IDLE\nWait for\ncore_start", self.colors['core_idle']),
-            (6, 7, "INIT\nSetup state\nmatrix", self.colors['core_init']),
-            (10, 7, "ROUND\nExecute QR\noperations", self.colors['core_round']),
-            (10, 4, "OUTPUT\nGenerate\nkeystream", self.colors['core_output']),
-            (6, 4, "COMPLETE\nSignal\ncore_done", self.colors['core_complete'])
-        ]
-        
-        for x, y, label, color in detailed_states:
-            self.create_state_box(ax2, x, y, 2.0, 1.5, label, color, fontsize=9)
-        
-        # Detailed transitions
-        detailed_transitions = [
-            ((2, 7), (6, 7), "start=1"),
-            ((6, 7), (10, 7), "matrix_ready"),
-            ((10, 7), (10, 4), "round_count=20"),
-            ((10, 4), (6, 4), "keystream_valid"),
-            ((6, 4), (2, 7), "next_block", True, -1.5)
-        ]
-        
-        for transition in detailed_transitions:
-            if len(transition) == 5:
-                start, end, text, curved, offset = transition
-                self.create_arrow(ax2, start, end, text, curved, offset)
-            else:
-                start, end, text = transition
-                self.create_arrow(ax2, start, end, text)
+        # Detailed core states, laid out from chacha20_core.v
+        core_fsm = extract_fsm(self.core_rtl)
+        draw_fsm(ax2, core_fsm, (0.5, 4.2, 13.5, 7.0), self.core_colors(core_fsm),
+                 box_size=(2.0, 1.2), fontsize=9, arrow_color=self.colors['arrow'])
         
         # Round loop detail
         loop_states = [
-            (8, 8.5, "QR\nCol", '#FFB6C1'),
-            (10, 8.5, "QR\nDiag", '#FFB6C1'),
-            (12, 8.5, "Update\nState", '#FFB6C1')
+            (5, 8.8, "QR\nCol", '#FFB6C1'),
+            (7, 8.8, "QR\nDiag", '#FFB6C1'),
+            (9, 8.8, "Update\nState", '#FFB6C1')
         ]
         
         for x, y, label, color in loop_states:
             self.create_state_box(ax2, x, y, 1.2, 0.8, label, color, fontsize=8)
         
         # Round sub-transitions
-        self.create_arrow(ax2, (8, 8.5), (10, 8.5), "")
-        self.create_arrow(ax2, (10, 8.5), (12, 8.5), "")
-        self.create_arrow(ax2, (12, 8.1), (8, 8.1), "round++", curved=True, offset=-0.3)
-        
-        # Round counter
-        ax2.text(10, 5.5, "Round Counter:\n0 → 19\n(20 iterations)", 
-                ha='center', va='center', fontsize=9,
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='lightblue', alpha=0.7))
+        self.create_arrow(ax2, (5, 8.8), (7, 8.8), "")
+        self.create_arrow(ax2, (7, 8.8), (9, 8.8), "")
+        self.create_arrow(ax2, (9, 8.4), (5, 8.4), "round++", curved=True, offset=-0.3)
+        
+        # Round counter; each ROUND cycle is one double round (column + diagonal)
+        bound = loop_bound(self.core_rtl, 'ROUND')
+        if bound:
+            counter, count = bound
+            ax2.text(7, 3.0, f"{counter}:\n0 → {count - 1}\n({count} double rounds = {2 * count} rounds)",
+                    ha='center', va='center', fontsize=9,
+                    bbox=dict(boxstyle="round,pad=0.3", facecolor='lightblue', alpha=0.7))
         
         ax2.set_xlim(0, 14)
         ax2.set_ylim(2, 10)
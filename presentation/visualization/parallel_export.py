@@ -0,0 +1,127 @@
+"""
+Parallel Animation Export
+Renders animation frames across a process pool and streams them in order into one encoder
+"""
+
+import io
+import math
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# One animator per worker process, reused across the chunks it renders
+_worker_animators = {}
+
+
+def _init_worker():
+    from headless import pin_batch_backend
+    pin_batch_backend()
+
+
+def render_chunk(animator_cls, animator_kwargs, frame_method, dpi, frames):
+    """Worker entry point: render a run of consecutive frames to raw RGBA buffers"""
+    key = (animator_cls, tuple(sorted(animator_kwargs.items())))
+    animator = _worker_animators.get(key)
+    if animator is None:
+        animator = _worker_animators[key] = animator_cls(**animator_kwargs)
+    draw = getattr(animator, frame_method)
+
+    buffers = []
+    for frame in frames:
+        draw(frame)
+        # savefig (unlike canvas.draw) also renders blit-mode animated artists
+        buf = io.BytesIO()
+        animator.fig.savefig(buf, format='rgba', dpi=dpi,
+                             facecolor=animator.fig.get_facecolor())
+        buffers.append(buf.getvalue())
+    size = tuple(int(round(v * dpi)) for v in animator.fig.get_size_inches())
+    return size, buffers
+
+
+class PillowEncoder:
+    """GIF output through Pillow (frames are kept until close)"""
+
+    def __init__(self, filename, fps, size):
+        from PIL import Image
+        self.image = Image
+        self.filename = filename
+        self.duration = int(1000 / fps)
+        self.size = size
+        self.frames = []
+
+    def write(self, rgba):
+        self.frames.append(self.image.frombuffer('RGBA', self.size, rgba, 'raw', 'RGBA', 0, 1))
+
+    def close(self):
+        self.frames[0].save(self.filename, save_all=True, append_images=self.frames[1:],
+                            duration=self.duration, loop=0)
+
+
+class FFmpegEncoder:
+    """Video output by piping raw RGBA frames into ffmpeg"""
+
+    def __init__(self, filename, fps, size):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg not found in PATH")
+        command = [ffmpeg, '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{size[0]}x{size[1]}',
+                   '-r', str(fps), '-i', '-',
+                   '-pix_fmt', 'yuv420p', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                   filename]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, rgba):
+        self.process.stdin.write(rgba)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self.process.returncode}")
+
+
+def make_encoder(filename, fps, size):
+    if filename.lower().endswith('.gif'):
+        return PillowEncoder(filename, fps, size)
+    return FFmpegEncoder(filename, fps, size)
+
+
+def split_frames(frame_count, workers, chunk=None):
+    """Consecutive frame ranges, a few per worker so the pool stays busy"""
+    chunk = chunk or max(1, math.ceil(frame_count / (workers * 4)))
+    return [list(range(start, min(start + chunk, frame_count)))
+            for start in range(0, frame_count, chunk)]
+
+
+def export_animation(animator_cls, frame_method, frame_count, filename,
+                     fps=20, dpi=100, workers=None, chunk=None, animator_kwargs=None):
+    """Render frames 0..frame_count-1 in parallel and encode them in order
+
+    `animator_cls(**animator_kwargs)` must build its own figure as `.fig`
+    (kwargs must be picklable, e.g. a waveform path); `frame_method` is
+    the name of the method that draws one frame, and must depend only on
+    the frame index so chunks can be rendered in any process and order.
+    """
+    if not filename.lower().endswith('.gif') and shutil.which('ffmpeg') is None:
+        raise RuntimeError("ffmpeg not found in PATH")
+    workers = workers or os.cpu_count() or 1
+    chunks = split_frames(frame_count, workers, chunk)
+    started = time.perf_counter()
+    print(f"Rendering {frame_count} frames on {workers} workers ({len(chunks)} chunks)...")
+
+    encoder = None
+    render = partial(render_chunk, animator_cls, animator_kwargs or {}, frame_method, dpi)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # map() yields chunk results in submission order, so frames stay in sequence
+        for size, buffers in pool.map(render, chunks):
+            if encoder is None:
+                encoder = make_encoder(filename, fps, size)
+            for rgba in buffers:
+                encoder.write(rgba)
+    encoder.close()
+
+    print(f"Saved {filename} in {time.perf_counter() - started:.1f}s")
+    return filename
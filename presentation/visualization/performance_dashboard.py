@@ -0,0 +1,187 @@
+"""
+ChaCha20 ASIC Performance Dashboard
+Plots throughput, block latency and toggle activity measured from a simulation waveform, updating as the dump grows
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+from matplotlib.ticker import MaxNLocator
+
+from headless import preview_enabled
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / 'main' / 'tb' / 'python checking'))
+
+from live_metrics import WINDOW_CYCLES, LiveMetrics, format_metrics
+
+DEFAULT_WAVEFORM = REPO_ROOT / 'presentation' / 'verification' / 'simulation_results' / 'integration' / 'tb_asic_top_full_cycle.vcd'
+
+# Handshake counters shown as bars, in pipeline order
+EVENT_BARS = ['start', 'in_word', 'chunk', 'trng', 'out_word', 'done']
+
+
+class PerformanceDashboard:
+    def __init__(self, waveform=DEFAULT_WAVEFORM, period_ns=None, window=WINDOW_CYCLES):
+        self.waveform = str(waveform)
+        self.metrics = LiveMetrics(self.waveform, period_ns=period_ns, window=window)
+        self.fig, ((self.ax_rate, self.ax_latency), (self.ax_activity, self.ax_events)) = \
+            plt.subplots(2, 2, figsize=(14, 9))
+        self.fig.patch.set_facecolor('black')
+        self.setup_plots()
+
+    def setup_plots(self):
+        """Create the artists once; refresh() only feeds them new data"""
+        for ax in (self.ax_rate, self.ax_latency, self.ax_activity, self.ax_events):
+            ax.set_facecolor('black')
+            ax.tick_params(colors='white')
+            for spine in ax.spines.values():
+                spine.set_color('white')
+            ax.grid(True, alpha=0.3, color='gray')
+
+        window = self.metrics.window
+        self.ax_rate.set_title(f'Throughput per {window}-cycle window', color='white', fontsize=12, weight='bold')
+        self.ax_rate.set_xlabel('Clock cycle', color='white')
+        self.ax_rate.set_ylabel('Gbps', color='white')
+        self.rate_line, = self.ax_rate.step([], [], 'lime', where='post', linewidth=2, label='Window')
+        self.mean_line, = self.ax_rate.plot([], [], 'cyan', linestyle='--', linewidth=1.5, label='Running')
+        self.ax_rate.legend(loc='upper left', fontsize=8, facecolor='black', labelcolor='white')
+
+        self.ax_latency.set_title('Block latency (start -> done)', color='white', fontsize=12, weight='bold')
+        self.ax_latency.set_xlabel('Block', color='white')
+        self.ax_latency.set_ylabel('Cycles', color='white')
+        self.latency_line, = self.ax_latency.plot([], [], 'o-', color='orange', linewidth=1.5)
+        self.ax_latency.xaxis.set_major_locator(MaxNLocator(integer=True))
+
+        self.ax_activity.set_title('Toggle activity', color='white', fontsize=12, weight='bold')
+        self.ax_activity.set_xlabel('Clock cycle', color='white')
+        self.ax_activity.set_ylabel('Toggles / bit / cycle', color='white')
+        self.activity_line, = self.ax_activity.step([], [], 'magenta', where='post', linewidth=2)
+
+        self.ax_events.set_title('Handshakes', color='white', fontsize=12, weight='bold')
+        self.event_bars = None
+
+        self.title = self.fig.suptitle('', color='white', fontsize=13, weight='bold')
+        self.fig.tight_layout(rect=(0, 0, 1, 0.94))
+
+    def create_event_bars(self):
+        """Bars for the handshakes present in the dump, known once the header is read"""
+        self.ax_events.clear()
+        self.ax_events.set_facecolor('black')
+        self.ax_events.tick_params(colors='white')
+        self.ax_events.set_title('Handshakes', color='white', fontsize=12, weight='bold')
+        self.event_kinds = [kind for kind in EVENT_BARS if kind in self.metrics.events]
+        self.event_bars = self.ax_events.bar(self.event_kinds, [0] * len(self.event_kinds), color='#5E81AC')
+        self.event_labels = [self.ax_events.text(bar.get_x() + bar.get_width() / 2, 0, '', ha='center',
+                                                 va='bottom', color='white', fontsize=9)
+                             for bar in self.event_bars]
+
+    def refresh(self):
+        """Consume whatever the simulator appended and redraw; returns the new cycle count"""
+        new_cycles = self.metrics.update()
+        if self.metrics.tail.restarted:
+            self.event_bars = None
+        if not self.metrics.ready:
+            self.title.set_text(f'Waiting for {Path(self.waveform).name} ...')
+            return 0
+        if self.event_bars is None:
+            self.create_event_bars()
+
+        history = self.metrics.history
+        snapshot = self.metrics.snapshot()
+        # Each window is a step spanning its cycles; the last value is repeated to close it
+        edges = [0] + history['cycle'] if history['cycle'] else []
+        for line, key in ((self.rate_line, 'throughput_gbps'), (self.activity_line, 'activity')):
+            line.set_data(edges, history[key] + history[key][-1:])
+        self.mean_line.set_data([0, max(snapshot['cycles'], 1)], [snapshot['throughput_gbps']] * 2)
+        self.latency_line.set_data(range(1, len(self.metrics.latencies) + 1), self.metrics.latencies)
+
+        counts = [snapshot['events'][kind] for kind in self.event_kinds]
+        for bar, label, count in zip(self.event_bars, self.event_labels, counts):
+            bar.set_height(count)
+            label.set_y(count)
+            label.set_text(str(count))
+        self.ax_events.set_ylim(0, max(counts + [1]) * 1.15)
+
+        for ax in (self.ax_rate, self.ax_latency, self.ax_activity):
+            ax.relim()
+            ax.autoscale_view()
+
+        cycles_per_block = snapshot['cycles_per_block']
+        self.title.set_text(
+            f"ChaCha20 ASIC | {Path(self.waveform).name} | {snapshot['cycles']} cycles @ "
+            f"{snapshot['period_ns']:g} ns | {snapshot['blocks']} blocks | "
+            f"{snapshot['blocks_per_cycle']:.4f} blocks/cycle | "
+            f"{f'{cycles_per_block:.1f}' if cycles_per_block else '-'} cycles/block | "
+            f"{snapshot['throughput_gbps']:.3f} Gbps")
+        return new_cycles
+
+    def generate_snapshot(self, filename='chacha20_performance_dashboard.png'):
+        """Read the waveform as it stands and save the dashboard"""
+        self.refresh()
+        self.fig.savefig(filename, dpi=120, facecolor=self.fig.get_facecolor())
+        return self.fig
+
+    def follow(self, filename, interval=1.0, idle_timeout=None, preview=False):
+        """Keep tailing the waveform, redrawing after every poll that brought new cycles
+
+        Stops after `idle_timeout` seconds without growth (when given) or on Ctrl-C.
+        """
+        idle_since = time.monotonic()
+        try:
+            while True:
+                if self.refresh() or self.metrics.tail.restarted:
+                    idle_since = time.monotonic()
+                    print(f"  {format_metrics(self.metrics.snapshot())}")
+                    self.fig.savefig(filename, dpi=120, facecolor=self.fig.get_facecolor())
+                elif idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                    break
+                if preview:
+                    plt.pause(interval)
+                else:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def main():
+    """Render the performance dashboard, once or while a simulation runs"""
+    parser = argparse.ArgumentParser(description="Live performance dashboard for a ChaCha20 ASIC simulation")
+    parser.add_argument('waveform', nargs='?', default=str(DEFAULT_WAVEFORM),
+                        help="plain .vcd, possibly still being written")
+    parser.add_argument('--output', default='chacha20_performance_dashboard.png', help="PNG snapshot file")
+    parser.add_argument('--follow', action='store_true', help="keep tailing the waveform as the simulation writes it")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between polls with --follow")
+    parser.add_argument('--idle-timeout', type=float,
+                        help="with --follow, stop after this many seconds without new cycles")
+    parser.add_argument('--window', type=int, default=WINDOW_CYCLES, help="clock cycles per throughput window")
+    parser.add_argument('--period', type=float, help="clock period in ns (default: CLOCK_PERIOD from main/rtl/config.json)")
+    parser.add_argument('--no-preview', action='store_true',
+                        help="skip the live window (implied when no display is available)")
+    args = parser.parse_args()
+
+    print("📈 ChaCha20 Performance Dashboard")
+    print("=" * 40)
+
+    # Decided before the first figure exists, so batch runs never touch a GUI backend
+    preview = preview_enabled(not args.no_preview)
+    dashboard = PerformanceDashboard(args.waveform, args.period, args.window)
+
+    if args.follow:
+        if preview:
+            plt.show(block=False)
+        dashboard.follow(args.output, args.interval, args.idle_timeout, preview)
+    else:
+        dashboard.generate_snapshot(args.output)
+        print(f"  {format_metrics(dashboard.metrics.snapshot())}")
+        if preview:
+            plt.show()
+    print(f"✅ Dashboard saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""
+RTL State Machine Extractor
+Reads FSM states and transitions straight from the Verilog, lays them out automatically
+and annotates edges with transition counts observed in a waveform
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+RTL_DIR = REPO_ROOT / 'main' / 'rtl'
+ASIC_TOP_RTL = RTL_DIR / 'asic_top.v'
+CORE_RTL = RTL_DIR / 'chacha20_core.v'
+# Earlier 3-bit asic_top, which the archived simulation dumps were recorded from
+LEGACY_ASIC_TOP_RTL = REPO_ROOT / 'presentation' / 'source_code' / 'rtl' / 'asic_top.v'
+
+LOCALPARAM_RE = re.compile(r"\b(\w+)\s*=\s*(\d*)'([bdhoBDHO])([0-9a-fA-F_xXzZ]+)")
+RADIX = {'b': 2, 'd': 10, 'h': 16, 'o': 8}
+BLOCK_RE = re.compile(r"\b(begin|end|case|casex|casez|endcase)\b|\b(\w+)\s*:(?!=)")
+
+
+class StateMachine:
+    """States (name -> encoding) and transitions of one state register"""
+
+    def __init__(self, module, register, width):
+        self.module = module
+        self.register = register
+        self.width = width
+        self.states = {}        # name -> code
+        self.transitions = []   # (source, target), in RTL order
+        self.reset = None
+
+    def state_names(self):
+        """State names indexed by encoding (unused codes become S<n>)"""
+        by_code = {code: name for name, code in self.states.items()}
+        count = max(by_code) + 1 if by_code else 0
+        return [by_code.get(code, f'S{code}') for code in range(count)]
+
+    def encoding(self, name):
+        return format(self.states[name], f'0{self.width}b')
+
+    def __repr__(self):
+        return f"StateMachine({self.module}.{self.register}, {len(self.states)} states)"
+
+
+def strip_comments(text):
+    text = re.sub(r'/\*.*?\*/', ' ', text, flags=re.S)
+    return re.sub(r'//[^\n]*', '', text)
+
+
+def parse_localparams(text):
+    """All sized-literal localparams: name -> (width, value)"""
+    params = {}
+    for decl in re.findall(r'\blocalparam\b([^;]*);', text):
+        for name, width, radix, digits in LOCALPARAM_RE.findall(decl):
+            digits = digits.replace('_', '')
+            try:
+                value = int(digits, RADIX[radix.lower()])
+            except ValueError:
+                continue    # x/z literals are not state encodings
+            params[name] = (int(width) if width else None, value)
+    return params
+
+
+def case_arms(text, register):
+    """Split the body of `case (register)` into {label: arm text}"""
+    start = re.search(rf'\bcase[xz]?\s*\(\s*{register}\s*\)', text)
+    if not start:
+        return {}
+    arms = {}
+    depth = 0
+    label, arm_start = None, None
+    for match in BLOCK_RE.finditer(text, start.end()):
+        keyword, name = match.groups()
+        if keyword in ('begin', 'case', 'casex', 'casez'):
+            depth += 1
+        elif keyword in ('end', 'endcase'):
+            if depth == 0:     # the endcase closing our case statement
+                break
+            depth -= 1
+        elif depth == 0:
+            if label is not None:
+                arms[label] = text[arm_start:match.start()]
+            label, arm_start = name, match.end()
+    if label is not None:
+        arms[label] = text[arm_start:match.start()]
+    return arms
+
+
+def extract_fsm(path, register='fsm_state'):
+    """Build the StateMachine for `register` from a Verilog source file"""
+    text = strip_comments(Path(path).read_text())
+    module = re.search(r'\bmodule\s+(\w+)', text)
+    width = re.search(rf'\breg\s*\[\s*(\d+)\s*:\s*(\d+)\s*\]\s*{register}\b', text)
+    fsm = StateMachine(module.group(1) if module else Path(path).stem, register,
+                       abs(int(width.group(1)) - int(width.group(2))) + 1 if width else 1)
+
+    params = parse_localparams(text)
+    assign = re.compile(rf'\b{register}\s*<=\s*(\w+)')
+    arms = case_arms(text, register)
+
+    referenced = [label for label in arms if label in params]
+    referenced += assign.findall(text)
+    for name in referenced:
+        if name in params and name not in fsm.states:
+            fsm.states[name] = params[name][1]
+    fsm.states = dict(sorted(fsm.states.items(), key=lambda item: item[1]))
+
+    for source, body in arms.items():
+        if source not in fsm.states:
+            continue    # default arm
+        for target in assign.findall(body):
+            if target in fsm.states and (source, target) not in fsm.transitions:
+                fsm.transitions.append((source, target))
+
+    # Reset state: the first assignment outside the case statement
+    case_start = re.search(rf'\bcase[xz]?\s*\(\s*{register}\s*\)', text)
+    before = text[:case_start.start()] if case_start else text
+    resets = [name for name in assign.findall(before) if name in fsm.states]
+    fsm.reset = resets[0] if resets else next(iter(fsm.states), None)
+    return fsm
+
+
+def transition_counts(fsm, waveform, signal=None):
+    """Count observed state changes of the FSM register in a waveform
+
+    Returns (counts, unexpected): counts maps each RTL transition to how
+    often it occurred; unexpected holds observed changes the RTL lacks.
+    Raises ValueError when the dump's register width differs from the RTL
+    (the dump was recorded from another revision of the state encoding).
+    """
+    sys.path.insert(0, str(REPO_ROOT / 'main' / 'tb' / 'python checking'))
+    from vcd_reader import open_waveform, to_int
+
+    reader = open_waveform(waveform)
+    found = reader.find(signal or fsm.register)
+    if found.width != fsm.width:
+        raise ValueError(f"{found.path} is {found.width} bits but {fsm.module}.{fsm.register} "
+                         f"is {fsm.width}; the dump uses a different state encoding")
+    trace = reader.load([found.path])[found.path]
+
+    names = {code: name for name, code in fsm.states.items()}
+    counts = {edge: 0 for edge in fsm.transitions}
+    unexpected = {}
+    previous = None
+    for value in trace.values:
+        if any(c in 'xXzZ' for c in value):
+            previous = None
+            continue
+        state = names.get(to_int(value), f'S{to_int(value)}')
+        if previous is not None and state != previous:
+            edge = (previous, state)
+            if edge in counts:
+                counts[edge] += 1
+            else:
+                unexpected[edge] = unexpected.get(edge, 0) + 1
+        previous = state
+    return counts, unexpected
+
+
+def arm_condition(path, state, register='fsm_state'):
+    """Condition of the first `if` in a state's case arm (e.g. 'round_count < 10'), or None"""
+    text = strip_comments(Path(path).read_text())
+    match = re.search(r'\bif\s*\(([^()]*)\)', case_arms(text, register).get(state, ''))
+    return ' '.join(match.group(1).split()) if match else None
+
+
+def loop_bound(path, state, register='fsm_state'):
+    """(counter, bound) of a state that holds while '<counter> < <bound>', or None"""
+    match = re.fullmatch(r'(\w+) < (\d+)', arm_condition(path, state, register) or '')
+    return (match.group(1), int(match.group(2))) if match else None
+
+
+def back_edges(fsm):
+    """Transitions that close a loop, found by depth-first search from reset"""
+    successors = {name: [] for name in fsm.states}
+    for source, target in fsm.transitions:
+        successors[source].append(target)
+    back, visited, on_stack = set(), set(), set()
+
+    def visit(name):
+        visited.add(name)
+        on_stack.add(name)
+        for target in successors[name]:
+            if target in on_stack:
+                back.add((name, target))
+            elif target not in visited:
+                visit(target)
+        on_stack.discard(name)
+
+    for name in ([fsm.reset] if fsm.reset else []) + list(fsm.states):
+        if name not in visited:
+            visit(name)
+    return back
+
+
+def layout_fsm(fsm):
+    """Layered layout: column = longest forward path from reset, rows ordered by predecessor barycenter
+
+    Returns {state: (column, row)} plus the column count and max rows.
+    """
+    back = back_edges(fsm)
+    forward = [(s, t) for s, t in fsm.transitions if s != t and (s, t) not in back]
+    predecessors = {name: [] for name in fsm.states}
+    for source, target in forward:
+        predecessors[target].append(source)
+
+    depth = {}
+
+    def column_of(name):
+        if name not in depth:
+            depth[name] = max((column_of(p) + 1 for p in predecessors[name]), default=0)
+        return depth[name]
+
+    columns = {}
+    for name in fsm.states:
+        columns.setdefault(column_of(name), []).append(name)
+
+    position = {}
+    for column in sorted(columns):
+        def barycenter(name):
+            rows = [position[p][1] for p in predecessors[name] if p in position]
+            return (sum(rows) / len(rows) if rows else 0, fsm.states[name])
+        members = sorted(columns[column], key=barycenter)
+        for row, name in enumerate(members):
+            position[name] = (column, row - (len(members) - 1) / 2)
+    return position, len(columns), max(len(m) for m in columns.values()) if columns else 0
+
+
+def draw_fsm(ax, fsm, bounds, colors=None, counts=None, unexpected=None,
+             box_size=(1.8, 0.9), fontsize=9, arrow_color='#2C3E50'):
+    """Draw an FSM inside bounds=(x0, y0, x1, y1) of a data-coordinate axes
+
+    `colors` maps state name to fill color (default gray). Edge labels show
+    counts when given; unexpected observed transitions are drawn dashed red.
+    Returns {state: (x, y)}.
+    """
+    from matplotlib.patches import FancyArrowPatch, FancyBboxPatch
+    from matplotlib.path import Path as CurvePath
+
+    grid, n_columns, n_rows = layout_fsm(fsm)
+    x0, y0, x1, y1 = bounds
+    dx = (x1 - x0) / max(n_columns, 1)
+    dy = (y1 - y0) / max(n_rows, 1)
+    width, height = box_size
+
+    centers = {}
+    boxes = {}
+    for name, (column, row) in grid.items():
+        x = x0 + (column + 0.5) * dx
+        y = (y0 + y1) / 2 - row * dy
+        centers[name] = (x, y)
+        box = FancyBboxPatch((x - width/2, y - height/2), width, height,
+                             boxstyle="round,pad=0.05",
+                             facecolor=(colors or {}).get(name, '#95A5A6'),
+                             edgecolor='black', linewidth=2,
+                             linestyle='--' if name == fsm.reset else '-')
+        ax.add_patch(box)
+        boxes[name] = box
+        text = name.replace('_', '\n', 1) if len(name) > 10 else name
+        ax.text(x, y, f"{text}\n{fsm.encoding(name)}", ha='center', va='center',
+                fontsize=fontsize, fontweight='bold', color='white')
+
+    def label(x, y, text, color):
+        ax.text(x, y, text, ha='center', va='center', fontsize=fontsize - 2, color=color,
+                bbox=dict(boxstyle="round,pad=0.15", facecolor='white', alpha=0.9))
+
+    edges = [(edge, False) for edge in fsm.transitions]
+    edges += [(edge, True) for edge in (unexpected or {})]
+    for (source, target), is_unexpected in edges:
+        color = '#E74C3C' if is_unexpected else arrow_color
+        style = dict(arrowstyle='->', mutation_scale=15, color=color, linewidth=2,
+                     linestyle='--' if is_unexpected else '-')
+        (xa, ya), (xb, yb) = centers[source], centers[target]
+        if source == target:
+            ax.add_patch(FancyArrowPatch((xa - width/4, ya + height/2), (xa + width/4, ya + height/2),
+                                         connectionstyle="arc3,rad=-1.5", **style))
+            mid = (xa, ya + height)
+        elif grid[target][0] > grid[source][0]:
+            # Forward edges go straight, clipped to the boxes
+            ax.add_patch(FancyArrowPatch((xa, ya), (xb, yb), patchA=boxes[source],
+                                         patchB=boxes[target], **style))
+            mid = ((xa + xb) / 2, (ya + yb) / 2)
+        else:
+            # Back edges and same-column edges arc over (leftwards) or under (rightwards)
+            # the rows; built in data space so the label sits on the curve at any aspect
+            side = 1 if xb < xa or (xb == xa and yb > ya) else -1
+            start = (xa, ya + side * height/2)
+            end = (xb, yb + side * height/2)
+            bend = min(0.175 * abs(xb - xa) + height / 2, (y1 - y0) / 2)
+            control = ((start[0] + end[0]) / 2 + (width if xb == xa else 0),
+                       max(start[1], end[1]) + bend if side > 0 else min(start[1], end[1]) - bend)
+            path = CurvePath([start, control, end], [CurvePath.MOVETO, CurvePath.CURVE3, CurvePath.CURVE3])
+            ax.add_patch(FancyArrowPatch(path=path, **style))
+            # Quadratic Bezier midpoint
+            mid = tuple(0.25 * p + 0.5 * c + 0.25 * q for p, c, q in zip(start, control, end))
+        if is_unexpected:
+            label(*mid, f"{unexpected[(source, target)]}x (not in RTL)", color)
+        elif counts is not None:
+            label(*mid, f"{counts.get((source, target), 0)}x", color)
+    return centers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and draw an FSM from Verilog")
+    parser.add_argument('rtl', nargs='?', default=str(ASIC_TOP_RTL), help="Verilog source")
+    parser.add_argument('--register', default='fsm_state', help="state register name")
+    parser.add_argument('--vcd', help="waveform to count transitions from")
+    parser.add_argument('--signal', help="register path in the waveform (default: register name)")
+    parser.add_argument('--out', help="write the diagram to this image")
+    args = parser.parse_args()
+
+    print("🔀 ChaCha20 RTL FSM Extractor")
+    print("=" * 40)
+
+    fsm = extract_fsm(args.rtl, args.register)
+    print(f"📄 {fsm.module}.{fsm.register}: {len(fsm.states)} states, "
+          f"{len(fsm.transitions)} transitions, reset {fsm.reset}")
+    for name in fsm.states:
+        print(f"  {fsm.encoding(name)}  {name}")
+
+    counts, unexpected = None, None
+    if args.vcd:
+        try:
+            counts, unexpected = transition_counts(fsm, args.vcd, args.signal)
+        except (KeyError, ValueError) as e:
+            print(f"⚠️  No transition counts: {e}")
+    print("\n➡️  Transitions:")
+    for source, target in fsm.transitions:
+        seen = f"  ({counts[(source, target)]}x)" if counts is not None else ""
+        print(f"  {source:<18} -> {target}{seen}")
+    for (source, target), n in (unexpected or {}).items():
+        print(f"  ❗ {source} -> {target} observed {n}x but not in the RTL")
+
+    if args.out:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        _, n_columns, n_rows = layout_fsm(fsm)
+        fig, ax = plt.subplots(figsize=(max(2.6 * n_columns, 8), max(2.2 * n_rows, 4)))
+        draw_fsm(ax, fsm, (0, 0, 2.6 * n_columns, 2.2 * n_rows), counts=counts, unexpected=unexpected)
+        ax.set_xlim(0, 2.6 * n_columns)
+        ax.set_ylim(-0.5, 2.2 * n_rows + 1.5)   # headroom for the loop-back arcs
+        ax.set_axis_off()
+        ax.set_title(f"{fsm.module} {fsm.register}", fontsize=14, fontweight='bold')
+        fig.savefig(args.out, dpi=200, bbox_inches='tight')
+        print(f"\n🖼️  Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())